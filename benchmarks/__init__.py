@@ -0,0 +1 @@
+"""Benchmarks for MySQL Visualizer that run against a local stand-in server."""
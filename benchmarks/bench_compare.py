@@ -0,0 +1,97 @@
+"""
+Times a drift comparison of many shards on the fake server: fingerprinting the
+shards one at a time and concurrently, and comparing the fingerprints.
+
+Shards are databases spread over --hosts fake servers. Every --drift-every-th
+shard gets one change (a column added, altered or dropped, a table dropped or a
+foreign key removed), and the report is checked to name exactly those shards.
+
+Run from the repository root:
+    python -m benchmarks.bench_compare --shards 100 --tables 2000
+"""
+import argparse
+import time
+
+import schema_compare
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+
+def drifted_catalog(catalog, shard):
+    """Returns a copy of catalog with one change picked by the shard number, and the changed table."""
+    changes = ("add_column", "alter_column", "drop_column", "drop_table", "drop_foreign_key")
+    change = changes[shard % len(changes)]
+    columns = catalog['columns']
+    foreign_keys = catalog['foreign_keys']
+    tables = catalog['tables']
+
+    if change == "drop_foreign_key":
+        fk = foreign_keys[shard % len(foreign_keys)]
+        return {**catalog, 'foreign_keys': [other for other in foreign_keys if other is not fk]}, fk['TABLE_NAME']
+
+    table_name = tables[shard % len(tables)]['TABLE_NAME']
+    if change == "drop_table":
+        return {'tables': [t for t in tables if t['TABLE_NAME'] != table_name],
+                'columns': [c for c in columns if c['TABLE_NAME'] != table_name],
+                'foreign_keys': [fk for fk in foreign_keys if fk['TABLE_NAME'] != table_name]}, table_name
+
+    table_columns = [c for c in columns if c['TABLE_NAME'] == table_name]
+    last = table_columns[-1]
+    if change == "add_column":
+        added = {**last, 'COLUMN_NAME': "added_column", 'ORDINAL_POSITION': last['ORDINAL_POSITION'] + 1}
+        return {**catalog, 'columns': columns + [added]}, table_name
+    if change == "alter_column":
+        altered = {**last, 'DATA_TYPE': "mediumtext", 'CHARACTER_MAXIMUM_LENGTH': 16777215}
+    else:
+        altered = None
+    return {**catalog, 'columns': [altered if c is last else c for c in columns if c is not last or altered]}, \
+        table_name
+
+def run(num_shards, num_tables, num_columns, num_hosts, drift_every, workers, latency, row_latency):
+    catalog = generate_schema(num_tables, num_columns, fks_per_table=1.5)
+    servers = [FakeMySQLServer(latency=latency, row_latency=row_latency) for _ in range(num_hosts)]
+    pools = [server.pool(pool_size=max(1, workers // num_hosts)) for server in servers]
+
+    shards = {}
+    expected = {}   # {shard_label: changed table}
+    start = time.perf_counter()
+    for i in range(num_shards):
+        label = f"shard_{i:03d}"
+        shard_catalog = catalog
+        if drift_every and i % drift_every == drift_every - 1:
+            shard_catalog, expected[label] = drifted_catalog(catalog, i)
+        servers[i % num_hosts].load_database(label, shard_catalog)
+        shards[label] = (pools[i % num_hosts], label)
+    print(f"{num_shards} shards of {num_tables} tables on {num_hosts} hosts loaded in "
+          f"{time.perf_counter() - start:.1f}s; {len(expected)} shards drifted")
+
+    for max_workers in (1, workers):
+        start = time.perf_counter()
+        fingerprints = schema_compare.collect_fingerprints(shards, max_workers)
+        print(f"{'fingerprint, ' + str(max_workers) + ' workers':>28}: {time.perf_counter() - start:9.2f} s")
+
+    start = time.perf_counter()
+    report = schema_compare.compare_fingerprints(fingerprints)
+    print(f"{'compare':>28}: {(time.perf_counter() - start) * 1000:9.1f} ms "
+          f"({len(fingerprints.definitions)} distinct definitions, {len(report.schema_variants)} schema variants)")
+
+    drifted = {shard: tables for shard, tables in report.drifted_shards().items()}
+    if drifted != {shard: [table_name] for shard, table_name in expected.items()}:
+        print("WARNING: the report does not match the injected drift")
+    print("\n".join(report.format()[:20]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=100)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--drift-every", type=int, default=10, help="Every n-th shard gets one change (0: none)")
+    parser.add_argument("--workers", type=int, default=schema_compare.DEFAULT_MAX_WORKERS)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per round trip")
+    parser.add_argument("--row-latency", type=float, default=0.00002, help="Simulated seconds per row transferred")
+    args = parser.parse_args()
+    run(args.shards, args.tables, args.columns, args.hosts, args.drift_every, args.workers, args.latency,
+        args.row_latency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compares per-table and bulk schema introspection against the fake server.
+
+Run from the repository root:
+    python -m benchmarks.bench_introspection --tables 4000 --latency 0.002
+"""
+import argparse
+import time
+
+import db_connector
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+
+DB_NAME = "bench_db"
+
+def run(num_tables, columns_per_table, latency):
+    server = FakeMySQLServer(latency=latency)
+    server.load_database(DB_NAME, generate_schema(num_tables, columns_per_table))
+    connection = server.connect()
+
+    results = {}
+    for mode, bulk in (("per_table", False), ("bulk", True)):
+        server.reset_stats()
+        start = time.perf_counter()
+        schema, foreign_keys = db_connector.get_schema_for_database(connection, DB_NAME, bulk=bulk)
+        elapsed = time.perf_counter() - start
+        results[mode] = (schema, foreign_keys)
+        print(f"{mode:>10}: {server.round_trips:6d} round trips, {server.rows_fetched:8d} rows, "
+              f"{elapsed * 1000:9.1f} ms, {len(schema)} tables, {len(foreign_keys)} FKs")
+
+    if results["per_table"] != results["bulk"]:
+        print("WARNING: bulk and per-table introspection returned different schemas")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=4000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.001, help="Simulated seconds per round trip")
+    args = parser.parse_args()
+    run(args.tables, args.columns, args.latency)
+
+if __name__ == "__main__":
+    main()
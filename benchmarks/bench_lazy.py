@@ -0,0 +1,67 @@
+"""
+Compares the time to a first diagram for a full schema load and for the
+collapsed outline load used by "Load columns on demand": introspection, table
+measurement and a grid layout, against the fake server.
+
+Run from the repository root:
+    python -m benchmarks.bench_lazy --tables 10000 --columns 30
+"""
+import argparse
+import time
+
+import db_connector
+import diagram
+import fk_index
+import layout
+import text_metrics
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+
+def first_diagram(db_schema, foreign_keys, measurer):
+    """Measures every table and lays the schema out, as the GUI does before drawing."""
+    index = fk_index.ForeignKeyIndex(foreign_keys)
+    sizes = {table_name: diagram.measure_table(table_name, columns, index, measurer)[:2]
+             for table_name, columns in db_schema.items()}
+    return layout.grid_layout(sizes, [], max_width=1000)
+
+def run(num_tables, columns_per_table, latency, row_latency):
+    server = FakeMySQLServer(latency=latency, row_latency=row_latency)
+    server.load_database("bench_db", generate_schema(num_tables, columns_per_table, fks_per_table=2))
+    connection = server.connect()
+    measurer = text_metrics.ApproximateTextMeasurer()
+
+    def report(label, introspection, total):
+        print(f"{label:>10}: {server.round_trips:4d} round trips, {server.rows_fetched:8d} rows, "
+              f"introspection {introspection * 1000:8.1f} ms, first diagram {total * 1000:8.1f} ms")
+
+    server.reset_stats()
+    start = time.perf_counter()
+    model = db_connector.get_schema_model(connection, "bench_db")
+    loaded = time.perf_counter()
+    first_diagram(model.schema_view(), model.foreign_keys_view(), measurer)
+    report("full", loaded - start, time.perf_counter() - start)
+
+    server.reset_stats()
+    start = time.perf_counter()
+    outline = db_connector.get_schema_outline(connection, "bench_db")
+    loaded = time.perf_counter()
+    first_diagram({table_name: [] for table_name in outline.table_names}, outline.foreign_keys_view(), measurer)
+    report("outline", loaded - start, time.perf_counter() - start)
+
+    # Expanding a screenful of tables afterwards.
+    server.reset_stats()
+    start = time.perf_counter()
+    db_connector.get_columns_for_tables(connection, "bench_db", outline.table_names[:30])
+    print(f"expanding 30 tables: {server.round_trips} round trips, {(time.perf_counter() - start) * 1000:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=10000)
+    parser.add_argument("--columns", type=int, default=30, help="Columns per table")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per round trip")
+    parser.add_argument("--row-latency", type=float, default=0.00002, help="Simulated seconds per row transferred")
+    args = parser.parse_args()
+    run(args.tables, args.columns, args.latency, args.row_latency)
+
+if __name__ == "__main__":
+    main()
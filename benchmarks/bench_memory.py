@@ -0,0 +1,73 @@
+"""
+Compares the memory held by the dict schema structure returned by
+get_schema_for_database with the compact schema_model.SchemaModel returned by
+get_schema_model, for the same synthetic database on the fake server.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory --tables 4000 --columns 50
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import db_connector
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+
+def measure(load):
+    """Returns (result, retained bytes, peak bytes, seconds) of load()."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak, elapsed
+
+def run(num_tables, columns_per_table):
+    server = FakeMySQLServer()
+    server.load_database("bench_db", generate_schema(num_tables, columns_per_table, fks_per_table=2))
+    connection = server.connect()
+
+    def report(label, retained, peak, elapsed):
+        print(f"{label:>16}: retained {retained / 2**20:8.1f} MiB, peak {peak / 2**20:8.1f} MiB, {elapsed * 1000:9.1f} ms")
+
+    (schema, foreign_keys), retained, peak, elapsed = measure(
+        lambda: db_connector.get_schema_for_database(connection, "bench_db"))
+    report("dicts", retained, peak, elapsed)
+    column_count = sum(len(columns) for columns in schema.values())
+
+    model, model_retained, peak, elapsed = measure(lambda: db_connector.get_schema_model(connection, "bench_db"))
+    report("SchemaModel", model_retained, peak, elapsed)
+
+    print(f"{len(schema)} tables, {column_count} columns, {len(foreign_keys)} foreign keys: "
+          f"{retained / max(column_count, 1):.0f} vs {model_retained / max(column_count, 1):.0f} bytes per column "
+          f"({retained / max(model_retained, 1):.1f}x smaller)")
+
+    if model.to_dicts() != (schema, foreign_keys):
+        print("WARNING: SchemaModel contents differ from the dict schema")
+
+    # Column lookup by name: a scan of the column dicts versus the model's column IDs.
+    lookups = [(fk['fk_table'], fk['fk_column']) for fk in foreign_keys]
+    start = time.perf_counter()
+    for table_name, column_name in lookups:
+        next(col for col in schema[table_name] if col['name'] == column_name)
+    dict_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for table_name, column_name in lookups:
+        model.column(model.column_id(table_name, column_name))
+    model_elapsed = time.perf_counter() - start
+    print(f"{len(lookups)} column lookups: dicts {dict_elapsed * 1000:.1f} ms, SchemaModel {model_elapsed * 1000:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=4000)
+    parser.add_argument("--columns", type=int, default=50, help="Columns per table")
+    args = parser.parse_args()
+    run(args.tables, args.columns)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares single-connection bulk introspection with parallel sharded introspection
+against the fake server, for one database and for several databases at once.
+
+Run from the repository root:
+    python -m benchmarks.bench_parallel --tables 4000 --databases 4 --workers 4
+"""
+import argparse
+import time
+
+import db_connector
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+
+def run(num_tables, num_databases, workers, latency, row_latency):
+    server = FakeMySQLServer(latency=latency, row_latency=row_latency)
+    databases = [f"bench_db_{i}" for i in range(num_databases)]
+    for i, db_name in enumerate(databases):
+        server.load_database(db_name, generate_schema(num_tables, 12, seed=i))
+    pool = server.pool(pool_size=workers)
+
+    def report(label, elapsed):
+        print(f"{label:>32}: {server.round_trips:6d} round trips, {elapsed * 1000:9.1f} ms")
+
+    server.reset_stats()
+    start = time.perf_counter()
+    with pool.connection() as connection:
+        serial = {db_name: db_connector.get_schema_for_database(connection, db_name) for db_name in databases}
+    report("serial bulk", time.perf_counter() - start)
+
+    server.reset_stats()
+    start = time.perf_counter()
+    single = db_connector.get_schema_parallel(pool, databases[0])
+    report(f"parallel, 1 db, {workers} workers", time.perf_counter() - start)
+
+    server.reset_stats()
+    start = time.perf_counter()
+    parallel = db_connector.get_all_schemas(pool, databases)
+    report(f"parallel, {num_databases} dbs, {workers} workers", time.perf_counter() - start)
+
+    for db_name in databases:
+        schema, foreign_keys = parallel[db_name]
+        serial_schema, serial_fks = serial[db_name]
+        if schema != serial_schema or sorted(map(sorted, map(dict.items, foreign_keys))) != sorted(map(sorted, map(dict.items, serial_fks))):
+            print(f"WARNING: parallel introspection of '{db_name}' differs from serial")
+    if single[0] != serial[databases[0]][0]:
+        print("WARNING: single-database parallel introspection differs from serial")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=4000)
+    parser.add_argument("--databases", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per round trip")
+    parser.add_argument("--row-latency", type=float, default=0.00002, help="Simulated seconds per row transferred")
+    args = parser.parse_args()
+    run(args.tables, args.databases, args.workers, args.latency, args.row_latency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Times rendering a synthetic schema onto the visualizer canvas.
+
+The first timing is a normal schema load, which renders the tables around the
+window. The full renders then draw every table and relationship at once, as if
+the whole diagram were on screen, at each detail level; they include the idle
+tasks in which Tk processes the new items.
+
+Needs a display (or Xvfb). Run from the repository root:
+    python -m benchmarks.bench_render --tables 1000 --columns 50
+"""
+import argparse
+import time
+import tkinter as tk
+
+import db_connector
+import visualize_mysql
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+from visualize_mysql import MySQLVisualizerApp
+
+DB_NAME = "bench_db"
+
+# Zoom factors of the full renders: full detail, names only, outlines only.
+FULL_RENDER_ZOOMS = (1.0, visualize_mysql.HEADER_DETAIL_ZOOM, visualize_mysql.MIN_ZOOM)
+
+def load_model(num_tables, columns_per_table):
+    server = FakeMySQLServer()
+    server.load_database(DB_NAME, generate_schema(num_tables, columns_per_table))
+    return db_connector.get_schema_model(server.connect(), DB_NAME)
+
+def render_everything(app, root, zoom):
+    """Renders every table at zoom from an empty canvas. Returns the seconds taken."""
+    for _, items in app.rendered_tables.values():
+        app._release_items(items)
+    app.rendered_tables = {}
+    app._flush_canvas_ops()
+    root.update_idletasks()
+
+    app.zoom = zoom
+    app._update_scrollregion()
+    right = max(pos['x2'] for pos in app.table_positions.values())
+    bottom = max(pos['y2'] for pos in app.table_positions.values())
+    app._visible_world_rect = lambda: (0, 0, right, bottom)
+
+    start = time.perf_counter()
+    app._render_viewport()
+    root.update_idletasks()
+    return time.perf_counter() - start
+
+def run(num_tables, columns_per_table, repeat):
+    model = load_model(num_tables, columns_per_table)
+
+    root = tk.Tk()
+    root.withdraw()
+    app = MySQLVisualizerApp(root)
+    app.layout_var.set("Grid")
+
+    for attempt in range(repeat):
+        start = time.perf_counter()
+        app._on_schema_loaded(DB_NAME, model)
+        root.update_idletasks()
+        elapsed = time.perf_counter() - start
+        print(f"load {attempt + 1}: {elapsed * 1000:9.1f} ms, "
+              f"{len(app.canvas.find_all())} canvas items, "
+              f"{len(app.text_measurer._widths)} distinct strings measured")
+
+    for zoom in FULL_RENDER_ZOOMS:
+        for attempt in range(repeat):
+            elapsed = render_everything(app, root, zoom)
+            print(f"full render at zoom {zoom:4.2f}, run {attempt + 1}: {elapsed * 1000:9.1f} ms, "
+                  f"{len(app.rendered_tables)} tables, {len(app.rendered_relationships)} relationship paths, "
+                  f"{len(app.canvas.find_all())} canvas items")
+
+    root.destroy()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2, help="Later runs reuse the warm measurement cache and item pool")
+    args = parser.parse_args()
+    run(args.tables, args.columns, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compares a streamed schema load with a whole one on the fake server: how long it
+takes until the first batch of tables can be drawn, and how much memory the load
+peaks at.
+
+iter_schema() reads rows from an unbuffered cursor, so its first tables are
+available after a fraction of the rows have arrived (--row-latency simulates the
+per-row transfer time). The fake server holds every result in memory, so the
+peaks include one full result set; "read only" streams and drops the rows to
+show that share.
+
+Run from the repository root:
+    python -m benchmarks.bench_streaming --tables 4000 --columns 50
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import db_connector
+import schema_model
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+
+# Tables per batch, as handed to the Tk thread by the application.
+BATCH_TABLES = 200
+
+def load_dicts(connection):
+    """Whole load: nothing can be drawn before get_schema_for_database returns."""
+    db_connector.get_schema_for_database(connection, "bench_db")
+    return None
+
+def load_streamed(connection):
+    """
+    Streamed load into a SchemaModel, finished batch by batch as the application
+    does. Returns the seconds until the first batch was ready.
+    """
+    start = time.perf_counter()
+    first = None
+    model = schema_model.SchemaModel()
+    for tables_done, (table_name, columns) in enumerate(db_connector.iter_schema(connection, "bench_db"), 1):
+        model.add_table(table_name)
+        for column in columns:
+            model.add_column(table_name, *column)
+        if tables_done % BATCH_TABLES == 0:
+            model.finish()
+            if first is None:
+                first = time.perf_counter() - start
+    for fk in db_connector.iter_foreign_keys(connection, "bench_db"):
+        model.add_foreign_key(*fk)
+    model.finish()
+    return first
+
+def read_streamed(connection):
+    """Reads the stream and drops it: the peak of the fake server's result sets alone."""
+    for _ in db_connector.iter_schema(connection, "bench_db"):
+        pass
+    return None
+
+def run(num_tables, columns_per_table, row_latency):
+    server = FakeMySQLServer(row_latency=row_latency)
+    server.load_database("bench_db", generate_schema(num_tables, columns_per_table, fks_per_table=2))
+    connection = server.connect()
+
+    for label, load in (("dicts", load_dicts), ("streamed", load_streamed), ("read only", read_streamed)):
+        # Timed without tracemalloc, which slows allocation-heavy code down several times.
+        gc.collect()
+        start = time.perf_counter()
+        first = load(connection)
+        total = time.perf_counter() - start
+        if first is None:
+            first = total
+
+        gc.collect()
+        tracemalloc.start()
+        load(connection)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:>10}: first {BATCH_TABLES} tables {first * 1000:8.1f} ms, complete {total * 1000:8.1f} ms, "
+              f"peak {peak / 2**20:7.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=4000)
+    parser.add_argument("--columns", type=int, default=50, help="Columns per table")
+    parser.add_argument("--row-latency", type=float, default=0.00001, help="Simulated seconds per transferred row")
+    args = parser.parse_args()
+    run(args.tables, args.columns, args.row_latency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+A SQLite-backed stand-in for a MySQL server.
+
+Only the INFORMATION_SCHEMA tables and SHOW statements that db_connector uses are
+emulated. Every execute() counts as one network round trip and can be given an
+artificial latency, plus a per-row transfer time, so benchmarks can show how
+query count and result size turn into wall time. Buffered cursors pay the
+transfer time in execute(); unbuffered ones (buffered=False) pay it per row as
+rows are read, like a result streamed from a real server.
+"""
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from mysql.connector import Error
+
+import db_connector
+
+_INFORMATION_SCHEMA_DDL = [
+    """
+    CREATE TABLE INFORMATION_SCHEMA.TABLES (
+        TABLE_SCHEMA TEXT, TABLE_NAME TEXT, TABLE_TYPE TEXT, TABLE_ROWS INTEGER,
+        CREATE_TIME TEXT, UPDATE_TIME TEXT
+    )
+    """,
+    """
+    CREATE TABLE INFORMATION_SCHEMA.COLUMNS (
+        TABLE_SCHEMA TEXT, TABLE_NAME TEXT, COLUMN_NAME TEXT, ORDINAL_POSITION INTEGER,
+        DATA_TYPE TEXT, CHARACTER_MAXIMUM_LENGTH INTEGER, IS_NULLABLE TEXT,
+        COLUMN_KEY TEXT, EXTRA TEXT
+    )
+    """,
+    """
+    CREATE TABLE INFORMATION_SCHEMA.KEY_COLUMN_USAGE (
+        CONSTRAINT_NAME TEXT, TABLE_SCHEMA TEXT, TABLE_NAME TEXT, COLUMN_NAME TEXT,
+        REFERENCED_TABLE_SCHEMA TEXT, REFERENCED_TABLE_NAME TEXT, REFERENCED_COLUMN_NAME TEXT
+    )
+    """,
+    "CREATE INDEX INFORMATION_SCHEMA.idx_columns ON COLUMNS (TABLE_SCHEMA, TABLE_NAME)",
+    "CREATE INDEX INFORMATION_SCHEMA.idx_kcu ON KEY_COLUMN_USAGE (TABLE_SCHEMA, TABLE_NAME)",
+]
+
+_SHOW_TABLES_RE = re.compile(r"^\s*SHOW\s+TABLES\s+FROM\s+`([^`]+)`\s*;?\s*$", re.IGNORECASE)
+_SHOW_DATABASES_RE = re.compile(r"^\s*SHOW\s+DATABASES\s*;?\s*$", re.IGNORECASE)
+
+class FakeMySQLServer:
+    """Holds the emulated catalog and the round-trip statistics shared by all connections."""
+
+    def __init__(self, latency=0.0, row_latency=0.0):
+        self.latency = latency
+        self.row_latency = row_latency
+        self.round_trips = 0
+        self.rows_fetched = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.create_function("CRC32", 1, lambda value: zlib.crc32(str(value).encode()))
+        self._db.create_function("CONCAT_WS", -1,
+                                 lambda separator, *values: separator.join(str(v) for v in values if v is not None))
+        self._db.execute("ATTACH DATABASE ':memory:' AS INFORMATION_SCHEMA")
+        for ddl in _INFORMATION_SCHEMA_DDL:
+            self._db.execute(ddl)
+        self._databases = []
+
+    def load_database(self, db_name, catalog):
+        """Loads a catalog as produced by synthetic_schema.generate_schema() under db_name."""
+        self._databases.append(db_name)
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO INFORMATION_SCHEMA.TABLES VALUES (?, ?, ?, ?, ?, ?)",
+                [(db_name, t['TABLE_NAME'], t.get('TABLE_TYPE', 'BASE TABLE'), t.get('TABLE_ROWS'),
+                  t.get('CREATE_TIME'), t.get('UPDATE_TIME')) for t in catalog['tables']])
+            self._db.executemany(
+                "INSERT INTO INFORMATION_SCHEMA.COLUMNS VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(db_name, c['TABLE_NAME'], c['COLUMN_NAME'], c['ORDINAL_POSITION'], c['DATA_TYPE'],
+                  c['CHARACTER_MAXIMUM_LENGTH'], c['IS_NULLABLE'], c['COLUMN_KEY'], c['EXTRA'])
+                 for c in catalog['columns']])
+            self._db.executemany(
+                "INSERT INTO INFORMATION_SCHEMA.KEY_COLUMN_USAGE VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(fk['CONSTRAINT_NAME'], db_name, fk['TABLE_NAME'], fk['COLUMN_NAME'], db_name,
+                  fk['REFERENCED_TABLE_NAME'], fk['REFERENCED_COLUMN_NAME']) for fk in catalog['foreign_keys']])
+            self._db.commit()
+
+    def pool(self, pool_size=4):
+        """Returns a db_connector.ConnectionPool whose connections come from this server."""
+        return db_connector.ConnectionPool("fake", "", "", pool_size=pool_size, connection_factory=self.connect)
+
+    def connect(self, **kwargs):
+        """Returns a new connection; accepts and ignores mysql.connector.connect() arguments."""
+        return FakeConnection(self)
+
+    def reset_stats(self):
+        self.round_trips = 0
+        self.rows_fetched = 0
+
+    def _run(self, query, params, buffered=True):
+        """Executes one statement and returns (column_names, rows)."""
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.round_trips += 1
+            show_tables = _SHOW_TABLES_RE.match(query)
+            if show_tables:
+                db_name = show_tables.group(1)
+                rows = self._db.execute(
+                    "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = ? ORDER BY TABLE_NAME",
+                    (db_name,)).fetchall()
+                names = [f"Tables_in_{db_name}"]
+            elif _SHOW_DATABASES_RE.match(query):
+                rows = [(db,) for db in ['information_schema', 'mysql'] + self._databases]
+                names = ["Database"]
+            else:
+                try:
+                    sqlite_cursor = self._db.execute(query.replace("%s", "?"), tuple(params or ()))
+                except sqlite3.Error as e:
+                    raise Error(msg=f"Fake server could not run query: {e}")
+                rows = sqlite_cursor.fetchall()
+                names = [d[0] for d in sqlite_cursor.description or ()]
+            self.rows_fetched += len(rows)
+        if self.row_latency and buffered:
+            time.sleep(self.row_latency * len(rows))
+        return names, rows
+
+class FakeConnection:
+    """Minimal mysql.connector connection look-alike."""
+
+    def __init__(self, server):
+        self.server = server
+        self.server_host = "fake"
+        self.server_port = 3306
+        self._open = True
+
+    def cursor(self, dictionary=False, buffered=True, **kwargs):
+        return FakeCursor(self, dictionary, buffered)
+
+    def is_connected(self):
+        return self._open
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        if not self._open and not reconnect:
+            raise Error(msg="Connection is closed")
+        self.server._run("SELECT 1", ())
+        self._open = True
+
+    def close(self):
+        self._open = False
+
+class FakeCursor:
+    """Cursor returning tuples, or dicts when created with dictionary=True."""
+
+    # Unbuffered cursors sleep off their accumulated row transfer time in steps of this many seconds.
+    _SLEEP_STEP = 0.001
+
+    def __init__(self, connection, dictionary, buffered=True):
+        self._connection = connection
+        self._dictionary = dictionary
+        self._buffered = buffered
+        self._rows = []
+        self._position = 0
+        self._transfer_debt = 0.0
+        self.column_names = ()
+
+    def execute(self, query, params=None):
+        if not self._connection.is_connected():
+            raise Error(msg="Connection is closed")
+        names, rows = self._connection.server._run(query, params, self._buffered)
+        self.column_names = tuple(names)
+        if self._dictionary:
+            rows = [dict(zip(names, row)) for row in rows]
+        self._rows = rows
+        self._position = 0
+
+    @property
+    def rowcount(self):
+        return len(self._rows)
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        self._transfer(1)
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        self._transfer(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        self._transfer(len(rows))
+        return rows
+
+    def _transfer(self, row_count):
+        """Charges the transfer time of rows read from an unbuffered cursor."""
+        if not self._buffered:
+            self._transfer_debt += self._connection.server.row_latency * row_count
+            if self._transfer_debt >= self._SLEEP_STEP:
+                time.sleep(self._transfer_debt)
+                self._transfer_debt = 0.0
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._rows = []
@@ -0,0 +1,78 @@
+"""
+Creates a synthetic schema from synthetic_schema.generate_schema on a real MySQL
+server, for running the application or the benchmarks against real
+INFORMATION_SCHEMA behaviour. Foreign keys are added after all tables exist, so
+cyclic and self-referencing schemas load too.
+
+Run from the repository root (drops and recreates the database):
+    python -m benchmarks.load_mysql --user root --tables 2000 --fks 1.5 --cycles 0.05 --database synthetic_db
+"""
+import argparse
+import getpass
+
+import mysql.connector
+from mysql.connector import Error
+
+from benchmarks.synthetic_schema import generate_schema
+
+def catalog_to_ddl(catalog):
+    """Yields CREATE TABLE and ALTER TABLE ... ADD FOREIGN KEY statements for a catalog."""
+    columns_by_table = {}
+    for col in catalog['columns']:
+        columns_by_table.setdefault(col['TABLE_NAME'], []).append(col)
+
+    for table in catalog['tables']:
+        table_name = table['TABLE_NAME']
+        definitions = []
+        for col in sorted(columns_by_table.get(table_name, []), key=lambda col: col['ORDINAL_POSITION']):
+            data_type = col['DATA_TYPE'].upper()
+            if data_type == 'VARCHAR':
+                data_type += f"({col['CHARACTER_MAXIMUM_LENGTH']})"
+            definition = f"`{col['COLUMN_NAME']}` {data_type} {'NULL' if col['IS_NULLABLE'] == 'YES' else 'NOT NULL'}"
+            if col['EXTRA']:
+                definition += f" {col['EXTRA'].upper()}"
+            if col['COLUMN_KEY'] == 'PRI':
+                definition += " PRIMARY KEY"
+            definitions.append(definition)
+        yield f"CREATE TABLE `{table_name}` ({', '.join(definitions)})"
+
+    for fk in catalog['foreign_keys']:
+        yield (f"ALTER TABLE `{fk['TABLE_NAME']}` ADD CONSTRAINT `{fk['CONSTRAINT_NAME']}` "
+               f"FOREIGN KEY (`{fk['COLUMN_NAME']}`) "
+               f"REFERENCES `{fk['REFERENCED_TABLE_NAME']}` (`{fk['REFERENCED_COLUMN_NAME']}`)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="synthetic_db")
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=12, help="Columns per table")
+    parser.add_argument("--fks", type=float, default=1, help="Average foreign keys per table")
+    parser.add_argument("--cycles", type=float, default=0.0, help="Fraction of FKs pointing to a later table")
+    parser.add_argument("--self-references", type=float, default=0.0, help="Fraction of tables with a parent_id FK")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    password = args.password if args.password is not None else getpass.getpass("MySQL password: ")
+
+    catalog = generate_schema(args.tables, args.columns, args.fks, seed=args.seed, cycle_fraction=args.cycles,
+                              self_reference_fraction=args.self_references)
+    try:
+        connection = mysql.connector.connect(host=args.host, user=args.user, password=password)
+        cursor = connection.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+        cursor.execute(f"CREATE DATABASE `{args.database}`")
+        cursor.execute(f"USE `{args.database}`")
+        for statement in catalog_to_ddl(catalog):
+            cursor.execute(statement)
+        connection.commit()
+        cursor.close()
+        connection.close()
+        print(f"Created `{args.database}`: {len(catalog['tables'])} tables, {len(catalog['columns'])} columns, "
+              f"{len(catalog['foreign_keys'])} foreign keys.")
+    except Error as e:
+        print(f"Error creating synthetic database: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Reproducible benchmark suite: generates parametric schemas, serves them from the
+fake server and times each phase of getting them on screen:
+
+    fetch    get_schema_for_database (dict schema)
+    model    SchemaModel.from_dicts and the foreign key index
+    measure  table measuring with the Tk-free text measurer
+    layout   every available layout algorithm
+    render   SVG rendering through export_diagram (a headless stand-in for the canvas)
+
+Results are written as JSON with sorted keys, so runs from different commits can
+be diffed, or compared with --compare:
+
+    python -m benchmarks.suite --output before.json
+    ... change something ...
+    python -m benchmarks.suite --output after.json --compare before.json
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import db_connector
+import diagram
+import export_diagram
+import fk_index
+import layout
+import schema_model
+import text_metrics
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+
+# Version of the JSON result layout; bump it when the layout changes.
+RESULT_FORMAT = 1
+
+# Schema shapes, from quick to stress. Keys are generate_schema() arguments.
+CASES = {
+    'small': {'num_tables': 100, 'columns_per_table': 10, 'fks_per_table': 1},
+    'medium': {'num_tables': 1000, 'columns_per_table': 20, 'fks_per_table': 1.5,
+               'cycle_fraction': 0.05, 'self_reference_fraction': 0.05},
+    'large': {'num_tables': 5000, 'columns_per_table': 30, 'fks_per_table': 2,
+              'cycle_fraction': 0.05, 'self_reference_fraction': 0.02},
+    'dense': {'num_tables': 1000, 'columns_per_table': 15, 'fks_per_table': 6,
+              'cycle_fraction': 0.2, 'self_reference_fraction': 0.1},
+}
+
+# Relative slowdown of a phase's fastest run reported as a regression by --compare.
+# Phases faster than MIN_COMPARE_MS in the baseline are too noisy to compare.
+DEFAULT_THRESHOLD = 0.25
+MIN_COMPARE_MS = 1.0
+
+def run_case(params, repeats, latency):
+    """Runs one case repeats times. Returns its JSON-ready result dict."""
+    server = FakeMySQLServer(latency=latency)
+    server.load_database("bench_db", generate_schema(**params))
+    connection = server.connect()
+    measurer = text_metrics.ApproximateTextMeasurer()
+    timings = {}
+
+    def timed(phase, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        timings.setdefault(phase, []).append((time.perf_counter() - start) * 1000)
+        return result
+
+    for _ in range(repeats):
+        server.reset_stats()
+        schema, foreign_keys = timed("fetch", db_connector.get_schema_for_database, connection, "bench_db")
+        round_trips, rows_fetched = server.round_trips, server.rows_fetched
+
+        def build_model():
+            model = schema_model.SchemaModel.from_dicts(schema, foreign_keys)
+            return model, fk_index.ForeignKeyIndex(model.foreign_keys_view())
+        model, index = timed("model", build_model)
+
+        def measure():
+            return {table_name: diagram.measure_table(table_name, columns, index, measurer)[:2]
+                    for table_name, columns in model.schema_view().items()}
+        sizes = timed("measure", measure)
+
+        edges = [(fk['fk_table'], fk['pk_table']) for fk in index]
+        for name in layout.available_layouts():
+            timed(f"layout.{name}", layout.compute_layout, name, sizes, edges, max_width=2000)
+
+        def render():
+            built = export_diagram.build_diagram(schema, foreign_keys, "grid", measurer)
+            out = io.StringIO()
+            export_diagram.write_svg(out, "bench_db", built)
+            return out.tell()
+        timed("render", render)
+
+    return {
+        'params': params,
+        'size': {'tables': len(schema), 'columns': sum(len(columns) for columns in schema.values()),
+                 'foreign_keys': len(foreign_keys)},
+        'counters': {'round_trips': round_trips, 'rows_fetched': rows_fetched},
+        'phases': {phase: {'median_ms': round(statistics.median(runs), 3), 'min_ms': round(min(runs), 3),
+                           'runs': len(runs)}
+                   for phase, runs in timings.items()},
+    }
+
+def environment():
+    """Describes where the suite ran, so results from different machines are not confused."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': layout.np.__version__ if layout.np is not None else None,
+    }
+
+def compare(results, baseline, threshold):
+    """
+    Prints per-phase changes against a baseline result file and returns the number of
+    regressions. Phases are compared by their fastest run, which is the least noisy.
+    """
+    regressions = 0
+    for case, result in sorted(results['cases'].items()):
+        base = baseline.get('cases', {}).get(case)
+        if base is None:
+            continue
+        if base['params'] != result['params']:
+            print(f"{case}: parameters differ from the baseline, skipped")
+            continue
+        for phase, timing in sorted(result['phases'].items()):
+            base_timing = base['phases'].get(phase)
+            if base_timing is None or base_timing['min_ms'] < MIN_COMPARE_MS:
+                continue
+            change = timing['min_ms'] / base_timing['min_ms'] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{case:>8} {phase:<16} {base_timing['min_ms']:10.1f} -> {timing['min_ms']:10.1f} ms "
+                  f"({change:+7.1%}){flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=['small', 'medium', 'large'])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per round trip")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown reported as a regression (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {'format': RESULT_FORMAT, 'environment': environment(), 'repeats': args.repeats,
+               'latency': args.latency, 'cases': {}}
+    for case in args.cases:
+        print(f"running {case}...", file=sys.stderr)
+        results['cases'][case] = run_case(CASES[case], args.repeats, args.latency)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            out.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
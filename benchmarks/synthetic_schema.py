@@ -0,0 +1,91 @@
+import random
+
+# Data types handed out to synthetic columns, with their CHARACTER_MAXIMUM_LENGTH.
+COLUMN_TYPES = [
+    ('int', None),
+    ('bigint', None),
+    ('varchar', 255),
+    ('varchar', 50),
+    ('datetime', None),
+    ('decimal', None),
+    ('text', 65535),
+]
+
+def generate_schema(num_tables, columns_per_table, fks_per_table=1, seed=0, cycle_fraction=0.0,
+                    self_reference_fraction=0.0):
+    """
+    Builds a synthetic catalog shaped like the INFORMATION_SCHEMA rows of one database.
+    Returns a dict with 'tables', 'columns' and 'foreign_keys' lists of row dicts.
+
+    Every table gets an `id` primary key and about fks_per_table columns that
+    reference the primary key of another table. A fractional fks_per_table is the
+    average FK density, e.g. 1.5 gives each table one or two FKs. References go to
+    earlier tables, so the FK graph is acyclic, except that a cycle_fraction of the
+    FKs point to a later table instead, which creates cycles. A
+    self_reference_fraction of the tables also get a `parent_id` column referencing
+    their own `id`. The same arguments always produce the same catalog.
+    """
+    rng = random.Random(seed)
+    tables = []
+    columns = []
+    foreign_keys = []
+    whole_fks, fractional_fks = divmod(fks_per_table, 1)
+
+    for t in range(num_tables):
+        table_name = f"table_{t:05d}"
+        tables.append({'TABLE_NAME': table_name, 'TABLE_TYPE': 'BASE TABLE', 'TABLE_ROWS': rng.randint(0, 100000),
+                       'CREATE_TIME': '2024-01-01 00:00:00', 'UPDATE_TIME': None})
+
+        columns.append(_column_row(table_name, 'id', 1, 'int', None, 'NO', 'PRI', 'auto_increment'))
+        position = 2
+
+        # Random draws only happen for the optional features, so catalogs generated
+        # without them are identical to those of earlier versions of this function.
+        table_fks = int(whole_fks)
+        if fractional_fks and rng.random() < fractional_fks:
+            table_fks += 1
+
+        for f in range(table_fks):
+            if cycle_fraction and t + 1 < num_tables and rng.random() < cycle_fraction:
+                ref_table = f"table_{rng.randrange(t + 1, num_tables):05d}"
+            elif f < t:
+                ref_table = f"table_{rng.randrange(t):05d}"
+            else:
+                break
+            position = _add_foreign_key(columns, foreign_keys, table_name, f"{ref_table}_id_{f}", position,
+                                        f"fk_{table_name}_{f}", ref_table)
+
+        if self_reference_fraction and rng.random() < self_reference_fraction:
+            position = _add_foreign_key(columns, foreign_keys, table_name, "parent_id", position,
+                                        f"fk_{table_name}_parent", table_name)
+
+        while position <= columns_per_table:
+            data_type, length = rng.choice(COLUMN_TYPES)
+            columns.append(_column_row(table_name, f"col_{position}", position, data_type, length, 'YES', '', ''))
+            position += 1
+
+    return {'tables': tables, 'columns': columns, 'foreign_keys': foreign_keys}
+
+def _add_foreign_key(columns, foreign_keys, table_name, column_name, position, constraint_name, ref_table):
+    """Adds an FK column referencing ref_table.id. Returns the next ordinal position."""
+    columns.append(_column_row(table_name, column_name, position, 'int', None, 'YES', 'MUL', ''))
+    foreign_keys.append({
+        'CONSTRAINT_NAME': constraint_name,
+        'TABLE_NAME': table_name,
+        'COLUMN_NAME': column_name,
+        'REFERENCED_TABLE_NAME': ref_table,
+        'REFERENCED_COLUMN_NAME': 'id',
+    })
+    return position + 1
+
+def _column_row(table_name, column_name, position, data_type, length, nullable, key, extra):
+    return {
+        'TABLE_NAME': table_name,
+        'COLUMN_NAME': column_name,
+        'ORDINAL_POSITION': position,
+        'DATA_TYPE': data_type,
+        'CHARACTER_MAXIMUM_LENGTH': length,
+        'IS_NULLABLE': nullable,
+        'COLUMN_KEY': key,
+        'EXTRA': extra,
+    }
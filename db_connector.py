@@ -1,5 +1,38 @@
+import concurrent.futures
+import contextlib
+import queue
+import threading
+import time
+import weakref
+
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
+from mysql.connector.errors import PoolError
+
+import instrumentation
+import schema_model
+
+# Number of tables processed between progress reports and cancellation checks.
+PROGRESS_BATCH_SIZE = 100
+
+# Maximum number of table names sent in one TABLE_NAME IN (...) list.
+TABLE_NAME_BATCH_SIZE = 500
+
+# Connection pool defaults: connections kept per pool, and how long a connection may
+# sit idle before it is pinged (and reconnected if needed) on checkout.
+DEFAULT_POOL_SIZE = 4
+PING_INTERVAL_SECONDS = 5
+PING_ATTEMPTS = 3
+PING_DELAY_SECONDS = 1
+
+# Errors after which a prepared statement is prepared again: the connection was lost
+# (and is re-established first), or the server no longer knows the statement handle.
+CONNECTION_LOST_ERRNOS = (errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST,
+                          errorcode.CR_SERVER_LOST_EXTENDED)
+STATEMENT_INVALID_ERRNOS = (errorcode.ER_UNKNOWN_STMT_HANDLER, errorcode.ER_NEED_REPREPARE)
+
+class SchemaLoadCancelled(Exception):
+    """Raised by get_schema_for_database when its cancel_event is set mid-load."""
 
 def connect(host, username, password):
     """Establishes and returns a connection to the MySQL database."""
@@ -13,14 +46,158 @@ def connect(host, username, password):
         print(f"Error connecting to MySQL: {e}")
         return None
 
+class ConnectionPool:
+    """
+    Thread-safe pool of MySQL connections shared by the UI and introspection workers.
+
+    Connections are opened lazily up to pool_size and handed out with acquire() /
+    release() or the connection() context manager, which blocks while all of them
+    are in use. A connection that has been idle for more than PING_INTERVAL_SECONDS,
+    or was released after losing its server connection, is pinged on checkout and
+    transparently reconnected if the server dropped it.
+    connection_factory can replace mysql.connector.connect, e.g. for benchmarks.
+    """
+
+    def __init__(self, host, username, password, pool_size=DEFAULT_POOL_SIZE, connection_factory=None, **connect_args):
+        self.server_host = host
+        self.server_port = connect_args.get('port', 3306)
+        self.pool_size = pool_size
+        if connection_factory is None:
+            connection_factory = lambda: mysql.connector.connect(host=host, user=username, password=password, **connect_args)
+        self._connection_factory = connection_factory
+        self._idle = queue.LifoQueue()  # (connection, released_at or None if lost); LIFO keeps few connections warm
+        self._slots = threading.Semaphore(pool_size)
+        self._closed = False
+
+    def acquire(self, timeout=None):
+        """
+        Returns a live connection, opening a new one if no idle connection is available.
+        Raises PoolError if none becomes free within timeout seconds.
+        """
+        if self._closed:
+            raise PoolError(msg="Connection pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolError(msg=f"No connection available within {timeout} seconds")
+
+        try:
+            try:
+                connection, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connection_factory()
+
+            if released_at is None or time.monotonic() - released_at > PING_INTERVAL_SECONDS:
+                connection.ping(reconnect=True, attempts=PING_ATTEMPTS, delay=PING_DELAY_SECONDS)
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, lost=False):
+        """
+        Returns a connection obtained from acquire() to the pool. Pass lost=True after
+        it failed with one of CONNECTION_LOST_ERRNOS, so it is pinged before reuse.
+        """
+        if self._closed:
+            connection.close()
+        else:
+            self._idle.put((connection, None if lost else time.monotonic()))
+        self._slots.release()
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """Context manager yielding a pooled connection and returning it afterwards."""
+        connection = self.acquire(timeout)
+        lost = False
+        try:
+            yield connection
+        except Error as e:
+            lost = e.errno in CONNECTION_LOST_ERRNOS
+            raise
+        finally:
+            self.release(connection, lost)
+
+    def close(self):
+        """Closes all idle connections; connections in use are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.close()
+            except Error:
+                pass
+
+def create_pool(host, username, password, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Creates a ConnectionPool and opens its first connection to validate the credentials.
+    Returns None if the server cannot be reached.
+    """
+    pool = ConnectionPool(host, username, password, pool_size=pool_size)
+    try:
+        with pool.connection() as connection:
+            if connection.is_connected():
+                print(f"Successfully connected to MySQL Database: {host}")
+        return pool
+    except Error as e:
+        print(f"Error connecting to MySQL: {e}")
+        return None
+
+# Prepared introspection cursors, per connection: {connection: {(query, dictionary): cursor}}
+_prepared_cursors = weakref.WeakKeyDictionary()
+
+def _query(cursor, query, params=None):
+    """
+    Executes a query and yields its rows, recording the round trip and the number
+    of rows in the instrumentation counters.
+    """
+    rows = 0
+    with instrumentation.span("db.query", query=query.split("FROM")[0].strip()[:60]):
+        try:
+            cursor.execute(query, params)
+            for row in cursor:
+                rows += 1
+                yield row
+        finally:
+            instrumentation.count("db.queries")
+            instrumentation.count("db.rows", rows)
+
+def _execute_prepared(connection, query, params, dictionary=True):
+    """
+    Runs one of the fixed introspection queries through a server-side prepared statement
+    that is kept per connection, and returns all rows. The statement is prepared again
+    if the connection was lost or re-established since it was last used; other errors
+    are raised as they are.
+    """
+    cursors = _prepared_cursors.setdefault(connection, {})
+    key = (query, dictionary)
+
+    cursor = cursors.get(key)
+    if cursor is None:
+        cursor = cursors[key] = connection.cursor(prepared=True, dictionary=dictionary)
+    try:
+        cursor.execute(query, params)
+    except Error as e:
+        if e.errno in CONNECTION_LOST_ERRNOS:
+            connection.ping(reconnect=True, attempts=PING_ATTEMPTS, delay=PING_DELAY_SECONDS)
+        elif e.errno not in STATEMENT_INVALID_ERRNOS:
+            raise
+        # The statement handle does not survive a reconnect; prepare it once more.
+        cursor = cursors[key] = connection.cursor(prepared=True, dictionary=dictionary)
+        cursor.execute(query, params)
+    rows = cursor.fetchall()
+    instrumentation.count("db.queries")
+    instrumentation.count("db.rows", len(rows))
+    return rows
+
 def get_all_databases(connection):
     """Fetches a list of all database names from the MySQL server."""
     databases = []
     if connection:
         try:
             cursor = connection.cursor()
-            cursor.execute("SHOW DATABASES")
-            for (db,) in cursor:
+            for (db,) in _query(cursor, "SHOW DATABASES"):
                 if db not in ['information_schema', 'mysql', 'performance_schema', 'sys']:
                     databases.append(db)
             cursor.close()
@@ -28,72 +205,89 @@ def get_all_databases(connection):
             print(f"Error fetching databases: {e}")
     return databases
 
-def get_schema_for_database(connection, db_name):
+_FINGERPRINT_QUERY = """
+SELECT
+    COUNT(*),
+    MAX(CREATE_TIME),
+    SUM(CRC32(TABLE_NAME)),
+    (SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = %s),
+    (SELECT SUM(CRC32(CONCAT_WS(',', TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, DATA_TYPE,
+                                CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE, COLUMN_KEY, EXTRA)))
+     FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = %s),
+    (SELECT SUM(CRC32(CONCAT_WS(',', CONSTRAINT_NAME, TABLE_NAME, COLUMN_NAME,
+                                REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME)))
+     FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE WHERE TABLE_SCHEMA = %s AND REFERENCED_TABLE_NAME IS NOT NULL)
+FROM INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = %s;
+"""
+
+@instrumentation.timed("db.fingerprint")
+def get_schema_fingerprint(connection, db_name):
+    """
+    Returns a cheap fingerprint string of a database's schema, computed server-side
+    in a single one-row query: table count, newest CREATE_TIME, a checksum of the
+    table names, column count, and checksums of the column definitions and foreign
+    keys. It leaves out UPDATE_TIME, so writes to the data do not change it.
+    Returns None on error. Note that MySQL 8 caches CREATE_TIME for
+    information_schema_stats_expiry seconds; the checksums are current.
+    """
+    fingerprint = None
+    if connection and db_name:
+        try:
+            row = _execute_prepared(connection, _FINGERPRINT_QUERY, (db_name,) * 4, dictionary=False)[0]
+            fingerprint = ":".join(str(value) for value in row)
+        except Error as e:
+            print(f"Error fetching fingerprint for database '{db_name}': {e}")
+    return fingerprint
+
+def connection_cache_key(connection):
+    """Returns the 'host:port' string used to key a connection's (or ConnectionPool's) schemas in a SchemaCache."""
+    return f"{getattr(connection, 'server_host', '')}:{getattr(connection, 'server_port', '')}"
+
+@instrumentation.timed("db.load_schema")
+def get_schema_for_database(connection, db_name, bulk=True, progress_callback=None, cancel_event=None, cache=None):
     """
     Fetches schema information (tables and their columns) and foreign key relationships
     for a given database.
     Returns a tuple: (schema_dict, foreign_keys_list)
     schema_dict: {table_name: [{column_info}, ...], ...}
     foreign_keys_list: [{'fk_table': 'orders', 'fk_column': 'user_id', 'pk_table': 'users', 'pk_column': 'id'}, ...]
+
+    With bulk=True (the default) the whole database is introspected with a fixed
+    number of set-based INFORMATION_SCHEMA queries, independent of the table count.
+    bulk=False keeps the original one-query-per-table behaviour.
+
+    progress_callback(tables_done, tables_total) is called after every batch of
+    PROGRESS_BATCH_SIZE tables. If cancel_event (e.g. a threading.Event) is set,
+    the load stops at the next batch boundary and SchemaLoadCancelled is raised.
+
+    If a schema_cache.SchemaCache is passed as cache, the database fingerprint is
+    checked first and the cached copy is returned when it still matches. Otherwise
+    only the tables whose CREATE_TIME/UPDATE_TIME changed are refetched and the
+    cache is updated.
     """
+    if cache is not None and connection and db_name:
+        return _get_schema_with_cache(connection, db_name, cache, progress_callback, cancel_event)
+
     schema = {}
     foreign_keys = []
 
     if connection and db_name:
         try:
-            cursor = connection.cursor(dictionary=True) # Return rows as dictionaries
+            progress = _Progress(progress_callback, cancel_event)
+            try:
+                if bulk:
+                    schema = _fetch_columns_bulk(connection, db_name, progress)
+                else:
+                    schema = _fetch_columns_per_table(connection, db_name, progress)
 
-            # Get all table names in the specified database
-            cursor.execute(f"SHOW TABLES FROM `{db_name}`")
-            tables = [row[f'Tables_in_{db_name}'] for row in cursor]
-
-            # For each table, get its column details
-            for table_name in tables:
-                columns = []
-                query_columns = f"""
-                SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE, COLUMN_KEY, EXTRA
-                FROM INFORMATION_SCHEMA.COLUMNS
-                WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
-                ORDER BY ORDINAL_POSITION;
-                """
-                cursor.execute(query_columns, (db_name, table_name))
-                for col_info in cursor:
-                    column_details = {
-                        'name': col_info['COLUMN_NAME'],
-                        'type': col_info['DATA_TYPE'],
-                        'length': col_info['CHARACTER_MAXIMUM_LENGTH'],
-                        'nullable': col_info['IS_NULLABLE'] == 'YES',
-                        'key': col_info['COLUMN_KEY'],
-                        'extra': col_info['EXTRA']
-                    }
-                    columns.append(column_details)
-                schema[table_name] = columns
-
-            # Fetch foreign key relationships for the database
-            query_fks = f"""
-            SELECT
-                kcu.TABLE_NAME AS fk_table,
-                kcu.COLUMN_NAME AS fk_column,
-                kcu.REFERENCED_TABLE_NAME AS pk_table,
-                kcu.REFERENCED_COLUMN_NAME AS pk_column,
-                kcu.CONSTRAINT_NAME
-            FROM
-                INFORMATION_SCHEMA.KEY_COLUMN_USAGE AS kcu
-            WHERE
-                kcu.TABLE_SCHEMA = %s
-                AND kcu.REFERENCED_TABLE_NAME IS NOT NULL;
-            """
-            cursor.execute(query_fks, (db_name,))
-            for fk_info in cursor:
-                foreign_keys.append({
-                    'fk_table': fk_info['fk_table'],
-                    'fk_column': fk_info['fk_column'],
-                    'pk_table': fk_info['pk_table'],
-                    'pk_column': fk_info['pk_column'],
-                    'constraint_name': fk_info['CONSTRAINT_NAME']
-                })
-            
-            cursor.close()
+                progress.check_cancelled()
+                foreign_keys = _fetch_foreign_keys(connection, db_name)
+            except SchemaLoadCancelled:
+                # Drain any unread rows so the connection stays usable.
+                if hasattr(connection, 'consume_results'):
+                    connection.consume_results()
+                raise
 
         except Error as e:
             print(f"Error fetching schema or foreign keys for database '{db_name}': {e}")
@@ -102,3 +296,505 @@ def get_schema_for_database(connection, db_name):
 
     return schema, foreign_keys
 
+def get_schema_model(connection, db_name, progress_callback=None, cancel_event=None, cache=None):
+    """
+    Like get_schema_for_database, but returns a schema_model.SchemaModel, which
+    takes a fraction of the memory of the dict structure on large schemas. Use
+    model.schema_view() where the dict shape is expected.
+
+    Without a cache, the iter_schema() stream is fed straight into the model, so
+    no per-column dicts are created. Returns an empty model on error.
+    """
+    if cache is not None:
+        return schema_model.SchemaModel.from_dicts(
+            *get_schema_for_database(connection, db_name, progress_callback=progress_callback,
+                                     cancel_event=cancel_event, cache=cache))
+
+    if not (connection and db_name):
+        return schema_model.SchemaModel().finish()
+
+    try:
+        return fetch_schema_model(connection, db_name, progress_callback, cancel_event)
+    except Error as e:
+        print(f"Error fetching schema or foreign keys for database '{db_name}': {e}")
+        return schema_model.SchemaModel().finish()
+
+@instrumentation.timed("db.load_schema")
+def fetch_schema_model(connection, db_name, progress_callback=None, cancel_event=None):
+    """
+    Reads the schema of a database into a SchemaModel, like get_schema_model without
+    a cache. Errors are raised to the caller.
+    """
+    model = schema_model.SchemaModel()
+    for table_name, columns in iter_schema(connection, db_name, progress_callback, cancel_event):
+        model.add_table(table_name)
+        for column_name, data_type, length, nullable, column_key, extra in columns:
+            model.add_column(table_name, column_name, data_type, length, nullable, column_key, extra)
+    for fk_table, fk_column, pk_table, pk_column, constraint_name in iter_foreign_keys(connection, db_name):
+        model.add_foreign_key(fk_table, fk_column, pk_table, pk_column, constraint_name)
+    return model.finish()
+
+def iter_schema(connection, db_name, progress_callback=None, cancel_event=None):
+    """
+    Streams the tables of a database as (table_name, columns) pairs, in table name
+    order, where columns is a list of (name, type, length, nullable, key, extra)
+    tuples in ordinal order. Tables without visible columns are included.
+
+    Column rows are read as tuples from an unbuffered cursor while they arrive, so
+    only the current table's rows are held; a consumer can show each table before
+    the rest of the database has been read. Progress and cancellation work as in
+    get_schema_for_database. Errors are raised to the caller.
+
+    Closing the generator early drains the unread rows, so the connection stays usable.
+    """
+    return _iter_schema(connection, db_name, _Progress(progress_callback, cancel_event))
+
+def _iter_schema(connection, db_name, progress):
+    cursor = connection.cursor(buffered=False)
+    finished = False
+    try:
+        # The table list is small and must be read before the next query can start.
+        table_names = [table_name for (table_name,) in _query(cursor, _TABLES_QUERY, (db_name,))]
+        table_positions = {table_name: position for position, table_name in enumerate(table_names)}
+        progress.total = len(table_names)
+        progress.check_cancelled()
+
+        next_table = 0   # Position in table_names of the next table not yet emitted
+        current_table = None
+        columns = []
+        for table_name, column_name, data_type, length, is_nullable, column_key, extra in \
+                _query(cursor, _COLUMNS_QUERY, (db_name,)):
+            if table_name != current_table:
+                if current_table is not None:
+                    yield current_table, columns
+                    progress.table_done()
+                # Both queries are ordered by table name; emit the column-less tables in between.
+                position = table_positions.get(table_name, -1)
+                while next_table < position:
+                    yield table_names[next_table], []
+                    progress.table_done()
+                    next_table += 1
+                next_table = max(next_table, position + 1)
+                current_table = table_name
+                columns = []
+            columns.append((column_name, data_type, length, is_nullable == 'YES', column_key, extra))
+        if current_table is not None:
+            yield current_table, columns
+            progress.table_done()
+        for table_name in table_names[next_table:]:
+            yield table_name, []
+            progress.table_done()
+        finished = True
+    finally:
+        if not finished and hasattr(connection, 'consume_results'):
+            connection.consume_results()
+        cursor.close()
+
+def iter_foreign_keys(connection, db_name):
+    """
+    Streams the foreign keys of a database as (fk_table, fk_column, pk_table, pk_column,
+    constraint_name) tuples. Errors are raised to the caller.
+    """
+    cursor = connection.cursor(buffered=False)
+    finished = False
+    try:
+        yield from _query(cursor, _FOREIGN_KEYS_ALL_QUERY, (db_name,))
+        finished = True
+    finally:
+        if not finished and hasattr(connection, 'consume_results'):
+            connection.consume_results()
+        cursor.close()
+
+def get_table_versions(connection, db_name):
+    """Returns {table_name: version} as stored by schema_cache.SchemaCache, or {} on error."""
+    try:
+        return _fetch_table_versions(connection, db_name)
+    except Error as e:
+        print(f"Error fetching table versions for database '{db_name}': {e}")
+        return {}
+
+_TABLE_OUTLINE_QUERY = """
+SELECT TABLE_NAME, TABLE_ROWS
+FROM INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = %s
+ORDER BY TABLE_NAME;
+"""
+
+def get_schema_outline(connection, db_name, cancel_event=None):
+    """
+    Fetches only what is needed to draw collapsed tables: table names, row count
+    estimates and foreign keys, in two queries that do not touch
+    INFORMATION_SCHEMA.COLUMNS. Returns a schema_model.SchemaModel without columns
+    (empty on error); fetch columns as needed with get_columns_for_tables.
+    """
+    if not (connection and db_name):
+        return schema_model.SchemaModel().finish()
+
+    try:
+        return fetch_schema_outline(connection, db_name, cancel_event)
+    except Error as e:
+        print(f"Error fetching table list for database '{db_name}': {e}")
+        return schema_model.SchemaModel().finish()
+
+@instrumentation.timed("db.load_outline")
+def fetch_schema_outline(connection, db_name, cancel_event=None):
+    """Like get_schema_outline, but errors are raised to the caller."""
+    model = schema_model.SchemaModel()
+    cursor = connection.cursor()
+    progress = _Progress(None, cancel_event)
+    try:
+        for table_name, table_rows in _query(cursor, _TABLE_OUTLINE_QUERY, (db_name,)):
+            model.add_table(table_name, table_rows)
+
+        progress.check_cancelled()
+        fk_rows = _query(cursor, _FOREIGN_KEYS_ALL_QUERY, (db_name,))
+        for fk_table, fk_column, pk_table, pk_column, constraint_name in fk_rows:
+            model.add_foreign_key(fk_table, fk_column, pk_table, pk_column, constraint_name)
+    except SchemaLoadCancelled:
+        if hasattr(connection, 'consume_results'):
+            connection.consume_results()
+        raise
+    finally:
+        cursor.close()
+
+    return model.finish()
+
+@instrumentation.timed("db.load_columns")
+def get_columns_for_tables(connection, db_name, table_names):
+    """
+    Fetches the columns of some tables of a database.
+    Returns {table_name: [{column_info}, ...]} with an entry for every requested
+    table, or None on error.
+    """
+    table_names = list(table_names)
+    try:
+        fetched = _fetch_columns_for_tables(connection, db_name, table_names, _Progress(None, None))
+    except Error as e:
+        print(f"Error fetching columns for database '{db_name}': {e}")
+        return None
+    return {table_name: fetched.get(table_name, []) for table_name in table_names}
+
+def _get_schema_with_cache(connection, db_name, cache, progress_callback, cancel_event):
+    """Serves a schema from the cache, refreshing only what changed since it was stored."""
+    host = connection_cache_key(connection)
+    fingerprint = get_schema_fingerprint(connection, db_name)
+
+    if fingerprint is not None and cache.get_fingerprint(host, db_name) == fingerprint:
+        cached = cache.load(host, db_name)
+        if cached is not None:
+            if progress_callback:
+                progress_callback(len(cached[0]), len(cached[0]))
+            return cached
+
+    schema = {}
+    foreign_keys = []
+    try:
+        progress = _Progress(progress_callback, cancel_event)
+        try:
+            table_versions = _fetch_table_versions(connection, db_name)
+            cached_versions = cache.get_table_versions(host, db_name)
+            changed = [table_name for table_name, version in table_versions.items()
+                       if cached_versions.get(table_name) != version]
+            removed = cached_versions.keys() - table_versions.keys()
+            cached = cache.load(host, db_name) if cached_versions else None
+
+            # A fingerprint change with no per-table change (e.g. an instant ALTER that
+            # kept CREATE_TIME) cannot be localised, so everything is refetched.
+            if cached is None or not (changed or removed) or len(changed) > len(table_versions) // 2:
+                schema = _fetch_columns_bulk(connection, db_name, progress)
+            else:
+                progress.total = len(changed)
+                fetched = _fetch_columns_for_tables(connection, db_name, changed, progress)
+                cached_schema = cached[0]
+                for table_name in table_versions:
+                    schema[table_name] = fetched.get(table_name, cached_schema.get(table_name, []))
+
+            progress.check_cancelled()
+            foreign_keys = _fetch_foreign_keys(connection, db_name)
+        except SchemaLoadCancelled:
+            if hasattr(connection, 'consume_results'):
+                connection.consume_results()
+            raise
+    except Error as e:
+        print(f"Error fetching schema or foreign keys for database '{db_name}': {e}")
+        return {}, []
+
+    if fingerprint is not None:
+        cache.store(host, db_name, fingerprint, schema, foreign_keys, table_versions)
+    return schema, foreign_keys
+
+_TABLE_VERSIONS_QUERY = """
+SELECT TABLE_NAME, CREATE_TIME, UPDATE_TIME
+FROM INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = %s
+ORDER BY TABLE_NAME;
+"""
+
+def _fetch_table_versions(connection, db_name):
+    """Returns {table_name: version} where version combines CREATE_TIME and UPDATE_TIME."""
+    rows = _execute_prepared(connection, _TABLE_VERSIONS_QUERY, (db_name,))
+    return {row['TABLE_NAME']: f"{row['CREATE_TIME']}|{row['UPDATE_TIME']}" for row in rows}
+
+class _Progress:
+    """
+    Tracks tables completed during a load, reporting progress and honouring cancellation.
+    Safe to share between introspection worker threads.
+    """
+
+    def __init__(self, callback, cancel_event):
+        self.callback = callback
+        self.cancel_event = cancel_event
+        self.total = 0
+        self.done = 0
+        self._lock = threading.Lock()
+
+    def check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SchemaLoadCancelled()
+
+    def table_done(self):
+        with self._lock:
+            self.done += 1
+            done = self.done
+        if done % PROGRESS_BATCH_SIZE == 0 or done == self.total:
+            self.check_cancelled()
+            if self.callback:
+                self.callback(done, self.total)
+
+def _column_details(col_info):
+    """Converts an INFORMATION_SCHEMA.COLUMNS row into the column dict used by the UI."""
+    return {
+        'name': col_info['COLUMN_NAME'],
+        'type': col_info['DATA_TYPE'],
+        'length': col_info['CHARACTER_MAXIMUM_LENGTH'],
+        'nullable': col_info['IS_NULLABLE'] == 'YES',
+        'key': col_info['COLUMN_KEY'],
+        'extra': col_info['EXTRA']
+    }
+
+_TABLES_QUERY = """
+SELECT TABLE_NAME
+FROM INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = %s
+ORDER BY TABLE_NAME;
+"""
+
+_COLUMNS_QUERY = """
+SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE, COLUMN_KEY, EXTRA
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA = %s
+ORDER BY TABLE_NAME, ORDINAL_POSITION;
+"""
+
+def _fetch_columns_bulk(connection, db_name, progress):
+    """
+    Fetches every table and column of the database in two round trips. Rows are
+    streamed as tuples by _iter_schema and turned into column dicts per table.
+    """
+    return {table_name: [{'name': name, 'type': data_type, 'length': length, 'nullable': nullable,
+                          'key': column_key, 'extra': extra}
+                         for name, data_type, length, nullable, column_key, extra in columns]
+            for table_name, columns in _iter_schema(connection, db_name, progress)}
+
+def _table_name_list(table_names):
+    """
+    Returns the placeholders and parameters of a TABLE_NAME IN (...) list. The list is
+    padded to a power of two (at most TABLE_NAME_BATCH_SIZE) by repeating the last
+    name, so lists of similar length share one prepared statement per connection.
+    """
+    size = 1
+    while size < len(table_names):
+        size *= 2
+    size = max(len(table_names), min(size, TABLE_NAME_BATCH_SIZE))
+    names = list(table_names) + [table_names[-1]] * (size - len(table_names))
+    return ", ".join(["%s"] * size), names
+
+def _fetch_columns_for_tables(connection, db_name, table_names, progress):
+    """Fetches the columns of the given tables, TABLE_NAME_BATCH_SIZE tables per query."""
+    schema = {}
+    for start in range(0, len(table_names), TABLE_NAME_BATCH_SIZE):
+        batch = table_names[start:start + TABLE_NAME_BATCH_SIZE]
+        placeholders, names = _table_name_list(batch)
+        query_columns = f"""
+        SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE, COLUMN_KEY, EXTRA
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+        ORDER BY TABLE_NAME, ORDINAL_POSITION;
+        """
+        for col_info in _execute_prepared(connection, query_columns, (db_name, *names)):
+            schema.setdefault(col_info['TABLE_NAME'], []).append(_column_details(col_info))
+        for _ in batch:
+            progress.table_done()
+    return schema
+
+_TABLE_COLUMNS_QUERY = """
+SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE, COLUMN_KEY, EXTRA
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+ORDER BY ORDINAL_POSITION;
+"""
+
+def _fetch_columns_per_table(connection, db_name, progress):
+    """Fetches the table list and then the columns of each table with one query per table."""
+    schema = {}
+
+    # Get all table names in the specified database
+    cursor = connection.cursor(dictionary=True)
+    try:
+        tables = [row[f'Tables_in_{db_name}'] for row in _query(cursor, f"SHOW TABLES FROM `{db_name}`")]
+    finally:
+        cursor.close()
+    progress.total = len(tables)
+    progress.check_cancelled()
+
+    # For each table, get its column details
+    for table_name in tables:
+        schema[table_name] = [_column_details(col_info)
+                              for col_info in _execute_prepared(connection, _TABLE_COLUMNS_QUERY, (db_name, table_name))]
+        progress.table_done()
+
+    return schema
+
+_FOREIGN_KEYS_QUERY = """
+SELECT
+    kcu.TABLE_NAME AS fk_table,
+    kcu.COLUMN_NAME AS fk_column,
+    kcu.REFERENCED_TABLE_NAME AS pk_table,
+    kcu.REFERENCED_COLUMN_NAME AS pk_column,
+    kcu.CONSTRAINT_NAME
+FROM
+    INFORMATION_SCHEMA.KEY_COLUMN_USAGE AS kcu
+WHERE
+    kcu.TABLE_SCHEMA = %s
+    AND kcu.REFERENCED_TABLE_NAME IS NOT NULL
+    {table_filter};
+"""
+
+_FOREIGN_KEYS_ALL_QUERY = _FOREIGN_KEYS_QUERY.format(table_filter="")
+
+def _fetch_foreign_keys(connection, db_name, table_names=None):
+    """
+    Fetches the foreign key relationships of the database in a single query,
+    restricted to the FKs declared on table_names if given.
+    """
+    foreign_keys = []
+
+    params = (db_name,)
+    table_filter = ""
+    if table_names:
+        placeholders, names = _table_name_list(table_names)
+        table_filter = f"AND kcu.TABLE_NAME IN ({placeholders})"
+        params += tuple(names)
+    elif table_names is not None:
+        return foreign_keys
+
+    for fk_info in _execute_prepared(connection, _FOREIGN_KEYS_QUERY.format(table_filter=table_filter), params):
+        foreign_keys.append({
+            'fk_table': fk_info['fk_table'],
+            'fk_column': fk_info['fk_column'],
+            'pk_table': fk_info['pk_table'],
+            'pk_column': fk_info['pk_column'],
+            'constraint_name': fk_info['CONSTRAINT_NAME']
+        })
+
+    return foreign_keys
+
+def get_schema_parallel(pool, db_name, max_workers=None, shard_size=TABLE_NAME_BATCH_SIZE,
+                        progress_callback=None, cancel_event=None):
+    """
+    Introspects one database over several pooled connections at once.
+    The table list is split into shards of shard_size tables whose columns and
+    foreign keys are fetched concurrently. Returns the same (schema_dict,
+    foreign_keys_list) tuple as get_schema_for_database.
+    """
+    return get_all_schemas(pool, [db_name], max_workers, shard_size,
+                           progress_callback, cancel_event).get(db_name, ({}, []))
+
+def get_all_schemas(pool, databases=None, max_workers=None, shard_size=TABLE_NAME_BATCH_SIZE,
+                    progress_callback=None, cancel_event=None):
+    """
+    Introspects several databases (all user databases if databases is None) in one run.
+    Returns {db_name: (schema_dict, foreign_keys_list)}, or {} on error.
+
+    Work is split into shards of shard_size tables, spread over at most max_workers
+    threads (never more than the pool size). At most two shards per worker are queued
+    ahead, so a slow server throttles how fast new queries are issued. progress_callback
+    and cancel_event behave as in get_schema_for_database, counted over all databases.
+    """
+    try:
+        return fetch_all_schemas(pool, databases, max_workers, shard_size, progress_callback, cancel_event)
+    except Error as e:
+        print(f"Error fetching schemas in parallel: {e}")
+        return {}
+
+@instrumentation.timed("db.load_all_schemas")
+def fetch_all_schemas(pool, databases=None, max_workers=None, shard_size=TABLE_NAME_BATCH_SIZE,
+                      progress_callback=None, cancel_event=None):
+    """Like get_all_schemas, but errors are raised to the caller."""
+    workers = min(max_workers or pool.pool_size, pool.pool_size)
+    progress = _Progress(progress_callback, cancel_event)
+    results = {}
+
+    with pool.connection() as connection:
+        if databases is None:
+            databases = get_all_databases(connection)
+        shards = []
+        for db_name in databases:
+            tables = _fetch_table_names(connection, db_name)
+            results[db_name] = {table_name: [] for table_name in tables}
+            progress.total += len(tables)
+            for start in range(0, len(tables), shard_size):
+                shards.append((db_name, tables[start:start + shard_size]))
+
+    foreign_keys = {db_name: [] for db_name in databases}
+    for db_name, shard_schema, shard_fks in _run_shards(pool, shards, workers, progress):
+        results[db_name].update(shard_schema)
+        foreign_keys[db_name].extend(shard_fks)
+
+    return {db_name: (results[db_name], foreign_keys[db_name]) for db_name in databases}
+
+def fetch_schema_model_parallel(pool, db_name, progress_callback=None, cancel_event=None):
+    """
+    Reads the schema of a database into a SchemaModel over several pooled connections
+    at once, as get_schema_parallel does. Errors are raised to the caller.
+    """
+    schema, foreign_keys = fetch_all_schemas(pool, [db_name], progress_callback=progress_callback,
+                                             cancel_event=cancel_event)[db_name]
+    return schema_model.SchemaModel.from_dicts(schema, foreign_keys)
+
+def _fetch_table_names(connection, db_name):
+    cursor = connection.cursor()
+    try:
+        return [table_name for (table_name,) in _query(cursor, _TABLES_QUERY, (db_name,))]
+    finally:
+        cursor.close()
+
+def _run_shards(pool, shards, workers, progress):
+    """
+    Fetches shards on a thread pool, keeping at most 2 * workers shards in flight.
+    Yields (db_name, schema_part, foreign_keys_part) as shards complete.
+    """
+    def fetch_shard(db_name, table_names):
+        progress.check_cancelled()
+        with pool.connection() as connection:
+            schema_part = _fetch_columns_for_tables(connection, db_name, table_names, progress)
+            return db_name, schema_part, _fetch_foreign_keys(connection, db_name, table_names)
+
+    pending = iter(shards)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        try:
+            while True:
+                for shard in pending:
+                    in_flight.add(executor.submit(fetch_shard, *shard))
+                    if len(in_flight) >= 2 * workers:
+                        break
+                if not in_flight:
+                    return
+                done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
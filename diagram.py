@@ -0,0 +1,117 @@
+"""
+Table geometry shared by the Tk canvas and the headless exporter.
+
+Nothing here depends on Tk: text widths come from whichever measurer is passed
+in (text_metrics.TextMeasurer on screen, text_metrics.ApproximateTextMeasurer
+headless), and all sizes are in canvas units at zoom 1.
+"""
+
+# Table styling, in canvas units at zoom 1.
+TABLE_HEADER_HEIGHT = 30
+COLUMN_LINE_HEIGHT = 20
+TEXT_PADDING = 15
+RECT_PADDING = 10
+MIN_TABLE_WIDTH = 250
+FONT_TABLE_NAME = ("Arial", 14, "bold")
+FONT_COLUMN = ("Arial", 10)
+
+# Bundled relationship paths meet at junctions this far beside the columns they join.
+BUNDLE_OFFSET = 20
+
+def column_display_parts(table_name, column_info, fk_index):
+    """
+    Returns the column display string split into (name, " (TYPE)", " [KEYS]") parts.
+    The type and key parts repeat across tables, so their widths are measured once.
+    """
+    name = column_info['name']
+    data_type = column_info['type'].upper()
+
+    if column_info['length'] is not None and column_info['length'] != 0:
+        data_type += f"({column_info['length']})"
+
+    key_info_parts = []
+    if column_info['key'] == 'PRI':
+        key_info_parts.append("[PK]")
+    elif column_info['key'] == 'UNI':
+        key_info_parts.append("[UN]")
+
+    if fk_index.is_fk_column(table_name, name):
+        key_info_parts.append("[FK]")
+
+    key_info = "".join(key_info_parts)
+
+    if key_info:
+        return (name, f" ({data_type})", f" {key_info}")
+    return (name, f" ({data_type})")
+
+def measure_table(table_name, columns, fk_index, measurer):
+    """
+    Computes the size of a table box.
+    Returns (width, height, column_parts, anchors) where column_parts holds the
+    display parts of each column and anchors maps each column name to the
+    (left_x, right_x, mid_y) of its text, relative to the table's top-left corner.
+    """
+    # Format every column once; the parts are reused for measuring and drawing.
+    column_parts = [column_display_parts(table_name, col, fk_index) for col in columns]
+    anchors = {}
+
+    max_content_width = measurer.measure(FONT_TABLE_NAME, table_name)
+
+    # Calculate width needed for columns, recording where relationship lines attach
+    for row, (col, parts) in enumerate(zip(columns, column_parts)):
+        column_text_width = measurer.measure_parts(FONT_COLUMN, parts)
+        if column_text_width > max_content_width:
+            max_content_width = column_text_width
+        mid_y = TABLE_HEADER_HEIGHT + RECT_PADDING + row * COLUMN_LINE_HEIGHT + COLUMN_LINE_HEIGHT / 2
+        anchors[col['name']] = (TEXT_PADDING, TEXT_PADDING + column_text_width, mid_y)
+
+    table_width = max_content_width + (2 * RECT_PADDING) + (2 * TEXT_PADDING)
+
+    if table_width < MIN_TABLE_WIDTH:
+        table_width = MIN_TABLE_WIDTH
+
+    table_height = TABLE_HEADER_HEIGHT + (len(columns) * COLUMN_LINE_HEIGHT) + (2 * RECT_PADDING)
+    return table_width, table_height, column_parts, anchors
+
+def relationship_line(fk_box, pk_box, fk_anchor=None, pk_anchor=None):
+    """
+    Returns (start_x, start_y, end_x, end_y) of a foreign key line: from the right edge
+    of the FK column text to the left edge of the PK column text. Boxes are
+    (x1, y1, x2, y2); without anchors the line joins the middles of the box sides.
+    """
+    if fk_anchor and pk_anchor:
+        return (fk_box[0] + fk_anchor[1], fk_box[1] + fk_anchor[2],
+                pk_box[0] + pk_anchor[0], pk_box[1] + pk_anchor[2])
+    return (fk_box[2], (fk_box[1] + fk_box[3]) / 2,
+            pk_box[0], (pk_box[1] + pk_box[3]) / 2)
+
+def relationship_path(fk_box, pk_box, anchor_pairs, bundle=False):
+    """
+    Returns the points (x0, y0, x1, y1, ...) of the single path drawn for all foreign
+    keys from one table to another. anchor_pairs holds the (fk_anchor, pk_anchor) of
+    each foreign key, as passed to relationship_line.
+
+    One foreign key is a straight line. Several are drawn as a tree traced by one
+    path: every FK column joins a junction beside the FK table, a trunk runs to a
+    junction in front of the PK table, and a branch runs from there to every
+    referenced column. The path ends at a referenced column, where an arrow goes.
+    With bundle, even a single line ends through the junction in front of its
+    referenced column, so the lines of all tables referencing that column share
+    their last segment.
+    """
+    lines = [relationship_line(fk_box, pk_box, fk_anchor, pk_anchor) for fk_anchor, pk_anchor in anchor_pairs]
+    starts = list(dict.fromkeys((x1, y1) for x1, y1, _, _ in lines))
+    ends = list(dict.fromkeys((x2, y2) for _, _, x2, y2 in lines))
+    if len(starts) == 1 and len(ends) == 1 and not bundle:
+        return lines[0]
+
+    points = [starts[0]]
+    if len(starts) > 1:
+        junction = (max(x for x, _ in starts) + BUNDLE_OFFSET, sum(y for _, y in starts) / len(starts))
+        points = []
+        for start in starts:
+            points += [start, junction]
+    junction = (min(x for x, _ in ends) - BUNDLE_OFFSET, sum(y for _, y in ends) / len(ends))
+    for end in ends:
+        points += [junction, end]
+    return tuple(v for point in points for v in point)
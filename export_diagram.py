@@ -0,0 +1,275 @@
+"""
+Headless schema diagram export.
+
+Introspects one or more databases and writes a diagram per database as SVG,
+Graphviz DOT, JSON or PNG, without a display or a Tk interpreter. Databases are
+processed in parallel worker processes, each with its own connection. PNG output
+needs the Graphviz `neato` program on the PATH.
+
+Example:
+    python export_diagram.py --host localhost --user root --all-databases --format svg --output-dir diagrams
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import getpass
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+import db_connector
+import diagram
+import fk_index
+import instrumentation
+import layout
+import text_metrics
+from diagram import TABLE_HEADER_HEIGHT, COLUMN_LINE_HEIGHT, TEXT_PADDING, RECT_PADDING, FONT_TABLE_NAME, FONT_COLUMN
+
+FORMATS = ('svg', 'dot', 'json', 'png')
+
+def build_diagram(db_schema, foreign_keys, layout_name, measurer=None):
+    """
+    Measures and lays out a schema without Tk.
+    Returns a dict with 'tables' ({table_name: {'box', 'columns', 'anchors'}}),
+    'relationships' ([(fk, line), ...]) and the overall 'width' and 'height'.
+    """
+    measurer = measurer or text_metrics.ApproximateTextMeasurer()
+    index = fk_index.ForeignKeyIndex(foreign_keys)
+
+    sizes = {}
+    tables = {}
+    for table_name, columns in db_schema.items():
+        width, height, column_parts, anchors = diagram.measure_table(table_name, columns, index, measurer)
+        sizes[table_name] = (width, height)
+        tables[table_name] = {'columns': ["".join(parts) for parts in column_parts], 'anchors': anchors}
+
+    edges = [(fk['fk_table'], fk['pk_table']) for fk in index]
+    positions = layout.compute_layout(layout_name, sizes, edges, max_width=2000)
+
+    for table_name, (width, height) in sizes.items():
+        x1, y1 = positions[table_name]
+        tables[table_name]['box'] = (x1, y1, x1 + width, y1 + height)
+
+    relationships = []
+    for fk in index:
+        if fk['fk_table'] in tables and fk['pk_table'] in tables:
+            fk_table = tables[fk['fk_table']]
+            pk_table = tables[fk['pk_table']]
+            line = diagram.relationship_line(fk_table['box'], pk_table['box'],
+                                             fk_table['anchors'].get(fk['fk_column']),
+                                             pk_table['anchors'].get(fk['pk_column']))
+            relationships.append((fk, line))
+
+    boxes = [table['box'] for table in tables.values()]
+    return {
+        'tables': tables,
+        'relationships': relationships,
+        'width': max((box[2] for box in boxes), default=0) + layout.DIAGRAM_MARGIN,
+        'height': max((box[3] for box in boxes), default=0) + layout.DIAGRAM_MARGIN,
+    }
+
+def write_svg(out, db_name, built):
+    """Streams a diagram as SVG, one table at a time."""
+    name_size = FONT_TABLE_NAME[1] * text_metrics.PIXELS_PER_POINT
+    column_size = FONT_COLUMN[1] * text_metrics.PIXELS_PER_POINT
+
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{built["width"]:.0f}" height="{built["height"]:.0f}" '
+              f'font-family="{FONT_COLUMN[0]}, Helvetica, sans-serif">\n')
+    out.write(f'<title>{escape(db_name)}</title>\n')
+    out.write('<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" '
+              'orient="auto-start-reverse"><path d="M 0 0 L 10 5 L 0 10 z" fill="blue"/></marker></defs>\n')
+    out.write('<rect width="100%" height="100%" fill="lightgray"/>\n')
+
+    for table_name, table in built['tables'].items():
+        x1, y1, x2, y2 = table['box']
+        out.write(f'<g id={quoteattr("table-" + table_name)}>\n')
+        out.write(f'<rect x="{x1:.1f}" y="{y1:.1f}" width="{x2 - x1:.1f}" height="{y2 - y1:.1f}" '
+                  'fill="lightblue" stroke="black" stroke-width="2"/>\n')
+        out.write(f'<text x="{(x1 + x2) / 2:.1f}" y="{y1 + TABLE_HEADER_HEIGHT / 2:.1f}" font-size="{name_size:.1f}" '
+                  f'font-weight="bold" fill="navy" text-anchor="middle" dominant-baseline="central">{escape(table_name)}</text>\n')
+        column_y = y1 + TABLE_HEADER_HEIGHT + RECT_PADDING
+        for column_text in table['columns']:
+            out.write(f'<text x="{x1 + TEXT_PADDING:.1f}" y="{column_y:.1f}" font-size="{column_size:.1f}" '
+                      f'dominant-baseline="hanging">{escape(column_text)}</text>\n')
+            column_y += COLUMN_LINE_HEIGHT
+        out.write('</g>\n')
+
+    for fk, (start_x, start_y, end_x, end_y) in built['relationships']:
+        out.write(f'<line x1="{start_x:.1f}" y1="{start_y:.1f}" x2="{end_x:.1f}" y2="{end_y:.1f}" '
+                  f'stroke="blue" stroke-width="2" marker-end="url(#arrow)">'
+                  f'<title>{escape(_relationship_label(fk))}</title></line>\n')
+
+    out.write('</svg>\n')
+
+def write_dot(out, db_name, built):
+    """
+    Streams a diagram as Graphviz DOT. Tables become HTML-label nodes with one port
+    per column, and node positions are included so `neato -n2` reproduces the layout.
+    """
+    out.write(f'digraph {_dot_id(db_name)} {{\n')
+    out.write('  graph [splines=true, overlap=true];\n')
+    out.write('  node [shape=plaintext, fontname="Arial"];\n')
+    out.write('  edge [color=blue];\n')
+
+    height = built['height']
+    ports = {}
+    for table_name, table in built['tables'].items():
+        x1, y1, x2, y2 = table['box']
+        rows = [f'<TR><TD BGCOLOR="lightblue"><FONT COLOR="navy"><B>{escape(table_name)}</B></FONT></TD></TR>']
+        for i, (column_name, column_text) in enumerate(zip(table['anchors'], table['columns'])):
+            ports[(table_name, column_name)] = f"c{i}"
+            rows.append(f'<TR><TD PORT="c{i}" ALIGN="LEFT">{escape(column_text)}</TD></TR>')
+        # Graphviz positions are node centres in points with y pointing up.
+        pos = f"{(x1 + x2) / 2 * 0.75:.1f},{(height - (y1 + y2) / 2) * 0.75:.1f}!"
+        out.write(f'  {_dot_id(table_name)} [pos="{pos}", label=<<TABLE BORDER="1" CELLBORDER="0" '
+                  f'CELLSPACING="0" BGCOLOR="white">{"".join(rows)}</TABLE>>];\n')
+
+    for fk, _ in built['relationships']:
+        tail = _dot_id(fk['fk_table'])
+        head = _dot_id(fk['pk_table'])
+        tail_port = ports.get((fk['fk_table'], fk['fk_column']))
+        head_port = ports.get((fk['pk_table'], fk['pk_column']))
+        if tail_port:
+            tail += f":{tail_port}:e"
+        if head_port:
+            head += f":{head_port}:w"
+        out.write(f'  {tail} -> {head} [tooltip={_dot_id(_relationship_label(fk))}];\n')
+
+    out.write('}\n')
+
+def write_json(out, db_name, built):
+    """Streams a diagram as JSON: table boxes, column texts and relationship lines."""
+    out.write('{\n')
+    out.write(f'"database": {json.dumps(db_name)},\n')
+    out.write(f'"width": {built["width"]}, "height": {built["height"]},\n')
+    out.write('"tables": [\n')
+    for i, (table_name, table) in enumerate(built['tables'].items()):
+        record = {'name': table_name, 'box': table['box'], 'columns': table['columns']}
+        out.write(("," if i else "") + json.dumps(record) + "\n")
+    out.write('],\n"relationships": [\n')
+    for i, (fk, line) in enumerate(built['relationships']):
+        out.write(("," if i else "") + json.dumps({**fk, 'line': line}) + "\n")
+    out.write(']\n}\n')
+
+WRITERS = {'svg': write_svg, 'dot': write_dot, 'json': write_json}
+
+def _relationship_label(fk):
+    return f"{fk['fk_table']}.{fk['fk_column']} -> {fk['pk_table']}.{fk['pk_column']}"
+
+def _dot_id(name):
+    return '"' + str(name).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def write_diagram(path, fmt, db_name, built):
+    """Writes one diagram file atomically (via a temporary file in the same directory)."""
+    directory = os.path.dirname(path) or "."
+    writer_format = 'dot' if fmt == 'png' else fmt
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=f".{writer_format}")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            WRITERS[writer_format](out, db_name, built)
+        if fmt == 'png':
+            subprocess.run(["neato", "-n2", "-Tpng", "-o", path, temp_path], check=True)
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+# Connection pool of the current worker process, set up by _init_worker.
+_worker_pool = None
+
+def _init_worker(host, username, password):
+    global _worker_pool
+    _worker_pool = db_connector.ConnectionPool(host, username, password, pool_size=1)
+
+def export_database(db_name, fmt, layout_name, output_dir, trace=False, profile=False):
+    """
+    Introspects, lays out and writes one database. Runs in a worker process.
+    With trace=True the timings are written to <db_name>.trace.json (Chrome trace
+    format); with profile=True cProfile stats are written to <db_name>.prof.
+    """
+    start = time.perf_counter()
+    if trace:
+        instrumentation.enable()
+        instrumentation.reset()
+    base_path = os.path.join(output_dir, db_name)
+
+    with instrumentation.profile(base_path + ".prof") if profile else contextlib.nullcontext():
+        with _worker_pool.connection() as connection:
+            model = db_connector.fetch_schema_model(connection, db_name)
+        if not model:
+            raise ValueError(f"no tables found in database '{db_name}'")
+        with instrumentation.span("diagram", tables=len(model)):
+            built = build_diagram(model.schema_view(), model.foreign_keys_view(), layout_name)
+        path = f"{base_path}.{fmt}"
+        with instrumentation.span("write", format=fmt):
+            write_diagram(path, fmt, db_name, built)
+
+    if trace:
+        instrumentation.export_chrome_trace(base_path + ".trace.json")
+    return path, len(model), time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", help="Defaults to $MYSQL_PWD, or a prompt when run interactively")
+    parser.add_argument("--database", action="append", default=[], help="Database to export (repeatable)")
+    parser.add_argument("--all-databases", action="store_true", help="Export every non-system database")
+    parser.add_argument("--format", choices=FORMATS, default="svg")
+    parser.add_argument("--layout", choices=layout.available_layouts(),
+                        default="layered" if "layered" in layout.available_layouts() else "grid")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--trace", action="store_true", help="Also write <database>.trace.json with phase timings")
+    parser.add_argument("--profile", action="store_true", help="Also write <database>.prof cProfile stats")
+    args = parser.parse_args(argv)
+
+    password = args.password
+    if password is None:
+        password = os.environ.get("MYSQL_PWD")
+    if password is None:
+        password = getpass.getpass("MySQL password: ") if sys.stdin.isatty() else ""
+
+    if args.format == "png" and shutil.which("neato") is None:
+        parser.error("PNG output needs the Graphviz 'neato' program on the PATH")
+
+    databases = list(args.database)
+    if args.all_databases:
+        pool = db_connector.create_pool(args.host, args.user, password, pool_size=1)
+        if pool is None:
+            return 1
+        with pool.connection() as connection:
+            databases += [db for db in db_connector.get_all_databases(connection) if db not in databases]
+        pool.close()
+    if not databases:
+        parser.error("no databases given; use --database or --all-databases")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    failures = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, min(args.processes, len(databases))),
+                                                initializer=_init_worker,
+                                                initargs=(args.host, args.user, password)) as executor:
+        futures = {executor.submit(export_database, db_name, args.format, args.layout, args.output_dir,
+                                   args.trace, args.profile): db_name
+                   for db_name in databases}
+        for future in concurrent.futures.as_completed(futures):
+            db_name = futures[future]
+            try:
+                path, table_count, seconds = future.result()
+                print(f"{db_name}: {table_count} tables -> {path} ({seconds:.2f}s)")
+            except Exception as e:
+                failures += 1
+                print(f"{db_name}: export failed: {e}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Graph queries over the foreign keys of a fk_index.ForeignKeyIndex: neighbourhoods,
+join paths and cycles. Tables are nodes and every foreign key is an edge from the
+referencing to the referenced table.
+
+The queries only visit the tables around their answer, not the whole database,
+and return table names, so a result can be drawn on its own together with
+subgraph_foreign_keys().
+"""
+import collections
+
+# Directions followed by neighbourhood().
+OUTGOING = "outgoing"   # Tables the start table references, transitively
+INCOMING = "incoming"   # Tables referencing the start table, transitively
+BOTH = "both"
+
+def linked_tables(index, table_name, direction=BOTH):
+    """Yields the tables one foreign key away from table_name, possibly repeated."""
+    if direction != INCOMING:
+        for fk in index.edges_from(table_name):
+            yield fk['pk_table']
+    if direction != OUTGOING:
+        for fk in index.edges_to(table_name):
+            yield fk['fk_table']
+
+def neighbourhood(index, table_name, hops=1, direction=BOTH, max_tables=None):
+    """
+    Returns {table_name: distance} for the tables within hops foreign keys of
+    table_name, which is included at distance 0. Tables are found breadth-first,
+    so the dict lists closer tables first; with max_tables the search stops once
+    that many tables are found.
+    """
+    distances = {table_name: 0}
+    frontier = [table_name]
+    for distance in range(1, hops + 1):
+        next_frontier = []
+        for current in frontier:
+            for linked in linked_tables(index, current, direction):
+                if linked in distances:
+                    continue
+                if max_tables is not None and len(distances) >= max_tables:
+                    return distances
+                distances[linked] = distance
+                next_frontier.append(linked)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return distances
+
+def join_path(index, from_table, to_table, max_hops=None):
+    """
+    Returns the shortest list of tables [from_table, ..., to_table] in which each
+    pair of neighbours is linked by a foreign key in either direction, or None if
+    the tables are not connected (within max_hops foreign keys). The search runs
+    from both ends, always growing the smaller side.
+    """
+    if from_table == to_table:
+        return [from_table]
+
+    # Per side: {table: (parent, depth)} of the tables reached, and the last layer.
+    reached = ({from_table: (None, 0)}, {to_table: (None, 0)})
+    frontiers = [[from_table], [to_table]]
+    hops = 0
+    while frontiers[0] and frontiers[1]:
+        if max_hops is not None and hops >= max_hops:
+            return None
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        seen, other = reached[side], reached[1 - side]
+        next_frontier = []
+        meetings = []
+        for current in frontiers[side]:
+            depth = seen[current][1] + 1
+            for linked in linked_tables(index, current):
+                if linked in seen:
+                    continue
+                seen[linked] = (current, depth)
+                if linked in other:
+                    meetings.append((depth + other[linked][1], linked))
+                next_frontier.append(linked)
+        if meetings:
+            # Every meeting in this layer is a candidate; the shortest one wins.
+            _, middle = min(meetings)
+            return _trace(reached[0], middle)[::-1] + _trace(reached[1], middle)[1:]
+        frontiers[side] = next_frontier
+        hops += 1
+    return None
+
+def _trace(reached, table_name):
+    """Follows parents from table_name back to the start of a search."""
+    path = []
+    while table_name is not None:
+        path.append(table_name)
+        table_name = reached[table_name][0]
+    return path
+
+def path_foreign_keys(index, tables):
+    """The foreign keys linking each pair of neighbours in a join_path() result."""
+    foreign_keys = []
+    for a, b in zip(tables, tables[1:]):
+        foreign_keys.extend(fk for fk in index.edges_of(a)
+                            if {fk['fk_table'], fk['pk_table']} == {a, b})
+    return foreign_keys
+
+def subgraph_foreign_keys(index, tables):
+    """The foreign keys whose both ends are in tables (a set or dict)."""
+    return [fk for table_name in tables for fk in index.edges_from(table_name) if fk['pk_table'] in tables]
+
+def strongly_connected_components(index):
+    """
+    Returns the foreign key cycles of a schema as strongly connected components:
+    lists of tables that all reach each other through foreign keys. Single tables
+    are only included when they reference themselves. Iterative Tarjan, linear in
+    the number of tables and foreign keys.
+    """
+    tables = list(dict.fromkeys(table_name for fk in index for table_name in (fk['fk_table'], fk['pk_table'])))
+    order = {}      # {table: discovery index}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in tables:
+        if root in order:
+            continue
+        work = [(root, iter(index.edges_from(root)))]
+        order[root] = low[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            table_name, edges = work[-1]
+            for fk in edges:
+                linked = fk['pk_table']
+                if linked not in order:
+                    order[linked] = low[linked] = len(order)
+                    stack.append(linked)
+                    on_stack.add(linked)
+                    work.append((linked, iter(index.edges_from(linked))))
+                    break
+                if linked in on_stack:
+                    low[table_name] = min(low[table_name], order[linked])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[table_name])
+                if low[table_name] == order[table_name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == table_name:
+                            break
+                    if len(component) > 1 or any(fk['pk_table'] == table_name
+                                                 for fk in index.edges_from(table_name)):
+                        components.append(component[::-1])
+    return components
+
+def shortest_cycle(index, table_name, within=None):
+    """
+    Returns the shortest foreign key cycle through table_name as a list of tables
+    [table_name, ..., table_name], or None if it is not on a cycle. Pass the
+    table's strongly connected component as within (a set) to search only there.
+    """
+    reached = {table_name: (None, 0)}
+    queue = collections.deque([table_name])
+    while queue:
+        current = queue.popleft()
+        for linked in linked_tables(index, current, OUTGOING):
+            if linked == table_name:
+                return _trace(reached, current)[::-1] + [table_name]
+            if linked in reached or (within is not None and linked not in within):
+                continue
+            reached[linked] = (current, reached[current][1] + 1)
+            queue.append(linked)
+    return None
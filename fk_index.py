@@ -0,0 +1,51 @@
+class ForeignKeyIndex:
+    """
+    Lookup structures over a foreign key list as returned by
+    db_connector.get_schema_for_database. Built once per schema load so that
+    column formatting, relationship drawing and graph features can answer
+    FK questions without scanning the whole list.
+    """
+
+    def __init__(self, foreign_keys=()):
+        self.foreign_keys = list(foreign_keys)
+        self.fk_columns = set()   # {(fk_table, fk_column), ...}
+        self.pk_columns = set()   # {(pk_table, pk_column), ...} that are referenced
+        self.outgoing = {}        # {fk_table: [fk, ...]} edges leaving a table
+        self.incoming = {}        # {pk_table: [fk, ...]} edges arriving at a table
+
+        for fk in self.foreign_keys:
+            self.fk_columns.add((fk['fk_table'], fk['fk_column']))
+            self.pk_columns.add((fk['pk_table'], fk['pk_column']))
+            self.outgoing.setdefault(fk['fk_table'], []).append(fk)
+            self.incoming.setdefault(fk['pk_table'], []).append(fk)
+
+    def is_fk_column(self, table_name, column_name):
+        return (table_name, column_name) in self.fk_columns
+
+    def is_referenced_column(self, table_name, column_name):
+        return (table_name, column_name) in self.pk_columns
+
+    def edges_from(self, table_name):
+        """Foreign keys declared on table_name."""
+        return self.outgoing.get(table_name, [])
+
+    def edges_to(self, table_name):
+        """Foreign keys that reference table_name."""
+        return self.incoming.get(table_name, [])
+
+    def edges_of(self, table_name):
+        """All foreign keys touching table_name, self-references listed once."""
+        return self.edges_from(table_name) + [fk for fk in self.edges_to(table_name) if fk['fk_table'] != table_name]
+
+    def neighbours(self, table_name):
+        """Tables directly linked to table_name by a foreign key in either direction."""
+        linked = {fk['pk_table'] for fk in self.edges_from(table_name)}
+        linked.update(fk['fk_table'] for fk in self.edges_to(table_name))
+        linked.discard(table_name)
+        return linked
+
+    def __len__(self):
+        return len(self.foreign_keys)
+
+    def __iter__(self):
+        return iter(self.foreign_keys)
@@ -0,0 +1,148 @@
+"""
+Timing spans and counters for the fetch, layout and render phases.
+
+Recording is off until enable() is called (or MYSQL_VISUALIZER_TRACE is set in the
+environment), and span() then costs next to nothing. Recorded data can be read
+with summary(), or written with export_json() and export_chrome_trace(); the
+latter loads in chrome://tracing and Perfetto.
+
+    with instrumentation.span("layout", algorithm="layered"):
+        ...
+    instrumentation.count("db.rows", len(rows))
+"""
+import collections
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+
+# Spans kept in memory; the oldest are dropped first.
+MAX_SPANS = 100000
+
+_lock = threading.Lock()
+_spans = collections.deque(maxlen=MAX_SPANS)   # (name, thread_id, start_ns, duration_ns, args)
+_counters = collections.Counter()
+_phases = {}                                   # {name: [count, total_ns, max_ns]}
+_epoch_ns = time.perf_counter_ns()
+enabled = bool(os.environ.get("MYSQL_VISUALIZER_TRACE"))
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+def reset():
+    """Drops all recorded spans and counters."""
+    global _epoch_ns
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _phases.clear()
+        _epoch_ns = time.perf_counter_ns()
+
+class _Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter_ns() - self.start
+        with _lock:
+            _spans.append((self.name, threading.get_ident(), self.start, duration, self.args))
+            phase = _phases.get(self.name)
+            if phase is None:
+                _phases[self.name] = [1, duration, duration]
+            else:
+                phase[0] += 1
+                phase[1] += duration
+                if duration > phase[2]:
+                    phase[2] = duration
+        return False
+
+_NO_SPAN = contextlib.nullcontext()
+
+def span(name, **args):
+    """Context manager timing one occurrence of a phase. args are stored with the span."""
+    if not enabled:
+        return _NO_SPAN
+    return _Span(name, args)
+
+def timed(name):
+    """Decorator recording each call of the function as a span."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with _Span(name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    """Adds n to a counter."""
+    if enabled:
+        with _lock:
+            _counters[name] += n
+
+def summary():
+    """
+    Returns {'phases': {name: {'count', 'total_ms', 'max_ms'}}, 'counters': {name: value}}
+    for everything recorded since the last reset().
+    """
+    with _lock:
+        phases = {name: {'count': n, 'total_ms': total / 1e6, 'max_ms': longest / 1e6}
+                  for name, (n, total, longest) in _phases.items()}
+        counters = dict(_counters)
+    return {'phases': phases, 'counters': counters}
+
+def format_summary():
+    """summary() as lines of text, slowest phases first, for the debug overlay and logs."""
+    data = summary()
+    lines = [f"{name:<24} {phase['count']:6d}x {phase['total_ms']:9.1f} ms (max {phase['max_ms']:.1f})"
+             for name, phase in sorted(data['phases'].items(), key=lambda item: -item[1]['total_ms'])]
+    lines += [f"{name:<24} {value:>10,}" for name, value in sorted(data['counters'].items())]
+    return "\n".join(lines)
+
+def export_json(path):
+    """Writes summary() plus the raw spans (times in ms since reset) as JSON."""
+    with _lock:
+        spans = [{'name': name, 'thread': thread_id, 'start_ms': (start - _epoch_ns) / 1e6,
+                  'duration_ms': duration / 1e6, 'args': args}
+                 for name, thread_id, start, duration, args in _spans]
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump({**summary(), 'spans': spans}, out, indent=1, default=str)
+
+def export_chrome_trace(path):
+    """Writes the spans in the Chrome trace event format, with the counters as metadata."""
+    pid = os.getpid()
+    with _lock:
+        events = [{'name': name, 'cat': name.split(".")[0], 'ph': "X", 'pid': pid, 'tid': thread_id,
+                   'ts': (start - _epoch_ns) / 1000, 'dur': duration / 1000, 'args': args}
+                  for name, thread_id, start, duration, args in _spans]
+        counters = dict(_counters)
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump({'traceEvents': events, 'displayTimeUnit': "ms", 'otherData': {'counters': counters}},
+                  out, default=str)
+
+@contextlib.contextmanager
+def profile(path):
+    """
+    Runs the enclosed block under cProfile and writes the stats to path (for
+    pstats or snakeviz). Only the calling thread is profiled.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,321 @@
+"""
+Table placement algorithms for schema diagrams.
+
+Every layout takes sizes ({table_name: (width, height)}) and edges (a list of
+(fk_table, pk_table) pairs) and returns {table_name: (x, y)}, the top-left
+corner of each table. Layouts know nothing about Tk, so they can also run on a
+worker thread or without a display.
+
+The layered and force-directed layouts need NumPy; without it only the grid
+layout is available.
+"""
+import hashlib
+import math
+
+import instrumentation
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Gap between tables, in canvas units.
+TABLE_SPACING = 30
+# Margin around the whole diagram.
+DIAGRAM_MARGIN = 50
+
+@instrumentation.timed("layout.grid")
+def grid_layout(sizes, edges, max_width=1000):
+    """Places tables left to right in the given order, wrapping rows at max_width."""
+    positions = {}
+    current_x = DIAGRAM_MARGIN
+    current_y = DIAGRAM_MARGIN
+    row_max_height = 0 # To track the tallest table in the current row
+
+    for table_name, (width, height) in sizes.items():
+        if current_x > DIAGRAM_MARGIN and current_x + width > max_width:
+            current_x = DIAGRAM_MARGIN
+            current_y += row_max_height + TABLE_SPACING
+            row_max_height = 0
+
+        positions[table_name] = (current_x, current_y)
+        current_x += width + TABLE_SPACING
+        if height > row_max_height:
+            row_max_height = height
+
+    return positions
+
+@instrumentation.timed("layout.layered")
+def layered_layout(sizes, edges, max_width=None, sweeps=8):
+    """
+    Hierarchical layout driven by the FK graph. Referenced tables are placed in
+    layers above the tables that reference them (cycles are broken first), and
+    the tables of each layer are ordered by the barycenter of their neighbours to
+    reduce crossings. Wide layers wrap into several rows. Tables without any
+    relationship are packed into a block below the hierarchy.
+    """
+    names, width, height, src, dst = _graph_arrays(sizes, edges)
+    n = len(names)
+    if n == 0:
+        return {}
+
+    src, dst = _break_cycles(n, src, dst)
+    layer = _longest_path_layers(n, src, dst)
+
+    connected = np.zeros(n, dtype=bool)
+    connected[src] = True
+    connected[dst] = True
+    # Isolated tables go into their own trailing layer.
+    layer = np.where(connected, layer, layer.max(initial=0) + 1 if connected.any() else 0)
+
+    rank = _order_layers(layer, src, dst, sweeps)
+
+    if max_width is None:
+        total_area = float(((width + TABLE_SPACING) * (height + TABLE_SPACING)).sum())
+        max_width = max(float(width.max()), math.sqrt(total_area) * 1.5)
+
+    order = np.lexsort((rank, layer))
+    x, y = _pack_rows(order, layer, width, height, max_width)
+    return {names[i]: (float(x[i]), float(y[i])) for i in range(n)}
+
+@instrumentation.timed("layout.force")
+def force_directed_layout(sizes, edges, iterations=100, samples=32, seed=0):
+    """
+    Fruchterman-Reingold style spring embedding, vectorized with NumPy.
+    Repulsion is estimated each iteration from a random sample of other tables,
+    which keeps an iteration O(n * samples) instead of O(n^2). The resulting
+    positions are then compacted into columns so that no two tables overlap.
+    """
+    names, width, height, src, dst = _graph_arrays(sizes, edges)
+    n = len(names)
+    if n == 0:
+        return {}
+
+    rng = np.random.default_rng(seed)
+    ideal = float(np.sqrt(width * height).mean()) * 1.5
+    side = math.sqrt(n) * ideal
+    pos_x = (rng.random(n) * side).astype(np.float32)
+    pos_y = (rng.random(n) * side).astype(np.float32)
+    samples = min(samples, n)
+    repulsion = np.float32(ideal * ideal * n / samples)
+    temperature = side / 10
+    cooling = 0.01 ** (1 / max(1, iterations))
+
+    for _ in range(iterations):
+        others = rng.integers(0, n, size=(n, samples), dtype=np.int32)
+        dx = pos_x[:, None] - pos_x[others]
+        dy = pos_y[:, None] - pos_y[others]
+        strength = repulsion / (dx * dx + dy * dy + 1e-2)
+        disp_x = (strength * dx).sum(axis=1)
+        disp_y = (strength * dy).sum(axis=1)
+
+        if len(src):
+            dx = pos_x[src] - pos_x[dst]
+            dy = pos_y[src] - pos_y[dst]
+            pull = np.sqrt(dx * dx + dy * dy) / ideal
+            np.subtract.at(disp_x, src, dx * pull)
+            np.subtract.at(disp_y, src, dy * pull)
+            np.add.at(disp_x, dst, dx * pull)
+            np.add.at(disp_y, dst, dy * pull)
+
+        # Mild gravity keeps disconnected components from drifting apart.
+        gravity = 0.05 * math.sqrt(n)
+        disp_x -= (pos_x - pos_x.mean()) * gravity
+        disp_y -= (pos_y - pos_y.mean()) * gravity
+
+        length = np.sqrt(disp_x * disp_x + disp_y * disp_y) + 1e-9
+        step = np.minimum(length, temperature) / length
+        pos_x += disp_x * step
+        pos_y += disp_y * step
+        temperature *= cooling
+
+    pos = np.column_stack((pos_x, pos_y)).astype(float)
+    x, y = _compact_columns(pos, width, height)
+    return {names[i]: (float(x[i]), float(y[i])) for i in range(n)}
+
+LAYOUTS = {
+    'grid': grid_layout,
+    'layered': layered_layout,
+    'force': force_directed_layout,
+}
+
+def available_layouts():
+    """Names of the layouts usable in this environment."""
+    if np is None:
+        return ['grid']
+    return list(LAYOUTS)
+
+def compute_layout(name, sizes, edges, **options):
+    """Runs the layout called name. Options not understood by it are ignored."""
+    if name not in available_layouts():
+        raise ValueError(f"Layout '{name}' is not available")
+    if name != 'grid':
+        options.pop('max_width', None)
+    return LAYOUTS[name](sizes, edges, **options)
+
+def layout_fingerprint(name, sizes, edges):
+    """Returns a hash identifying the layout input, used to cache computed layouts."""
+    digest = hashlib.sha1(name.encode())
+    for table_name in sorted(sizes):
+        width, height = sizes[table_name]
+        digest.update(f"{table_name}\0{width}\0{height}\n".encode())
+    for fk_table, pk_table in sorted(set(edges)):
+        digest.update(f"{fk_table}\0{pk_table}\n".encode())
+    return digest.hexdigest()
+
+def _graph_arrays(sizes, edges):
+    """Converts the layout input into index-based NumPy arrays, dropping self-references and duplicates."""
+    names = list(sizes)
+    index = {name: i for i, name in enumerate(names)}
+    width = np.array([sizes[name][0] for name in names], dtype=float)
+    height = np.array([sizes[name][1] for name in names], dtype=float)
+
+    pairs = {(index[a], index[b]) for a, b in edges if a in index and b in index and a != b}
+    if pairs:
+        src, dst = (np.array(column, dtype=np.int64) for column in zip(*sorted(pairs)))
+    else:
+        src = dst = np.zeros(0, dtype=np.int64)
+    return names, width, height, src, dst
+
+def _break_cycles(n, src, dst):
+    """Reverses the back edges found by an iterative depth-first search so the graph becomes acyclic."""
+    adjacency = [[] for _ in range(n)]
+    for edge, node in enumerate(src.tolist()):
+        adjacency[node].append(edge)
+
+    state = [0] * n # 0 = unvisited, 1 = on the DFS stack, 2 = done
+    reverse = np.zeros(len(src), dtype=bool)
+    dst_list = dst.tolist()
+    for root in range(n):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(adjacency[root]))]
+        while stack:
+            node, edges = stack[-1]
+            for edge in edges:
+                target = dst_list[edge]
+                if state[target] == 1:
+                    reverse[edge] = True
+                elif state[target] == 0:
+                    state[target] = 1
+                    stack.append((target, iter(adjacency[target])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+
+    return np.where(reverse, dst, src), np.where(reverse, src, dst)
+
+def _longest_path_layers(n, src, dst):
+    """Assigns each table a layer one below the deepest table it references (Kahn's algorithm)."""
+    children = [[] for _ in range(n)]
+    pending = np.bincount(src, minlength=n).tolist() # references not yet placed
+    for child, parent in zip(src.tolist(), dst.tolist()):
+        children[parent].append(child)
+
+    layer = [0] * n
+    ready = [node for node in range(n) if pending[node] == 0]
+    while ready:
+        node = ready.pop()
+        for child in children[node]:
+            if layer[node] + 1 > layer[child]:
+                layer[child] = layer[node] + 1
+            pending[child] -= 1
+            if pending[child] == 0:
+                ready.append(child)
+    return np.array(layer, dtype=np.int64)
+
+def _order_layers(layer, src, dst, sweeps):
+    """
+    Orders tables within each layer by the barycenter of their neighbours' relative
+    positions. All layers are updated at once per sweep using bincount.
+    Returns each table's relative position (0..1) within its layer.
+    """
+    n = len(layer)
+    layer_size = np.bincount(layer)
+    order = np.lexsort((np.arange(n), layer))
+    rank = _relative_rank(order, layer, layer_size)
+
+    neighbour_count = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+    for _ in range(sweeps):
+        neighbour_sum = (np.bincount(src, weights=rank[dst], minlength=n) +
+                         np.bincount(dst, weights=rank[src], minlength=n))
+        barycenter = np.where(neighbour_count > 0, neighbour_sum / np.maximum(neighbour_count, 1), rank)
+        order = np.lexsort((barycenter, layer))
+        rank = _relative_rank(order, layer, layer_size)
+    return rank
+
+def _relative_rank(order, layer, layer_size):
+    """Given tables sorted by (layer, key), returns each table's centred position within its layer as 0..1."""
+    layer_start = np.concatenate(([0], np.cumsum(layer_size)[:-1]))
+    rank = np.empty(len(order))
+    position = np.arange(len(order)) - layer_start[layer[order]]
+    rank[order] = (position + 0.5) / layer_size[layer[order]]
+    return rank
+
+def _pack_rows(order, layer, width, height, max_width):
+    """
+    Places tables sorted by (layer, rank) into rows: each layer starts a new row and
+    wraps when it exceeds max_width. Rows are centred horizontally.
+    """
+    n = len(order)
+    layer_sorted = layer[order]
+    span = width[order] + TABLE_SPACING
+
+    # Offset of each table from the start of its layer, and the row it wraps into.
+    cumulative = np.cumsum(span)
+    new_layer = np.concatenate(([True], layer_sorted[1:] != layer_sorted[:-1]))
+    layer_base = np.maximum.accumulate(np.where(new_layer, cumulative - span, 0))
+    offset = cumulative - span - layer_base
+    wrap = np.floor(offset / max_width).astype(np.int64)
+
+    # Global row index: rows of earlier layers come first.
+    row_key = layer_sorted * (n + 1) + wrap
+    _, row = np.unique(row_key, return_inverse=True)
+    x_sorted = offset - wrap * max_width
+
+    row_extent = np.zeros(row.max() + 1)
+    np.maximum.at(row_extent, row, x_sorted + span)
+    x_sorted += (row_extent.max() - row_extent[row]) / 2
+
+    row_height = np.zeros(row.max() + 1)
+    np.maximum.at(row_height, row, height[order] + TABLE_SPACING)
+    row_y = np.concatenate(([0], np.cumsum(row_height)[:-1]))
+
+    x = np.empty(n)
+    y = np.empty(n)
+    x[order] = x_sorted + DIAGRAM_MARGIN
+    y[order] = row_y[row] + DIAGRAM_MARGIN
+    return x, y
+
+def _compact_columns(pos, width, height):
+    """
+    Removes overlaps from free positions: tables are split into columns by their x
+    rank and stacked by y within each column, preserving relative placement.
+    """
+    n = len(pos)
+    total_area = float(((width + TABLE_SPACING) * (height + TABLE_SPACING)).sum())
+    mean_span = float(width.mean()) + TABLE_SPACING
+    columns = max(1, min(n, round(math.sqrt(total_area) / mean_span)))
+
+    x_rank = np.empty(n, dtype=np.int64)
+    x_rank[np.argsort(pos[:, 0], kind="stable")] = np.arange(n)
+    column = x_rank * columns // n
+
+    order = np.lexsort((pos[:, 1], column))
+    column_sorted = column[order]
+    span = height[order] + TABLE_SPACING
+    cumulative = np.cumsum(span)
+    new_column = np.concatenate(([True], column_sorted[1:] != column_sorted[:-1]))
+    column_base = np.maximum.accumulate(np.where(new_column, cumulative - span, 0))
+
+    column_width = np.zeros(columns)
+    np.maximum.at(column_width, column, width + TABLE_SPACING)
+    column_x = np.concatenate(([0], np.cumsum(column_width)[:-1]))
+
+    x = np.empty(n)
+    y = np.empty(n)
+    y[order] = cumulative - span - column_base + DIAGRAM_MARGIN
+    x[order] = column_x[column_sorted] + DIAGRAM_MARGIN
+    return x, y
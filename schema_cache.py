@@ -0,0 +1,161 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Default location of the on-disk cache and its size limit across all databases.
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".mysql_visualizer", "schema_cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class SchemaCache:
+    """
+    Persistent schema cache stored in a SQLite file.
+
+    Entries are keyed by (host, database). Each entry keeps the database fingerprint,
+    the foreign key list and, per table, a version string and the column list, so a
+    changed database can be refreshed table by table. When the stored schemas exceed
+    max_bytes, whole databases are evicted in least-recently-used order.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS databases (
+                host TEXT NOT NULL,
+                db_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                foreign_keys TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (host, db_name)
+            );
+            CREATE TABLE IF NOT EXISTS tables (
+                host TEXT NOT NULL,
+                db_name TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                version TEXT,
+                columns TEXT NOT NULL,
+                PRIMARY KEY (host, db_name, table_name)
+            );
+            CREATE TABLE IF NOT EXISTS layouts (
+                host TEXT NOT NULL,
+                db_name TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                positions TEXT NOT NULL,
+                PRIMARY KEY (host, db_name, algorithm)
+            );
+        """)
+
+    def get_fingerprint(self, host, db_name):
+        """Returns the stored fingerprint of a database, or None if it is not cached."""
+        with self._lock:
+            row = self._db.execute("SELECT fingerprint FROM databases WHERE host = ? AND db_name = ?",
+                                   (host, db_name)).fetchone()
+        return row[0] if row else None
+
+    def get_table_versions(self, host, db_name):
+        """Returns {table_name: version} for a cached database."""
+        with self._lock:
+            rows = self._db.execute("SELECT table_name, version FROM tables WHERE host = ? AND db_name = ?",
+                                    (host, db_name)).fetchall()
+        return dict(rows)
+
+    def load(self, host, db_name):
+        """
+        Returns the cached (schema_dict, foreign_keys_list) of a database, or None.
+        A successful load marks the database as most recently used.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT foreign_keys FROM databases WHERE host = ? AND db_name = ?",
+                                   (host, db_name)).fetchone()
+            if row is None:
+                return None
+            rows = self._db.execute("SELECT table_name, columns FROM tables WHERE host = ? AND db_name = ? ORDER BY position",
+                                    (host, db_name)).fetchall()
+            self._db.execute("UPDATE databases SET last_used = ? WHERE host = ? AND db_name = ?",
+                             (time.time(), host, db_name))
+            self._db.commit()
+
+        schema = {table_name: json.loads(columns) for table_name, columns in rows}
+        return schema, json.loads(row[0])
+
+    def store(self, host, db_name, fingerprint, schema, foreign_keys, table_versions):
+        """
+        Replaces the cached copy of a database. schema may also be a
+        SchemaModel.schema_view(). table_versions maps table names to the version
+        string they were fetched at.
+        """
+        foreign_keys_json = json.dumps(foreign_keys)
+        table_rows = []
+        size_bytes = len(foreign_keys_json)
+        for position, (table_name, columns) in enumerate(schema.items()):
+            columns_json = json.dumps(list(columns))
+            size_bytes += len(columns_json)
+            table_rows.append((host, db_name, table_name, position, table_versions.get(table_name), columns_json))
+
+        with self._lock:
+            self._db.execute("DELETE FROM tables WHERE host = ? AND db_name = ?", (host, db_name))
+            self._db.executemany("INSERT INTO tables VALUES (?, ?, ?, ?, ?, ?)", table_rows)
+            self._db.execute("INSERT OR REPLACE INTO databases VALUES (?, ?, ?, ?, ?, ?)",
+                             (host, db_name, fingerprint, foreign_keys_json, size_bytes, time.time()))
+            self._evict(keep=(host, db_name))
+            self._db.commit()
+
+    def load_layout(self, host, db_name, algorithm, fingerprint):
+        """Returns the cached {table_name: (x, y)} for a layout input fingerprint, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT positions FROM layouts WHERE host = ? AND db_name = ? AND algorithm = ? AND fingerprint = ?",
+                                   (host, db_name, algorithm, fingerprint)).fetchone()
+        if row is None:
+            return None
+        return {table_name: tuple(xy) for table_name, xy in json.loads(row[0]).items()}
+
+    def store_layout(self, host, db_name, algorithm, fingerprint, positions):
+        """
+        Stores a computed layout, replacing the previous one of the same algorithm.
+        Layouts are dropped together with their database on eviction.
+        """
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO layouts VALUES (?, ?, ?, ?, ?)",
+                             (host, db_name, algorithm, fingerprint, json.dumps(positions)))
+            self._db.commit()
+
+    def invalidate(self, host, db_name):
+        """Drops a database from the cache."""
+        with self._lock:
+            self._delete(host, db_name)
+            self._db.commit()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM databases").fetchone()[0]
+
+    def _evict(self, keep):
+        """Evicts least recently used databases until the cache fits in max_bytes."""
+        rows = self._db.execute("SELECT host, db_name, size_bytes FROM databases ORDER BY last_used").fetchall()
+        total = sum(size for _, _, size in rows)
+        for host, db_name, size in rows:
+            if total <= self.max_bytes:
+                break
+            if (host, db_name) == keep:
+                continue
+            self._delete(host, db_name)
+            total -= size
+
+    def _delete(self, host, db_name):
+        self._db.execute("DELETE FROM layouts WHERE host = ? AND db_name = ?", (host, db_name))
+        self._db.execute("DELETE FROM tables WHERE host = ? AND db_name = ?", (host, db_name))
+        self._db.execute("DELETE FROM databases WHERE host = ? AND db_name = ?", (host, db_name))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,391 @@
+"""
+Schema drift detection across servers or databases that should share one schema,
+such as the shards of a sharded application.
+
+Each shard is introspected on its own connection, many at a time, and every table
+definition (columns in ordinal order plus the table's foreign keys) is reduced to
+a canonical fingerprint while the rows stream in. Shards are then compared by
+fingerprint: shards with the same set of fingerprints form one schema variant,
+each table's baseline is the definition most shards have, and only the distinct
+definitions that differ from it are diffed column by column. Comparing a hundred
+identical shards costs a hundred dictionary lookups per table, not a hundred diffs.
+
+Example:
+    python schema_compare.py --user root db1.example.com/shop db2.example.com/shop db3.example.com:3307/shop
+"""
+import argparse
+import concurrent.futures
+import getpass
+import hashlib
+import json
+import os
+import sys
+import time
+
+from mysql.connector import Error
+
+import db_connector
+import instrumentation
+import schema_diff
+
+# Shards introspected at the same time, over all hosts.
+DEFAULT_MAX_WORKERS = 16
+
+# Connections opened per host; shards on the same host share them.
+DEFAULT_CONNECTIONS_PER_HOST = 4
+
+# Shard labels listed per line of the text report before "and N more".
+MAX_LISTED_SHARDS = 8
+
+class TableDefinition:
+    """One distinct table definition, stored once however many shards share it."""
+    __slots__ = ('columns', 'foreign_keys')
+
+    def __init__(self, columns, foreign_keys):
+        self.columns = columns             # ((name, type, length, nullable, key, extra), ...) in ordinal order
+        self.foreign_keys = foreign_keys   # ((constraint_name, fk_column, pk_table, pk_column), ...) sorted
+
+    def column_dicts(self):
+        return [{'name': name, 'type': data_type, 'length': length, 'nullable': nullable, 'key': key,
+                 'extra': extra}
+                for name, data_type, length, nullable, key, extra in self.columns]
+
+def table_fingerprint(columns, foreign_keys):
+    """
+    Canonical 16-byte fingerprint of a table definition: columns as tuples in
+    ordinal order and foreign keys as sorted tuples, as kept in TableDefinition.
+    """
+    return hashlib.blake2b(repr((columns, foreign_keys)).encode(), digest_size=16).digest()
+
+def schema_fingerprint(tables):
+    """Fingerprint of a whole shard from its {table_name: table fingerprint} dict."""
+    digest = hashlib.blake2b(digest_size=16)
+    for table_name in sorted(tables):
+        digest.update(table_name.encode())
+        digest.update(b"\0")
+        digest.update(tables[table_name])
+    return digest.digest()
+
+@instrumentation.timed("compare.fingerprint_database")
+def fingerprint_database(connection, db_name, definitions=None, cancel_event=None):
+    """
+    Introspects one database and returns {table_name: table fingerprint}. Columns are
+    streamed with db_connector.iter_schema, so only one table's rows are held at a
+    time. New definitions are added to definitions ({fingerprint: TableDefinition})
+    if given. Errors are raised to the caller.
+    """
+    foreign_keys = {}
+    for fk_table, fk_column, pk_table, pk_column, constraint_name in \
+            db_connector.iter_foreign_keys(connection, db_name):
+        foreign_keys.setdefault(fk_table, []).append((constraint_name, fk_column, pk_table, pk_column))
+
+    tables = {}
+    for table_name, columns in db_connector.iter_schema(connection, db_name, cancel_event=cancel_event):
+        columns = tuple(columns)
+        table_fks = tuple(sorted(foreign_keys.get(table_name, ())))
+        fingerprint = table_fingerprint(columns, table_fks)
+        tables[table_name] = fingerprint
+        if definitions is not None and fingerprint not in definitions:
+            definitions.setdefault(fingerprint, TableDefinition(columns, table_fks))
+    return tables
+
+class ShardFingerprints:
+    """
+    Table fingerprints of many shards. Definitions shared by several shards, and
+    by several tables, are stored once in definitions.
+    """
+
+    def __init__(self):
+        self.shards = {}        # {shard_label: {table_name: table fingerprint}}, in completion order
+        self.definitions = {}   # {table fingerprint: TableDefinition}
+        self.errors = {}        # {shard_label: error message} of shards that could not be introspected
+
+    def __len__(self):
+        return len(self.shards)
+
+@instrumentation.timed("compare.collect")
+def collect_fingerprints(shards, max_workers=DEFAULT_MAX_WORKERS, progress_callback=None, cancel_event=None):
+    """
+    Fingerprints shards concurrently. shards is {shard_label: (pool, db_name)} where
+    pool is a db_connector.ConnectionPool for the shard's server; shards on one
+    server can share a pool, whose size then limits the load put on that server.
+    progress_callback(done, total) is called after each shard. Returns ShardFingerprints;
+    shards that failed are listed in its errors.
+    """
+    result = ShardFingerprints()
+
+    def fingerprint_shard(pool, db_name):
+        if cancel_event is not None and cancel_event.is_set():
+            raise db_connector.SchemaLoadCancelled()
+        with pool.connection() as connection:
+            return fingerprint_database(connection, db_name, result.definitions, cancel_event)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(shards)))) as executor:
+        futures = {executor.submit(fingerprint_shard, pool, db_name): label
+                   for label, (pool, db_name) in shards.items()}
+        try:
+            for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                label = futures[future]
+                try:
+                    result.shards[label] = future.result()
+                except Error as e:
+                    print(f"Error introspecting shard '{label}': {e}", file=sys.stderr)
+                    result.errors[label] = str(e)
+                if progress_callback:
+                    progress_callback(done, len(futures))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return result
+
+class TableVariant:
+    """A definition of a table that differs from its baseline, and the shards that have it."""
+    __slots__ = ('fingerprint', 'shards', 'status', 'column_diff', 'added_foreign_keys', 'removed_foreign_keys')
+
+    # Values of status.
+    MISSING = "missing"   # The shards lack a table the baseline has
+    EXTRA = "extra"       # The shards have a table the baseline lacks
+    ALTERED = "altered"
+
+    def __init__(self, fingerprint, shards, status):
+        self.fingerprint = fingerprint   # None for MISSING
+        self.shards = shards
+        self.status = status
+        self.column_diff = None          # schema_diff.TableDiff for ALTERED
+        self.added_foreign_keys = []     # constraint names, for ALTERED
+        self.removed_foreign_keys = []
+
+    def describe(self, definitions, baseline):
+        """One-line description of how this variant differs from the baseline definition."""
+        if self.status == self.MISSING:
+            return "table missing"
+        if self.status == self.EXTRA:
+            return "table not in the baseline"
+        parts = []
+        diff = self.column_diff
+        if diff.added_columns:
+            parts.append("added " + ", ".join(diff.added_columns))
+        if diff.removed_columns:
+            parts.append("removed " + ", ".join(diff.removed_columns))
+        if diff.altered_columns:
+            old_columns = {column[0]: column for column in definitions[baseline].columns}
+            new_columns = {column[0]: column for column in definitions[self.fingerprint].columns}
+            parts.append("altered " + ", ".join(
+                f"{name} ({_column_text(old_columns[name])} -> {_column_text(new_columns[name])})"
+                for name in diff.altered_columns))
+        if diff.reordered:
+            parts.append("columns reordered")
+        if self.added_foreign_keys:
+            parts.append("added FK " + ", ".join(self.added_foreign_keys))
+        if self.removed_foreign_keys:
+            parts.append("removed FK " + ", ".join(self.removed_foreign_keys))
+        return "; ".join(parts) or "foreign key columns changed"
+
+def _column_text(column):
+    name, data_type, length, nullable, key, extra = column
+    text = f"{data_type}({length})" if length is not None else data_type
+    text += " NULL" if nullable else " NOT NULL"
+    return " ".join(part for part in (text, key, extra) if part)
+
+class TableDrift:
+    """The definitions of one table across shards: the baseline and the variants that differ."""
+    __slots__ = ('table_name', 'baseline', 'baseline_shard_count', 'variants')
+
+    def __init__(self, table_name, baseline, baseline_shard_count):
+        self.table_name = table_name
+        self.baseline = baseline   # Fingerprint held by most shards; None if most shards lack the table
+        self.baseline_shard_count = baseline_shard_count
+        self.variants = []
+
+class DriftReport:
+    """Result of compare_fingerprints()."""
+    __slots__ = ('schema_variants', 'tables', 'errors', 'definitions')
+
+    def __init__(self, definitions, errors):
+        self.schema_variants = []   # [(schema fingerprint, [shard_label, ...])], most common first
+        self.tables = {}            # {table_name: TableDrift} of the tables that differ, sorted by name
+        self.errors = errors
+        self.definitions = definitions
+
+    def __bool__(self):
+        """True if any shard differs from the baseline."""
+        return bool(self.tables)
+
+    @property
+    def shard_count(self):
+        return sum(len(shards) for _, shards in self.schema_variants)
+
+    def drifted_shards(self):
+        """{shard_label: [table_name, ...]} of the shards with at least one table unlike the baseline."""
+        drifted = {}
+        for table_name, drift in self.tables.items():
+            for variant in drift.variants:
+                for shard in variant.shards:
+                    drifted.setdefault(shard, []).append(table_name)
+        return drifted
+
+    def format(self):
+        """The report as lines of text."""
+        drifted = self.drifted_shards()
+        lines = [f"Compared {self.shard_count} shards: {self.shard_count - len(drifted)} match the baseline, "
+                 f"{len(drifted)} drifted" + (f", {len(self.errors)} failed" if self.errors else "") + "."]
+        if len(self.schema_variants) > 1:
+            lines.append(f"Schema variants: {len(self.schema_variants)}")
+            for fingerprint, shards in self.schema_variants:
+                lines.append(f"  {fingerprint.hex()[:12]}  {len(shards):5d} shards  {_shard_list(shards)}")
+        if self.tables:
+            lines.append(f"Drifted tables: {len(self.tables)}")
+            for table_name, drift in self.tables.items():
+                lines.append(f"  {table_name} (baseline on {drift.baseline_shard_count} shards)")
+                for variant in drift.variants:
+                    lines.append(f"    {_shard_list(variant.shards)}: "
+                                 f"{variant.describe(self.definitions, drift.baseline)}")
+        if self.errors:
+            lines.append("Failed shards:")
+            lines.extend(f"  {shard}: {message}" for shard, message in sorted(self.errors.items()))
+        return lines
+
+    def to_json(self):
+        """The report as JSON-ready dicts, for scripts and CI checks."""
+        return {
+            'shards': self.shard_count,
+            'schema_variants': [{'fingerprint': fingerprint.hex(), 'shards': shards}
+                                for fingerprint, shards in self.schema_variants],
+            'drifted_shards': self.drifted_shards(),
+            'tables': {table_name: {
+                'baseline': drift.baseline.hex() if drift.baseline else None,
+                'baseline_shards': drift.baseline_shard_count,
+                'variants': [{'status': variant.status, 'shards': variant.shards,
+                              'description': variant.describe(self.definitions, drift.baseline)}
+                             for variant in drift.variants]}
+                for table_name, drift in self.tables.items()},
+            'errors': self.errors,
+        }
+
+def _shard_list(shards):
+    listed = ", ".join(shards[:MAX_LISTED_SHARDS])
+    if len(shards) > MAX_LISTED_SHARDS:
+        listed += f" and {len(shards) - MAX_LISTED_SHARDS} more"
+    return listed
+
+@instrumentation.timed("compare.compare")
+def compare_fingerprints(fingerprints):
+    """
+    Groups shards into schema variants and finds, per table, the baseline
+    definition (the one most shards have) and the variants that differ from it.
+    Only distinct definitions are compared, so the cost grows with the number of
+    schema variants and tables, not with the number of shards. Returns a DriftReport.
+    """
+    report = DriftReport(fingerprints.definitions, fingerprints.errors)
+
+    variants = {}
+    shard_tables = {}   # {schema fingerprint: {table_name: table fingerprint}} of one shard per variant
+    for label in sorted(fingerprints.shards):
+        tables = fingerprints.shards[label]
+        fingerprint = schema_fingerprint(tables)
+        variants.setdefault(fingerprint, []).append(label)
+        shard_tables.setdefault(fingerprint, tables)
+    report.schema_variants = sorted(variants.items(), key=lambda item: (-len(item[1]), item[1][0]))
+    if len(report.schema_variants) <= 1:
+        return report
+
+    table_names = set()
+    for tables in shard_tables.values():
+        table_names.update(tables)
+
+    for table_name in sorted(table_names):
+        # Shards per definition of this table; the largest schema variant comes first, so it wins ties.
+        shards_by_definition = {}
+        for schema_variant, shards in report.schema_variants:
+            shards_by_definition.setdefault(shard_tables[schema_variant].get(table_name), []).extend(shards)
+        if len(shards_by_definition) == 1:
+            continue
+        baseline = max(shards_by_definition, key=lambda fingerprint: len(shards_by_definition[fingerprint]))
+        drift = TableDrift(table_name, baseline, len(shards_by_definition[baseline]))
+        for fingerprint, shards in shards_by_definition.items():
+            if fingerprint != baseline:
+                drift.variants.append(_variant(table_name, fingerprints.definitions, baseline, fingerprint, shards))
+        report.tables[table_name] = drift
+    return report
+
+def _variant(table_name, definitions, baseline, fingerprint, shards):
+    if fingerprint is None:
+        return TableVariant(None, shards, TableVariant.MISSING)
+    if baseline is None:
+        return TableVariant(fingerprint, shards, TableVariant.EXTRA)
+    variant = TableVariant(fingerprint, shards, TableVariant.ALTERED)
+    old, new = definitions[baseline], definitions[fingerprint]
+    variant.column_diff = schema_diff.diff_table(table_name, old.column_dicts(), new.column_dicts())
+    old_fks, new_fks = set(old.foreign_keys), set(new.foreign_keys)
+    variant.added_foreign_keys = sorted({fk[0] for fk in new_fks - old_fks})
+    variant.removed_foreign_keys = sorted({fk[0] for fk in old_fks - new_fks})
+    return variant
+
+def parse_shard(spec):
+    """Parses 'host[:port]/database' into (host, port, database)."""
+    address, slash, db_name = spec.partition("/")
+    host, colon, port = address.partition(":")
+    if not (slash and host and db_name) or (colon and not port.isdigit()):
+        raise ValueError(f"invalid shard '{spec}', expected host[:port]/database")
+    return host, int(port) if colon else 3306, db_name
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("shards", nargs="*", help="Shards to compare, as host[:port]/database")
+    parser.add_argument("--shards-file", help="File listing more shards, one host[:port]/database per line")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", help="Defaults to $MYSQL_PWD, or a prompt when run interactively")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Shards introspected at once")
+    parser.add_argument("--connections-per-host", type=int, default=DEFAULT_CONNECTIONS_PER_HOST)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    specs = list(args.shards)
+    if args.shards_file:
+        with open(args.shards_file, encoding="utf-8") as f:
+            specs += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    try:
+        parsed = {spec: parse_shard(spec) for spec in specs}
+    except ValueError as e:
+        parser.error(str(e))
+    if len(parsed) < 2:
+        parser.error("at least two shards are needed")
+
+    password = args.password
+    if password is None:
+        password = os.environ.get("MYSQL_PWD")
+    if password is None:
+        password = getpass.getpass("MySQL password: ") if sys.stdin.isatty() else ""
+
+    pools = {}
+    shards = {}
+    for spec, (host, port, db_name) in parsed.items():
+        pool = pools.get((host, port))
+        if pool is None:
+            pool = pools[host, port] = db_connector.ConnectionPool(
+                host, args.user, password, pool_size=args.connections_per_host, port=port)
+        shards[spec] = (pool, db_name)
+
+    def report_progress(done, total):
+        if done % 10 == 0 or done == total:
+            print(f"{done}/{total} shards introspected", file=sys.stderr)
+
+    start = time.perf_counter()
+    try:
+        fingerprints = collect_fingerprints(shards, args.workers, report_progress)
+    finally:
+        for pool in pools.values():
+            pool.close()
+    report = compare_fingerprints(fingerprints)
+    print(f"{len(fingerprints)} shards, {len(fingerprints.definitions)} distinct table definitions "
+          f"({time.perf_counter() - start:.2f}s)", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(report.to_json(), indent=2))
+    else:
+        print("\n".join(report.format()))
+    return 1 if report or report.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+class TableDiff:
+    """Column-level changes of one table that exists in both schemas."""
+    __slots__ = ('table_name', 'added_columns', 'removed_columns', 'altered_columns', 'reordered')
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.added_columns = []     # column names
+        self.removed_columns = []
+        self.altered_columns = []   # same name, different type/length/nullability/key/extra
+        self.reordered = False
+
+    def __bool__(self):
+        return bool(self.added_columns or self.removed_columns or self.altered_columns or self.reordered)
+
+    def __repr__(self):
+        return (f"TableDiff({self.table_name!r}, added={self.added_columns}, removed={self.removed_columns}, "
+                f"altered={self.altered_columns}, reordered={self.reordered})")
+
+class SchemaDiff:
+    """
+    Differences between two versions of a database schema, as computed by
+    diff_schemas. Table lists keep the order of the schema they come from;
+    foreign keys are the dicts of the respective schema.
+    """
+    __slots__ = ('added_tables', 'removed_tables', 'altered_tables', 'added_foreign_keys', 'removed_foreign_keys')
+
+    def __init__(self):
+        self.added_tables = []
+        self.removed_tables = []
+        self.altered_tables = {}    # {table_name: TableDiff}
+        self.added_foreign_keys = []
+        self.removed_foreign_keys = []
+
+    def __bool__(self):
+        return bool(self.added_tables or self.removed_tables or self.altered_tables
+                    or self.added_foreign_keys or self.removed_foreign_keys)
+
+    def redraw_tables(self):
+        """
+        Tables present in the new schema whose drawing changes: altered tables and
+        the tables whose columns gained or lost a foreign key marker.
+        """
+        removed = set(self.removed_tables)
+        added = set(self.added_tables)
+        tables = set(self.altered_tables)
+        for fk in self.added_foreign_keys + self.removed_foreign_keys:
+            tables.add(fk['fk_table'])
+            tables.add(fk['pk_table'])
+        return tables - removed - added
+
+    def summary(self):
+        """Short human-readable description, e.g. '2 tables added, 1 table altered'."""
+        parts = []
+        for count, what in ((len(self.added_tables), "added"), (len(self.removed_tables), "removed"),
+                            (len(self.altered_tables), "altered")):
+            if count:
+                parts.append(f"{count} table{'s' if count != 1 else ''} {what}")
+        for count, what in ((len(self.added_foreign_keys), "added"), (len(self.removed_foreign_keys), "removed")):
+            if count:
+                parts.append(f"{count} relationship{'s' if count != 1 else ''} {what}")
+        return ", ".join(parts) or "no changes"
+
+def diff_schemas(old_schema, old_foreign_keys, new_schema, new_foreign_keys):
+    """
+    Compares two schemas in the get_schema_for_database shape (plain dicts or
+    schema_model views) and returns a SchemaDiff.
+    """
+    diff = SchemaDiff()
+
+    diff.removed_tables = [table_name for table_name in old_schema if table_name not in new_schema]
+    for table_name, new_columns in new_schema.items():
+        if table_name not in old_schema:
+            diff.added_tables.append(table_name)
+            continue
+        table_diff = diff_table(table_name, old_schema[table_name], new_columns)
+        if table_diff:
+            diff.altered_tables[table_name] = table_diff
+
+    old_keys = {_fk_key(fk): fk for fk in old_foreign_keys}
+    new_keys = {_fk_key(fk): fk for fk in new_foreign_keys}
+    diff.added_foreign_keys = [fk for key, fk in new_keys.items() if key not in old_keys]
+    diff.removed_foreign_keys = [fk for key, fk in old_keys.items() if key not in new_keys]
+
+    return diff
+
+def diff_table(table_name, old_columns, new_columns):
+    """Compares two versions of one table's column dicts and returns a TableDiff."""
+    table_diff = TableDiff(table_name)
+    old_by_name = {col['name']: col for col in old_columns}
+    new_by_name = {col['name']: col for col in new_columns}
+
+    for name, col in new_by_name.items():
+        if name not in old_by_name:
+            table_diff.added_columns.append(name)
+        elif old_by_name[name] != col:
+            table_diff.altered_columns.append(name)
+    table_diff.removed_columns = [name for name in old_by_name if name not in new_by_name]
+
+    # Columns that exist on both sides but in a different ordinal order.
+    old_order = [name for name in old_by_name if name in new_by_name]
+    new_order = [name for name in new_by_name if name in old_by_name]
+    table_diff.reordered = old_order != new_order
+    return table_diff
+
+def _fk_key(fk):
+    return (fk['constraint_name'], fk['fk_table'], fk['fk_column'], fk['pk_table'], fk['pk_column'])
@@ -0,0 +1,309 @@
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+# Stored in column_lengths and table_rows for NULL lengths and unknown row counts.
+NO_LENGTH = -1
+
+class Column:
+    """One column of a SchemaModel, materialised on demand from its columnar arrays."""
+    __slots__ = ('id', 'table_id', 'name', 'type', 'length', 'nullable', 'key', 'extra')
+
+    def __init__(self, column_id, table_id, name, type, length, nullable, key, extra):
+        self.id = column_id
+        self.table_id = table_id
+        self.name = name
+        self.type = type
+        self.length = length
+        self.nullable = nullable
+        self.key = key
+        self.extra = extra
+
+    def as_dict(self):
+        """The column dict produced by db_connector.get_schema_for_database."""
+        return {'name': self.name, 'type': self.type, 'length': self.length,
+                'nullable': self.nullable, 'key': self.key, 'extra': self.extra}
+
+    def __repr__(self):
+        return f"Column({self.id}, {self.name!r}, {self.type!r})"
+
+class ForeignKey:
+    """
+    One foreign key column pair. Table and column IDs are -1 when the side is not
+    part of the model, e.g. a reference into another database.
+    """
+    __slots__ = ('constraint_name', 'fk_table', 'fk_column', 'pk_table', 'pk_column',
+                 'fk_table_id', 'fk_column_id', 'pk_table_id', 'pk_column_id')
+
+    def __init__(self, constraint_name, fk_table, fk_column, pk_table, pk_column,
+                 fk_table_id=-1, fk_column_id=-1, pk_table_id=-1, pk_column_id=-1):
+        self.constraint_name = constraint_name
+        self.fk_table = fk_table
+        self.fk_column = fk_column
+        self.pk_table = pk_table
+        self.pk_column = pk_column
+        self.fk_table_id = fk_table_id
+        self.fk_column_id = fk_column_id
+        self.pk_table_id = pk_table_id
+        self.pk_column_id = pk_column_id
+
+    def as_dict(self):
+        """The foreign key dict produced by db_connector.get_schema_for_database."""
+        return {'fk_table': self.fk_table, 'fk_column': self.fk_column,
+                'pk_table': self.pk_table, 'pk_column': self.pk_column,
+                'constraint_name': self.constraint_name}
+
+    def __repr__(self):
+        return f"ForeignKey({self.fk_table}.{self.fk_column} -> {self.pk_table}.{self.pk_column})"
+
+class SchemaModel:
+    """
+    Compact in-memory schema of one database.
+
+    Tables and columns have integer IDs. Column attributes live in parallel arrays
+    indexed by column ID, with the columns of a table stored contiguously: table t
+    owns column IDs table_offsets[t] to table_offsets[t + 1]. Names are interned
+    and the repetitive attributes (type, key, extra) are stored as indexes into
+    small vocabularies.
+
+    Build a model with add_table/add_column/add_foreign_key and then finish(), or
+    with from_dicts(). schema_view() and foreign_keys_view() give read-only views
+    in the {table: [column_dict, ...]} / [fk_dict, ...] shape used by the rest of
+    the application.
+    """
+    __slots__ = ('table_names', 'table_rows', 'table_offsets', 'column_tables', 'column_names', 'column_types',
+                 'column_lengths', 'column_nullable', 'column_keys', 'column_extras',
+                 'type_names', 'key_names', 'extra_names', 'foreign_keys',
+                 '_table_ids', '_vocab_ids', '_finished', '_grouped_columns')
+
+    def __init__(self):
+        self.table_names = []
+        self.table_rows = array('q')
+        self.table_offsets = array('l')
+        self.column_tables = array('l')
+        self.column_names = []
+        self.column_types = array('H')
+        self.column_lengths = array('q')
+        self.column_nullable = array('b')
+        self.column_keys = array('B')
+        self.column_extras = array('H')
+        self.type_names = []
+        self.key_names = []
+        self.extra_names = []
+        self.foreign_keys = []
+        self._table_ids = {}
+        self._vocab_ids = ({}, {}, {})
+        self._finished = False
+        self._grouped_columns = 0   # Columns already grouped into table_offsets by finish()
+
+    # --- Building -----------------------------------------------------------
+
+    def add_table(self, table_name, row_estimate=None):
+        """Adds a table (or returns the ID of an existing one). row_estimate is TABLE_ROWS, if known."""
+        table_id = self._table_ids.get(table_name)
+        if table_id is None:
+            table_id = len(self.table_names)
+            table_name = sys.intern(table_name)
+            self.table_names.append(table_name)
+            self.table_rows.append(NO_LENGTH if row_estimate is None else row_estimate)
+            self._table_ids[table_name] = table_id
+            self._finished = False
+        return table_id
+
+    def add_column(self, table_name, name, type, length, nullable, key, extra):
+        """Appends a column to a table. Columns of one table keep their insertion order."""
+        self.column_tables.append(self.add_table(table_name))
+        self.column_names.append(sys.intern(name))
+        self.column_types.append(self._vocab(0, self.type_names, type))
+        self.column_lengths.append(NO_LENGTH if length is None else length)
+        self.column_nullable.append(bool(nullable))
+        self.column_keys.append(self._vocab(1, self.key_names, key))
+        self.column_extras.append(self._vocab(2, self.extra_names, extra))
+        self._finished = False
+
+    def add_foreign_key(self, fk_table, fk_column, pk_table, pk_column, constraint_name):
+        self.foreign_keys.append(ForeignKey(sys.intern(constraint_name), sys.intern(fk_table), sys.intern(fk_column),
+                                            sys.intern(pk_table), sys.intern(pk_column)))
+        self._finished = False
+
+    def _vocab(self, slot, names, value):
+        ids = self._vocab_ids[slot]
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(names)
+            names.append(sys.intern(value) if isinstance(value, str) else value)
+        return value_id
+
+    def finish(self):
+        """
+        Groups columns by table and resolves foreign key IDs. Columns that arrived
+        out of table order are moved with a stable sort, so per-table order is kept.
+        Returns the model.
+
+        finish() may be called again after adding more tables and columns, e.g. while
+        a schema is streamed in. When the new columns continue in table order, only
+        they are grouped, so repeated calls cost what was added since the last one.
+        """
+        if self._finished:
+            return self
+        tables = self.column_tables
+        start = self._grouped_columns
+        if any(tables[i] > tables[i + 1] for i in range(max(start - 1, 0), len(tables) - 1)):
+            order = sorted(range(len(tables)), key=tables.__getitem__)
+            for attr in ('column_tables', 'column_names', 'column_types', 'column_lengths',
+                         'column_nullable', 'column_keys', 'column_extras'):
+                values = getattr(self, attr)
+                reordered = [values[i] for i in order]
+                setattr(self, attr, array(values.typecode, reordered) if isinstance(values, array) else reordered)
+            tables = self.column_tables
+            start = 0
+
+        # Offsets up to the table of the last grouped column are final; that table may have grown.
+        first_table = tables[start - 1] if start else 0
+        offsets = self.table_offsets
+        if not offsets:
+            offsets.append(0)
+        del offsets[first_table + 1:]
+        counts = [0] * (len(self.table_names) - first_table)
+        for column_id in range(offsets[first_table], len(tables)):
+            counts[tables[column_id] - first_table] += 1
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        self._grouped_columns = len(tables)
+
+        for fk in self.foreign_keys:
+            fk.fk_table_id = self._table_ids.get(fk.fk_table, -1)
+            fk.pk_table_id = self._table_ids.get(fk.pk_table, -1)
+            fk.fk_column_id = self.column_id(fk.fk_table, fk.fk_column, _check=False)
+            fk.pk_column_id = self.column_id(fk.pk_table, fk.pk_column, _check=False)
+
+        self._finished = True
+        return self
+
+    @classmethod
+    def from_dicts(cls, schema, foreign_keys=()):
+        """Builds a model from the ({table: [column_dict, ...]}, [fk_dict, ...]) shape."""
+        model = cls()
+        for table_name, columns in schema.items():
+            model.add_table(table_name)
+            for col in columns:
+                model.add_column(table_name, col['name'], col['type'], col['length'],
+                                 col['nullable'], col['key'], col['extra'])
+        for fk in foreign_keys:
+            model.add_foreign_key(fk['fk_table'], fk['fk_column'], fk['pk_table'], fk['pk_column'],
+                                  fk['constraint_name'])
+        return model.finish()
+
+    # --- Queries ------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.table_names)
+
+    def __contains__(self, table_name):
+        return table_name in self._table_ids
+
+    @property
+    def column_count(self):
+        return len(self.column_names)
+
+    def table_id(self, table_name):
+        """Returns the ID of a table, raising KeyError for unknown tables."""
+        return self._table_ids[table_name]
+
+    def row_estimate(self, table_name):
+        """The server's row count estimate of a table, or None if unknown."""
+        rows = self.table_rows[self.table_id(table_name)]
+        return None if rows == NO_LENGTH else rows
+
+    def column_range(self, table_id):
+        """The range of column IDs that belong to a table."""
+        self._require_finished()
+        return range(self.table_offsets[table_id], self.table_offsets[table_id + 1])
+
+    def column_id(self, table_name, column_name, _check=True):
+        """Returns the ID of a column, or -1 if the table has no such column."""
+        if _check:
+            self._require_finished()
+        table_id = self._table_ids.get(table_name)
+        if table_id is None:
+            return -1
+        names = self.column_names
+        for column_id in range(self.table_offsets[table_id], self.table_offsets[table_id + 1]):
+            if names[column_id] == column_name:
+                return column_id
+        return -1
+
+    def column(self, column_id):
+        """Materialises a Column record."""
+        self._require_finished()
+        length = self.column_lengths[column_id]
+        return Column(column_id, self.column_tables[column_id], self.column_names[column_id],
+                      self.type_names[self.column_types[column_id]],
+                      None if length == NO_LENGTH else length,
+                      bool(self.column_nullable[column_id]),
+                      self.key_names[self.column_keys[column_id]],
+                      self.extra_names[self.column_extras[column_id]])
+
+    def columns(self, table_name):
+        """Column records of a table, in ordinal order."""
+        return [self.column(column_id) for column_id in self.column_range(self.table_id(table_name))]
+
+    def _require_finished(self):
+        if not self._finished:
+            raise RuntimeError("SchemaModel.finish() must be called after adding tables or columns")
+
+    # --- Dict compatibility -------------------------------------------------
+
+    def schema_view(self):
+        """Read-only {table_name: [column_dict, ...]} view; dicts are built on access."""
+        self._require_finished()
+        return SchemaView(self)
+
+    def foreign_keys_view(self):
+        """The foreign keys as a list of dicts."""
+        return [fk.as_dict() for fk in self.foreign_keys]
+
+    def to_dicts(self):
+        """Returns plain (schema, foreign_keys) in the get_schema_for_database format."""
+        return ({table_name: [self.column(column_id).as_dict()
+                              for column_id in self.column_range(table_id)]
+                 for table_id, table_name in enumerate(self.table_names)},
+                self.foreign_keys_view())
+
+class SchemaView(Mapping):
+    """Mapping view of a SchemaModel in the {table_name: [column_dict, ...]} shape."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __getitem__(self, table_name):
+        return TableColumnsView(self.model, self.model.table_id(table_name))
+
+    def __iter__(self):
+        return iter(self.model.table_names)
+
+    def __len__(self):
+        return len(self.model.table_names)
+
+    def __contains__(self, table_name):
+        return table_name in self.model
+
+class TableColumnsView(Sequence):
+    """Sequence view of one table's columns as column dicts."""
+
+    def __init__(self, model, table_id):
+        self.model = model
+        self.columns = model.column_range(table_id)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.model.column(column_id).as_dict() for column_id in self.columns[index]]
+        return self.model.column(self.columns[index]).as_dict()
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
@@ -0,0 +1,177 @@
+import bisect
+
+# Kinds of searchable entries, in the order they are ranked for equally good matches.
+KIND_TABLE = 0
+KIND_COLUMN = 1
+KIND_FOREIGN_KEY = 2
+KIND_TYPE = 3
+KINDS = (KIND_TABLE, KIND_COLUMN, KIND_FOREIGN_KEY, KIND_TYPE)
+
+# Queries shorter than this (the trigram length) only match names starting with them.
+MIN_SUBSTRING_QUERY = 3
+
+def text_matches(text, query):
+    """Whether a lowered name matches a lowered query, the rule shared by search() and table_matches()."""
+    if len(query) < MIN_SUBSTRING_QUERY:
+        return text.startswith(query)
+    return query in text
+
+class SearchResult:
+    __slots__ = ('kind', 'table_name', 'name')
+
+    def __init__(self, kind, table_name, name):
+        self.kind = kind
+        self.table_name = table_name
+        self.name = name   # The matched name: table, column, constraint or data type
+
+    def label(self):
+        if self.kind == KIND_TABLE:
+            return self.table_name
+        if self.kind == KIND_COLUMN:
+            return f"{self.table_name}.{self.name}"
+        if self.kind == KIND_FOREIGN_KEY:
+            return f"{self.name} (FK on {self.table_name})"
+        return f"{self.table_name} ({self.name.upper()} column)"
+
+    def __repr__(self):
+        return f"SearchResult({self.label()!r})"
+
+class SearchIndex:
+    """
+    Case-insensitive search over table names, column names, column data types and
+    foreign key constraint names, built once per schema load for type-ahead.
+
+    Each kind of entry has a sorted name list, which yields exact and prefix
+    matches by bisection, and a trigram index, which yields the candidates for
+    substring matches. search() stops as soon as it has enough results, so its
+    cost depends on the result limit rather than on the schema size, and
+    table_matches() answers per table for highlighting the visible ones.
+    """
+
+    def __init__(self, db_schema=None, foreign_keys=()):
+        self._entries = []                                # [(kind, table_name, name, lowered_text)]
+        self._sorted = {kind: [] for kind in KINDS}       # {kind: [(lowered_text, entry_id), ...]} sorted
+        self._trigrams = {kind: {} for kind in KINDS}     # {kind: {trigram: [entry_id, ...]}}
+        self._table_entries = {}                          # {table_name: [entry_id, ...]}
+
+        for table_name, columns in (db_schema or {}).items():
+            self._add(KIND_TABLE, table_name, table_name)
+            self._add_columns(table_name, ((col['name'], col['type']) for col in columns))
+        self._add_foreign_keys((fk['fk_table'], fk['constraint_name']) for fk in foreign_keys)
+        self._sort()
+
+    @classmethod
+    def from_model(cls, model):
+        """Builds the index straight from a SchemaModel's arrays, without column dicts."""
+        index = cls()
+        names, types, type_names = model.column_names, model.column_types, model.type_names
+        for table_id, table_name in enumerate(model.table_names):
+            index._add(KIND_TABLE, table_name, table_name)
+            index._add_columns(table_name, ((names[column_id], type_names[types[column_id]])
+                                            for column_id in model.column_range(table_id)))
+        index._add_foreign_keys((fk.fk_table, fk.constraint_name) for fk in model.foreign_keys)
+        index._sort()
+        return index
+
+    def _add_foreign_keys(self, tables_and_constraints):
+        for fk_table, constraint_name in tables_and_constraints:
+            if constraint_name:
+                self._add(KIND_FOREIGN_KEY, fk_table, constraint_name)
+
+    def _sort(self):
+        for names in self._sorted.values():
+            names.sort()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add_columns(self, table_name, columns):
+        """Indexes the columns of a table later, e.g. once they are fetched on demand."""
+        sorted_lengths = {kind: len(names) for kind, names in self._sorted.items()}
+        self._add_columns(table_name, ((col['name'], col['type']) for col in columns))
+        for kind, names in self._sorted.items():
+            appended = names[sorted_lengths[kind]:]
+            del names[sorted_lengths[kind]:]
+            for item in appended:
+                bisect.insort(names, item)
+
+    def _add_columns(self, table_name, names_and_types):
+        types = set()
+        for column_name, data_type in names_and_types:
+            self._add(KIND_COLUMN, table_name, column_name)
+            if data_type not in types:
+                # Types are listed once per table: "tables with a JSON column".
+                types.add(data_type)
+                self._add(KIND_TYPE, table_name, data_type)
+
+    def _add(self, kind, table_name, name):
+        entry_id = len(self._entries)
+        text = name.lower()
+        self._entries.append((kind, table_name, name, text))
+        self._sorted[kind].append((text, entry_id))
+        trigrams = self._trigrams[kind]
+        for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            trigrams.setdefault(trigram, []).append(entry_id)
+        self._table_entries.setdefault(table_name, []).append(entry_id)
+
+    def search(self, query, limit=50, kinds=KINDS):
+        """
+        Returns up to limit SearchResults for entries containing query. Exact matches
+        come first, then prefix matches, then other substring matches; within each
+        group tables come before columns, foreign keys and types. Queries shorter
+        than three characters only match exact names and prefixes.
+        """
+        query = query.strip().lower()
+        if not query or limit <= 0:
+            return []
+        kinds = sorted(kinds)
+        found = []
+
+        # Exact matches, then prefixes, from the sorted name lists.
+        for exact in (True, False):
+            for kind in kinds:
+                names = self._sorted[kind]
+                for i in range(bisect.bisect_left(names, (query,)), len(names)):
+                    text, entry_id = names[i]
+                    if (text != query) if exact else not text.startswith(query):
+                        break
+                    if exact or text != query:
+                        found.append(entry_id)
+                        if len(found) >= limit:
+                            return self._results(found)
+
+        # Other substrings: check the entries holding the query's rarest trigram.
+        if len(query) >= MIN_SUBSTRING_QUERY:
+            query_trigrams = {query[i:i + 3] for i in range(len(query) - 2)}
+            for kind in kinds:
+                trigrams = self._trigrams[kind]
+                postings = [trigrams.get(trigram, ()) for trigram in query_trigrams]
+                for entry_id in min(postings, key=len):
+                    text = self._entries[entry_id][3]
+                    if text_matches(text, query) and not text.startswith(query):
+                        found.append(entry_id)
+                        if len(found) >= limit:
+                            return self._results(found)
+
+        return self._results(found)
+
+    def _results(self, entry_ids):
+        return [SearchResult(*self._entries[entry_id][:3]) for entry_id in entry_ids]
+
+    def table_matches(self, table_name, query):
+        """
+        Returns (table_matched, matching_column_names) for one table: whether any
+        entry of the table matches query as in search(), and which of its column
+        names do.
+        """
+        query = query.strip().lower()
+        matched = False
+        columns = set()
+        if query:
+            for entry_id in self._table_entries.get(table_name, ()):
+                kind, _, name, text = self._entries[entry_id]
+                if text_matches(text, query):
+                    matched = True
+                    if kind == KIND_COLUMN:
+                        columns.add(name)
+        return matched, columns
@@ -0,0 +1,98 @@
+import math
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over axis-aligned boxes.
+
+    Each key is stored in every cell its box overlaps, so range queries and point
+    hit-tests only look at the few cells they touch instead of every box.
+    Boxes are (x1, y1, x2, y2) tuples in layout coordinates.
+    """
+
+    def __init__(self, cell_size=512):
+        self.cell_size = cell_size
+        self.boxes = {}   # {key: box}
+        self._cells = {}  # {(cell_x, cell_y): {key, ...}}
+
+    def _cell_range(self, box):
+        size = self.cell_size
+        x1, y1, x2, y2 = box
+        return (range(math.floor(x1 / size), math.floor(x2 / size) + 1),
+                range(math.floor(y1 / size), math.floor(y2 / size) + 1))
+
+    def insert(self, key, box):
+        if key in self.boxes:
+            self.remove(key)
+        self.boxes[key] = box
+        columns, rows = self._cell_range(box)
+        for cx in columns:
+            for cy in rows:
+                self._cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key):
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return
+        columns, rows = self._cell_range(box)
+        for cx in columns:
+            for cy in rows:
+                cell = self._cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(key)
+                    if not cell:
+                        del self._cells[(cx, cy)]
+
+    def update(self, key, box):
+        """Moves a key to a new box, touching only the cells it enters or leaves."""
+        old_box = self.boxes.get(key)
+        if old_box is None:
+            self.insert(key, box)
+            return
+        self.boxes[key] = box
+        old_cells = {(cx, cy) for cx in self._cell_range(old_box)[0] for cy in self._cell_range(old_box)[1]}
+        columns, rows = self._cell_range(box)
+        new_cells = {(cx, cy) for cx in columns for cy in rows}
+        for cell_key in old_cells - new_cells:
+            cell = self._cells[cell_key]
+            cell.discard(key)
+            if not cell:
+                del self._cells[cell_key]
+        for cell_key in new_cells - old_cells:
+            self._cells.setdefault(cell_key, set()).add(key)
+
+    def query(self, rect):
+        """Returns the set of keys whose boxes intersect rect."""
+        x1, y1, x2, y2 = rect
+        found = set()
+        columns, rows = self._cell_range(rect)
+        if len(columns) * len(rows) > len(self._cells):
+            # Huge query rectangle: walking the occupied cells is cheaper.
+            candidates = set().union(*self._cells.values()) if self._cells else set()
+        else:
+            candidates = set()
+            for cx in columns:
+                for cy in rows:
+                    candidates.update(self._cells.get((cx, cy), ()))
+        for key in candidates:
+            bx1, by1, bx2, by2 = self.boxes[key]
+            if bx2 >= x1 and bx1 <= x2 and by2 >= y1 and by1 <= y2:
+                found.add(key)
+        return found
+
+    def hit(self, x, y):
+        """Returns the keys whose boxes contain the point (x, y)."""
+        size = self.cell_size
+        cell = self._cells.get((math.floor(x / size), math.floor(y / size)), ())
+        hits = []
+        for key in cell:
+            bx1, by1, bx2, by2 = self.boxes[key]
+            if bx1 <= x <= bx2 and by1 <= y <= by2:
+                hits.append(key)
+        return hits
+
+    def clear(self):
+        self.boxes.clear()
+        self._cells.clear()
+
+    def __len__(self):
+        return len(self.boxes)
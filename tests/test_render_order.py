@@ -0,0 +1,47 @@
+"""
+Checks the stacking order of canvas items recycled while panning. Needs a
+display (or Xvfb); skipped without one.
+"""
+import tkinter as tk
+
+import pytest
+
+import db_connector
+from benchmarks.fake_mysql import FakeMySQLServer
+from benchmarks.synthetic_schema import generate_schema
+from visualize_mysql import MySQLVisualizerApp
+
+@pytest.fixture
+def app():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    root.withdraw()
+    app = MySQLVisualizerApp(root)
+    app.layout_var.set("Grid")
+    server = FakeMySQLServer()
+    server.load_database("render_db", generate_schema(300, 8))
+    app._on_schema_loaded("render_db", db_connector.get_schema_model(server.connect(), "render_db"))
+    yield app
+    root.destroy()
+
+def shown_stacking(canvas):
+    """{item_id: position in the stacking order} of the items that are not hidden."""
+    return {item_id: position for position, item_id in enumerate(canvas.find_all())
+            if canvas.itemcget(item_id, "state") != "hidden"}
+
+def test_text_stays_above_boxes_after_panning(app):
+    # Tables scroll out of view and others in, reusing the pooled items.
+    for step in range(12):
+        left, top = (step % 3) * 400, (step // 3) * 450
+        app._visible_world_rect = lambda: (left, top, left + 1000, top + 600)
+        app._render_viewport()
+
+        stacking = shown_stacking(app.canvas)
+        boxes = [stacking[i] for i in app.canvas.find_withtag("table_box") if i in stacking]
+        texts = [stacking[i] for tag in ("table_name", "column") for i in app.canvas.find_withtag(tag) if i in stacking]
+        lines = [stacking[i] for i in app.canvas.find_withtag("relationship") if i in stacking]
+        assert boxes and texts
+        assert max(boxes) < min(texts)
+        assert not lines or max(lines) < min(boxes)
@@ -0,0 +1,35 @@
+import pytest
+
+from search_index import SearchIndex
+
+SCHEMA = {
+    "orders": [{'name': "id", 'type': "int"}, {'name': "customer_id", 'type': "int"}],
+    "customers": [{'name': "id", 'type': "int"}, {'name': "name", 'type': "varchar"}],
+    "products": [{'name': "sku", 'type': "varchar"}, {'name': "stock", 'type': "int"}],
+    "order_items": [{'name': "order_id", 'type': "int"}, {'name': "product_sku", 'type': "varchar"}],
+}
+FOREIGN_KEYS = [{'fk_table': "orders", 'constraint_name': "fk_orders_customer"},
+                {'fk_table': "order_items", 'constraint_name': "fk_items_order"}]
+
+@pytest.fixture
+def index():
+    return SearchIndex(SCHEMA, FOREIGN_KEYS)
+
+def highlighted_tables(index, query):
+    return {table_name for table_name in SCHEMA if index.table_matches(table_name, query)[0]}
+
+def listed_tables(index, query):
+    return {result.table_name for result in index.search(query, limit=1000)}
+
+@pytest.mark.parametrize("query", ["o", "s", "i", "st", "id", "cu", "ord", "sku", "tock"])
+def test_highlighting_agrees_with_results(index, query):
+    assert highlighted_tables(index, query) == listed_tables(index, query)
+
+def test_one_character_query_matches_prefixes_only(index):
+    assert highlighted_tables(index, "s") == {"products"}    # sku, stock; not "customers"
+    assert index.table_matches("products", "s") == (True, {"sku", "stock"})
+
+def test_two_character_query_matches_prefixes_only(index):
+    assert highlighted_tables(index, "cu") == {"orders", "customers"}   # customer_id, customers
+    assert index.table_matches("orders", "cu") == (True, {"customer_id"})
+    assert index.table_matches("order_items", "id") == (False, set())  # order_id only contains "id"
@@ -0,0 +1,97 @@
+import unicodedata
+
+import instrumentation
+
+try:
+    import tkinter.font as tkfont
+except ImportError:
+    tkfont = None
+
+class TextMeasurer:
+    """
+    Measures text widths with tkinter.font.Font.measure, memoizing every
+    (font, string) pair so each distinct string is measured only once.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._fonts = {}
+        self._widths = {}
+
+    def font(self, font_spec):
+        """Returns a cached tkinter Font for a font tuple such as ("Arial", 10)."""
+        font = self._fonts.get(font_spec)
+        if font is None:
+            font = tkfont.Font(root=self.root, font=font_spec)
+            self._fonts[font_spec] = font
+        return font
+
+    def measure(self, font_spec, text):
+        """Returns the width in pixels of text drawn in font_spec."""
+        key = (font_spec, text)
+        width = self._widths.get(key)
+        if width is None:
+            instrumentation.count("text.measured")
+            width = self.font(font_spec).measure(text)
+            self._widths[key] = width
+        return width
+
+    def measure_parts(self, font_spec, parts):
+        """
+        Returns the width of the concatenation of parts, measuring each part separately.
+        Splitting a string into reusable pieces (e.g. a column's name and its type) lets
+        common pieces like " (INT)" hit the cache across tables.
+        """
+        return sum(self.measure(font_spec, part) for part in parts)
+
+    def clear(self):
+        self._widths.clear()
+
+# Helvetica/Arial advance widths for ASCII 32..126, in 1/1000 em (from the Helvetica AFM).
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+# Bold Helvetica is on average this much wider than the regular weight.
+_BOLD_FACTOR = 1.08
+# Tk font sizes are in points; at Tk's default scaling a point is 4/3 of a pixel.
+PIXELS_PER_POINT = 4 / 3
+
+class ApproximateTextMeasurer:
+    """
+    Pure-Python text width model with the same interface as TextMeasurer, used
+    where no Tk interpreter is available (e.g. the headless exporter). Widths come
+    from Helvetica metrics, a close match for the Arial fonts the diagram uses.
+    """
+
+    def __init__(self):
+        self._widths = {}
+
+    def measure(self, font_spec, text):
+        key = (font_spec, text)
+        width = self._widths.get(key)
+        if width is None:
+            units = 0
+            for char in text:
+                code = ord(char)
+                if 32 <= code <= 126:
+                    units += _HELVETICA_WIDTHS[code - 32]
+                elif unicodedata.east_asian_width(char) in ("W", "F"):
+                    units += 1000
+                else:
+                    units += 556
+            if "bold" in font_spec[2:]:
+                units *= _BOLD_FACTOR
+            width = round(units * font_spec[1] * PIXELS_PER_POINT / 1000)
+            self._widths[key] = width
+        return width
+
+    def measure_parts(self, font_spec, parts):
+        return sum(self.measure(font_spec, part) for part in parts)
+
+    def clear(self):
+        self._widths.clear()
@@ -1,5 +1,136 @@
+import collections
+import contextlib
+import os
+import queue
+import threading
 import tkinter as tk
+from tkinter import filedialog
 import db_connector
+import diagram
+import fk_graph
+import fk_index
+import instrumentation
+import layout
+import spatial_index
+import schema_cache
+import schema_diff
+import schema_model
+import search_index
+import text_metrics
+from diagram import (TABLE_HEADER_HEIGHT, COLUMN_LINE_HEIGHT, TEXT_PADDING, RECT_PADDING,
+                     FONT_TABLE_NAME, FONT_COLUMN)
+
+# How often (in ms) the Tk main loop polls the worker result queue.
+QUEUE_POLL_INTERVAL_MS = 50
+
+# Level of detail used when drawing a table, chosen from the zoom factor.
+DETAIL_OUTLINE = 0   # Table box only
+DETAIL_HEADER = 1    # Table box and name
+DETAIL_FULL = 2      # Table box, name and columns
+HEADER_DETAIL_ZOOM = 0.3
+FULL_DETAIL_ZOOM = 0.75
+MIN_ZOOM = 0.05
+MAX_ZOOM = 3.0
+
+# Layout choices offered in the UI, mapped to layout module names.
+LAYOUT_CHOICES = {"Grid": "grid", "Layered": "layered", "Force-directed": "force"}
+
+# How often watch mode checks the loaded database for schema changes. After failed
+# checks the interval doubles, up to WATCH_MAX_INTERVAL_MS.
+WATCH_INTERVAL_MS = 5000
+WATCH_MAX_INTERVAL_MS = 60000
+
+# Refresh interval of the F12 timing overlay.
+DEBUG_OVERLAY_INTERVAL_MS = 500
+
+# Extra canvas pixels around the window in which tables are rendered ahead of scrolling.
+VIEWPORT_MARGIN = 200
+
+# Streamed loads hand tables to the Tk thread in batches of this many tables, with at
+# most STREAM_MAX_PENDING_BATCHES batches waiting, which bounds the memory of a load.
+STREAM_BATCH_TABLES = 200
+STREAM_MAX_PENDING_BATCHES = 4
+
+# Relationships into a table referenced from at least this many rendered tables are
+# bundled: they meet in front of the referenced column and arrive as one line.
+BUNDLE_MIN_TABLES = 4
+
+# Options of the canvas items, in the order in which _flush_canvas_ops passes them to
+# CANVAS_OPS_SCRIPT. Every item of a kind is created or reused with all of them set.
+ITEM_OPTIONS = {
+    "rectangle": ("fill", "outline", "width", "tags"),
+    "text": ("text", "font", "anchor", "fill", "tags"),
+    "line": ("fill", "width", "arrow", "tags"),
+}
+
+# Tcl procedure applying a batch of canvas operations in one call from Python. It
+# hides the pooled items, creates or reuses the items of each kind from flat lists
+# of {item_id coords option values...} (an empty item_id creates a new item), and
+# moves or restyles items from a list of {item_id coords options}. Reused items keep
+# their old place in the stacking order, so after showing items it restores the
+# order: relationship lines at the bottom, then table boxes, names and columns, with
+# lazily expanded tables (which outgrow their layout space) on top. Returns the IDs
+# of the created and reused items, rectangles first, then texts, then lines. Tk
+# redraws the canvas when idle, so the whole batch shows up in one redraw.
+CANVAS_OPS_PROC = "mysql_visualizer_apply_ops"
+CANVAS_OPS_SCRIPT = """
+proc mysql_visualizer_apply_ops {canvas hidden rectangles texts lines updates} {
+    foreach item $hidden {
+        $canvas itemconfigure $item -state hidden -tags {}
+    }
+    set ids {}
+    foreach {item coords fill outline width tags} $rectangles {
+        set options [list -fill $fill -outline $outline -width $width -tags $tags]
+        if {$item eq ""} {
+            set item [$canvas create rectangle {*}$coords {*}$options]
+        } else {
+            $canvas coords $item {*}$coords
+            $canvas itemconfigure $item -state normal {*}$options
+        }
+        lappend ids $item
+    }
+    foreach {item coords text font anchor fill tags} $texts {
+        set options [list -text $text -font $font -anchor $anchor -fill $fill -tags $tags]
+        if {$item eq ""} {
+            set item [$canvas create text {*}$coords {*}$options]
+        } else {
+            $canvas coords $item {*}$coords
+            $canvas itemconfigure $item -state normal {*}$options
+        }
+        lappend ids $item
+    }
+    foreach {item coords fill width arrow tags} $lines {
+        set options [list -fill $fill -width $width -arrow $arrow -tags $tags]
+        if {$item eq ""} {
+            set item [$canvas create line {*}$coords {*}$options]
+        } else {
+            $canvas coords $item {*}$coords
+            $canvas itemconfigure $item -state normal {*}$options
+        }
+        lappend ids $item
+    }
+    foreach {item coords options} $updates {
+        if {[llength $coords]} { $canvas coords $item {*}$coords }
+        if {[llength $options]} { $canvas itemconfigure $item {*}$options }
+    }
+    if {[llength $ids]} {
+        $canvas lower relationship
+        $canvas raise table_name
+        $canvas raise column
+        $canvas raise {expanded && table_box}
+        $canvas raise {expanded && !table_box}
+        $canvas raise debug_overlay
+    }
+    return $ids
+}
+"""
+
+# Number of search results listed under the search box.
+SEARCH_RESULT_LIMIT = 20
+
+# Focused views (neighbourhoods, join paths, cycles) show at most this many tables.
+MAX_FOCUS_TABLES = 40
+MAX_FOCUS_HOPS = 5
 
 class MySQLVisualizerApp:
     def __init__(self, master):
@@ -12,17 +143,65 @@ class MySQLVisualizerApp:
         self.password_var = tk.StringVar()
         self.status_label = None
 
-        self.db_connection = None
+        self.connection_pool = None
+        self.schema_cache = schema_cache.SchemaCache()
         self.selected_db_var = tk.StringVar(self.master)
         self.database_options_menu = None
         
         self.foreign_keys = [] 
+        self.fk_index = fk_index.ForeignKeyIndex()
+        self.db_schema = {}
+        self.schema_model = schema_model.SchemaModel().finish()
+        self.loaded_db = None
+        self.loaded_fingerprint = None
+        self.debug_overlay = False
+        self.debug_overlay_job = None
+        self.trace_from_environment = instrumentation.enabled   # MYSQL_VISUALIZER_TRACE keeps recording on
+        self.lazy_columns = False         # Loaded schema is an outline; columns are fetched per table
+        self.columns_requested = set()    # Tables whose columns are loaded or being fetched
+        self.columns_queue = []           # Tables waiting for the next column fetch
+        self.columns_fetching = False
+        self.watch_job = None
+        self.watch_failures = 0           # Failed watch checks in a row
+        self.search_index = search_index.SearchIndex()
+        self.search_results = []          # SearchResults listed under the search box
+        self.search_highlights = {}       # {table_name: (table_matched, matching_column_names)} for the current query
+        self.focus_tables = None          # {table_name: None} of the focused view, or None when all tables are shown
+        self.fk_components = None         # {table_name: its FK cycle component}, computed on first use
+        self.schema_stream = None         # State of the streamed load in progress, see _stream_schema
+        self.table_sizes = {}
         self.table_positions = {}
+        self.table_column_parts = {}
+        self.rendered_tables = {}         # {table_name: (detail_level, [[kind, item_id], ...])}
+        self.rendered_relationships = {}  # {(fk_table, pk_table): ([kind, item_id], coords, (fill, width))}
+        self.bundled_tables = set()       # Tables whose incoming relationships are drawn bundled
+        self.table_index = spatial_index.GridIndex()
+        self.column_anchors = {}          # {(table, column): (left_dx, right_dx, mid_dy)} relative to the table corner
+        self.hover_table = None
+        self.selected_table = None
+        self.drag_state = None
+        self.item_pool = {"rectangle": [], "text": [], "line": []}
+        # Canvas operations queued during a render and applied by _flush_canvas_ops.
+        self.canvas_ops = {kind: [] for kind in ITEM_OPTIONS}   # {kind: [(item, coords, options), ...]} to show
+        self.canvas_updates = []          # [(item, coords, options)] to move or restyle
+        self.canvas_hidden = set()        # IDs of released items to hide
+        self.zoom = 1.0
+        self._render_pending = False
+        self.text_measurer = text_metrics.TextMeasurer(self.master)
+
+        # Database work runs on a worker thread; results come back through this
+        # queue and are applied on the Tk thread by _process_ui_queue.
+        self.ui_queue = queue.Queue()
+        self.cancel_event = None
+        self.busy_buttons = []
+        self.busy = False
 
         self.connection_frame = self._create_connection_frame()
         self.connection_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
         self.canvas_frame = self._create_canvas_frame()
 
+        self.master.after(QUEUE_POLL_INTERVAL_MS, self._process_ui_queue)
+
     def _create_connection_frame(self):
         frame = tk.Frame(self.master)
 
@@ -46,6 +225,7 @@ class MySQLVisualizerApp:
 
         connect_button = tk.Button(frame, text="Connect", font=("Arial", 12, "bold"), command=self._on_connect_button_click)
         connect_button.grid(row=3, column=1, padx=5, pady=5, sticky="e")
+        self.busy_buttons.append(connect_button)
 
         frame.grid_columnconfigure(1, weight=1)
 
@@ -54,8 +234,56 @@ class MySQLVisualizerApp:
     def _create_canvas_frame(self):
         frame = tk.Frame(self.master)
 
-        self.canvas = tk.Canvas(frame, width=1000, height=600, bg="lightgray", bd=2, relief="groove")
-        self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Type-ahead search; Enter or a click on a result jumps to its table.
+        search_frame = tk.Frame(frame)
+        search_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=(5, 0))
+        search_label = tk.Label(search_frame, text="Search:", font=("Arial", 12))
+        search_label.pack(side=tk.LEFT)
+        self.search_var = tk.StringVar(self.master)
+        self.search_var.trace_add("write", lambda *_: self._on_search_changed())
+        search_entry = tk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.bind("<Return>", lambda e: self._on_search_result_chosen(0))
+        search_entry.bind("<Down>", lambda e: self._focus_search_results())
+        search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        self.search_results_list = tk.Listbox(frame, height=6, activestyle="dotbox")
+        self.search_results_list.bind("<Return>", lambda e: self._on_search_result_chosen())
+        self.search_results_list.bind("<ButtonRelease-1>", lambda e: self._on_search_result_chosen())
+
+        canvas_area = tk.Frame(frame)
+        self.canvas_area = canvas_area
+        canvas_area.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.canvas = tk.Canvas(canvas_area, width=1000, height=600, bg="lightgray", bd=2, relief="groove")
+        self.canvas.tk.eval(CANVAS_OPS_SCRIPT)
+        x_scrollbar = tk.Scrollbar(canvas_area, orient=tk.HORIZONTAL, command=self._on_xscroll)
+        y_scrollbar = tk.Scrollbar(canvas_area, orient=tk.VERTICAL, command=self._on_yscroll)
+        self.canvas.configure(xscrollcommand=x_scrollbar.set, yscrollcommand=y_scrollbar.set)
+
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        y_scrollbar.grid(row=0, column=1, sticky="ns")
+        x_scrollbar.grid(row=1, column=0, sticky="ew")
+        canvas_area.grid_rowconfigure(0, weight=1)
+        canvas_area.grid_columnconfigure(0, weight=1)
+
+        # Drag tables (or pan over empty space) with the left button, click to select,
+        # scroll with the wheel, zoom with Ctrl + wheel.
+        self.canvas.bind("<Configure>", self._schedule_render)
+        self.canvas.bind("<ButtonPress-1>", self._on_button_press)
+        self.canvas.bind("<B1-Motion>", self._on_button_motion)
+        self.canvas.bind("<ButtonRelease-1>", self._on_button_release)
+        self.canvas.bind("<Motion>", self._on_hover)
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        self.canvas.bind("<Shift-ButtonPress-1>", self._on_shift_click)
+        # F12 toggles the timing overlay; Shift+F12 saves the recorded timings.
+        self.master.bind("<F12>", self._toggle_debug_overlay)
+        self.master.bind("<Shift-F12>", self._save_trace)
+        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-4>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-5>", self._on_mouse_wheel)
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self._on_zoom(e, 1.2 if e.delta > 0 else 1 / 1.2))
+        self.canvas.bind("<Control-Button-4>", lambda e: self._on_zoom(e, 1.2))
+        self.canvas.bind("<Control-Button-5>", lambda e: self._on_zoom(e, 1 / 1.2))
 
         db_select_label = tk.Label(frame, text="Select Database:", font=("Arial", 12))
         db_select_label.pack(pady=5)
@@ -64,32 +292,132 @@ class MySQLVisualizerApp:
         self.database_options_menu = tk.OptionMenu(frame, self.selected_db_var, "No Database Selected")
         self.database_options_menu.pack(pady=5)
 
+        layout_names = [label for label, name in LAYOUT_CHOICES.items() if name in layout.available_layouts()]
+        self.layout_var = tk.StringVar(self.master, value="Layered" if "Layered" in layout_names else "Grid")
+        layout_menu = tk.OptionMenu(frame, self.layout_var, *layout_names, command=lambda _: self._apply_layout())
+        layout_menu.pack(pady=5)
+
+        self.watch_var = tk.BooleanVar(self.master, value=False)
+        watch_check = tk.Checkbutton(frame, text="Watch for changes", variable=self.watch_var, command=self._on_watch_toggled)
+        watch_check.pack(pady=5)
+
+        self.lazy_var = tk.BooleanVar(self.master, value=False)
+        lazy_check = tk.Checkbutton(frame, text="Load columns on demand", variable=self.lazy_var)
+        lazy_check.pack(pady=5)
+
+        # Focused views around the selected table; Shift+click another table for the join path to it.
+        focus_frame = tk.Frame(frame)
+        focus_frame.pack(pady=5)
+        hops_label = tk.Label(focus_frame, text="Hops:", font=("Arial", 12))
+        hops_label.pack(side=tk.LEFT)
+        self.focus_hops_var = tk.IntVar(self.master, value=1)
+        hops_spinbox = tk.Spinbox(focus_frame, from_=1, to=MAX_FOCUS_HOPS, width=3, textvariable=self.focus_hops_var)
+        hops_spinbox.pack(side=tk.LEFT, padx=5)
+        focus_button = tk.Button(focus_frame, text="Focus on Selected", command=self._on_focus_button_click)
+        focus_button.pack(side=tk.LEFT, padx=5)
+        cycle_button = tk.Button(focus_frame, text="Show Cycle", command=self._on_cycle_button_click)
+        cycle_button.pack(side=tk.LEFT, padx=5)
+        show_all_button = tk.Button(focus_frame, text="Show All", command=self._show_all_tables)
+        show_all_button.pack(side=tk.LEFT, padx=5)
+
         load_schema_button = tk.Button(frame, text="Load Schema", font=("Arial", 12, "bold"), command=self._on_load_schema_button_click)
         load_schema_button.pack(pady=5)
+        self.busy_buttons.append(load_schema_button)
+
+        self.cancel_button = tk.Button(frame, text="Cancel", font=("Arial", 12), state=tk.DISABLED, command=self._on_cancel_button_click)
+        self.cancel_button.pack(pady=5)
+
+        self.load_status_label = tk.Label(frame, text="", font=("Arial", 12), fg="blue")
+        self.load_status_label.pack(pady=5)
 
         return frame
 
-    def _populate_database_dropdown(self):
-        """Fetches database names and populates the dropdown menu."""
-        if self.db_connection:
-            try:
-                databases = db_connector.get_all_databases(self.db_connection)
+    def _on_xscroll(self, *args):
+        self.canvas.xview(*args)
+        self._schedule_render()
+
+    def _on_yscroll(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_render()
 
-                menu = self.database_options_menu["menu"]
-                menu.delete(0, "end")
+    def _run_in_background(self, task, on_success, on_error, on_cancelled=None):
+        """
+        Runs task(report_progress, cancel_event) on a worker thread.
+        on_success(result), on_error(exception) and on_cancelled() are called back
+        on the Tk thread once the task finishes. report_progress(text) may be called
+        from the worker to update the status label.
+        """
+        self.cancel_event = threading.Event()
+        cancel_event = self.cancel_event
 
-                if databases:
-                    for db in databases:
-                        menu.add_command(label=db, command=tk._setit(self.selected_db_var, db))
-                    self.selected_db_var.set(databases[0])
-                else:
-                    self.selected_db_var.set("No Databases Found")
-                    menu.add_command(label="No Databases Found", command=tk._setit(self.selected_db_var, "No Databases Found"))
+        def report_progress(text):
+            self.ui_queue.put((self._show_progress, (text,)))
 
+        def worker():
+            done = None
+            try:
+                result = task(report_progress, cancel_event)
+            except db_connector.SchemaLoadCancelled:
+                if on_cancelled:
+                    done = (on_cancelled, ())
             except Exception as e:
-                self.status_label.config(text=f"Error fetching databases: {e}", fg="red")
+                done = (on_error, (e,))
+            else:
+                done = (on_success, (result,))
+            finally:
+                # Clear the busy state first, so the callback may start the next task
+                # (e.g. a layout after a schema load).
+                self.ui_queue.put((self._set_busy, (False,)))
+                if done:
+                    self.ui_queue.put(done)
+
+        self._set_busy(True)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _process_ui_queue(self):
+        """Applies results posted by worker threads. Runs on the Tk thread via after()."""
+        # Only what is queued now: a streaming worker refills the queue as it is drained,
+        # and the window must get to redraw between batches.
+        try:
+            for _ in range(self.ui_queue.qsize()):
+                callback, args = self.ui_queue.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        self.master.after(QUEUE_POLL_INTERVAL_MS, self._process_ui_queue)
+
+    def _set_busy(self, busy):
+        """Disables the action buttons while a worker owns the database connection."""
+        self.busy = busy
+        for button in self.busy_buttons:
+            button.config(state=tk.DISABLED if busy else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+
+    def _show_progress(self, text):
+        self._set_status(text, fg="blue")
+
+    def _set_status(self, text, fg="red"):
+        """Shows a message on both the connection screen and the canvas screen."""
+        self.status_label.config(text=text, fg=fg)
+        self.load_status_label.config(text=text, fg=fg)
+
+    def _on_cancel_button_click(self):
+        if self.cancel_event:
+            self.cancel_event.set()
+            self._show_progress("Cancelling...")
+
+    def _populate_database_dropdown(self, databases):
+        """Populates the dropdown menu with the given database names."""
+        menu = self.database_options_menu["menu"]
+        menu.delete(0, "end")
+
+        if databases:
+            for db in databases:
+                menu.add_command(label=db, command=tk._setit(self.selected_db_var, db))
+            self.selected_db_var.set(databases[0])
         else:
-            self.status_label.config(text="Not connected to database.", fg="orange")
+            self.selected_db_var.set("No Databases Found")
+            menu.add_command(label="No Databases Found", command=tk._setit(self.selected_db_var, "No Databases Found"))
             
     def _on_connect_button_click(self):
         host = self.host_var.get()
@@ -97,226 +425,1276 @@ class MySQLVisualizerApp:
         password = self.password_var.get()
 
         self.status_label.config(text="Connecting...", fg="blue")
-        self.master.update_idletasks()
 
-        try:
-            self.db_connection = db_connector.connect(host, username, password)
-            
-            if self.db_connection:
-                self.status_label.config(text="Connection successful!", fg="green")
+        def task(report_progress, cancel_event):
+            pool = db_connector.create_pool(host, username, password)
+            databases = []
+            if pool:
+                report_progress("Fetching databases...")
+                with pool.connection() as connection:
+                    databases = db_connector.get_all_databases(connection)
+            return pool, databases
 
-                self.connection_frame.pack_forget()
-                self.canvas_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        self._run_in_background(task, self._on_connect_finished,
+                                lambda e: self.status_label.config(text=f"An unexpected error occurred: {e}", fg="red"))
 
-                self._populate_database_dropdown()
+    def _on_connect_finished(self, result):
+        pool, databases = result
+        self.connection_pool = pool
 
-            else:
-                self.status_label.config(text="Connection failed. Check credentials and server status.", fg="red")
+        if self.connection_pool:
+            self.status_label.config(text="Connection successful!", fg="green")
 
-        except Exception as e:
-            self.status_label.config(text=f"An unexpected error occurred: {e}", fg="red")
+            self.connection_frame.pack_forget()
+            self.canvas_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+
+            self._populate_database_dropdown(databases)
+
+        else:
+            self.status_label.config(text="Connection failed. Check credentials and server status.", fg="red")
     
     def _on_load_schema_button_click(self):
         """Handles the 'Load Schema' button click event."""
         selected_db = self.selected_db_var.get()
 
-        if not self.db_connection:
-            self.status_label.config(text="Error: Not connected to a database.", fg="red")
+        if not self.connection_pool:
+            self._set_status("Error: Not connected to a database.", fg="red")
             return
 
         if selected_db == "No Database Selected" or not selected_db:
-            self.status_label.config(text="Please select a database.", fg="orange")
+            self._set_status("Please select a database.", fg="orange")
             return
 
-        self.status_label.config(text=f"Loading schema for '{selected_db}'...", fg="blue")
-        self.master.update_idletasks()
+        self._load_schema(selected_db)
 
-        self.canvas.delete("all") 
-        self.table_positions = {}
+    def _load_schema(self, selected_db, from_watch=False):
+        """
+        Loads a database on a worker thread. Reloading the database that is already
+        shown computes a diff against it, so only the changed tables are redrawn.
+        A reload that fails keeps the diagram shown; from_watch reports the failure
+        to watch mode, which then polls less often.
+        """
+        self._set_status(f"Loading schema for '{selected_db}'...", fg="blue")
+
+        pool = self.connection_pool
+        lazy = self.lazy_var.get()
+        # Collapsed schemas have no columns to compare, so they are always reloaded whole.
+        previous = None
+        if selected_db == self.loaded_db and self.table_positions and not lazy and not self.lazy_columns:
+            previous = self.schema_model
+        elif not lazy:
+            self._stream_schema(selected_db)
+            return
+
+        def task(report_progress, cancel_event):
+            def on_progress(tables_done, tables_total):
+                report_progress(f"Loading schema for '{selected_db}': {tables_done}/{tables_total} tables...")
+
+            # Errors are raised rather than giving an empty model, so a failed load keeps the diagram.
+            with pool.connection() as connection:
+                # Taken before the load, so a change that lands during it shows up on the next watch poll.
+                fingerprint = db_connector.get_schema_fingerprint(connection, selected_db)
+                if lazy:
+                    model = db_connector.fetch_schema_outline(connection, selected_db, cancel_event=cancel_event)
+            if not lazy:
+                # A reload; other full loads are streamed. Nothing is drawn until it is
+                # complete, so it is read in shards over all of the pool's connections.
+                model = db_connector.fetch_schema_model_parallel(pool, selected_db, on_progress, cancel_event)
+            diff = None
+            if previous is not None:
+                diff = schema_diff.diff_schemas(previous.schema_view(), previous.foreign_keys_view(),
+                                                model.schema_view(), model.foreign_keys_view())
+            with instrumentation.span("search.index", tables=len(model)):
+                index = search_index.SearchIndex.from_model(model)
+            return model, fingerprint, diff, lazy, index
+
+        def on_success(result):
+            if from_watch:
+                self.watch_failures = 0
+            self._on_schema_loaded(selected_db, *result)
+
+        def on_error(e):
+            self._set_status(f"Error loading schema: {e}")
+            if from_watch:
+                self._on_watch_reload_failed()
+
+        self._run_in_background(task, on_success, on_error,
+                                lambda: self._set_status(f"Loading schema for '{selected_db}' was cancelled.", fg="orange"))
+
+    def _stream_schema(self, selected_db):
+        """
+        Loads a database as a stream: tables are drawn in batches, placed in rows,
+        while the rest of the schema is still being read, and are arranged with the
+        selected layout once all have arrived. A database whose cached copy is still
+        valid is loaded whole from the cache instead.
+        """
+        pool = self.connection_pool
+        cache = self.schema_cache
+        stream = {'db_name': selected_db, 'model': None, 'foreign_keys': [], 'top': 0,
+                  'slots': threading.Semaphore(STREAM_MAX_PENDING_BATCHES)}
+        self.schema_stream = stream
+
+        def task(report_progress, cancel_event):
+            def on_progress(tables_done, tables_total):
+                report_progress(f"Loading schema for '{selected_db}': {tables_done}/{tables_total} tables...")
+
+            def post(callback, *args):
+                # Wait while the Tk thread is behind, so only a few batches are held at a time.
+                while not stream['slots'].acquire(timeout=0.1):
+                    if cancel_event.is_set():
+                        raise db_connector.SchemaLoadCancelled()
+                self.ui_queue.put((callback, (stream, *args)))
+
+            with pool.connection() as connection:
+                fingerprint = db_connector.get_schema_fingerprint(connection, selected_db)
+                host = db_connector.connection_cache_key(pool)
+                if fingerprint is not None and cache.get_fingerprint(host, selected_db) == fingerprint:
+                    model = db_connector.get_schema_model(connection, selected_db, progress_callback=on_progress,
+                                                          cancel_event=cancel_event, cache=cache)
+                    with instrumentation.span("search.index", tables=len(model)):
+                        index = search_index.SearchIndex.from_model(model)
+                    return model, index, fingerprint, None
+
+                table_versions = db_connector.get_table_versions(connection, selected_db)
+                # Foreign keys come first, so column markers are right as soon as a table is drawn.
+                post(self._on_stream_started, list(db_connector.iter_foreign_keys(connection, selected_db)))
+                batch = []
+                with contextlib.closing(db_connector.iter_schema(connection, selected_db, on_progress,
+                                                                 cancel_event)) as tables:
+                    for table in tables:
+                        batch.append(table)
+                        if len(batch) >= STREAM_BATCH_TABLES:
+                            post(self._on_stream_batch, batch)
+                            batch = []
+                if batch:
+                    post(self._on_stream_batch, batch)
+            return None, None, fingerprint, table_versions
+
+        def on_stopped(text, fg):
+            # Tables that arrived stay on the diagram, and a reload adds the rest.
+            self._finish_stream(stream)
+            self._set_status(text, fg=fg)
+
+        self._run_in_background(task,
+                                lambda result: self._on_stream_finished(stream, *result),
+                                lambda e: on_stopped(f"Error loading schema: {e}", "red"),
+                                lambda: on_stopped(f"Loading schema for '{selected_db}' was cancelled.", "orange"))
+
+    def _on_stream_started(self, stream, foreign_keys):
+        """Replaces the diagram with an empty streamed schema. Runs on the Tk thread."""
+        stream['slots'].release()
+        if stream is not self.schema_stream:
+            return
+        self._clear_canvas()
+        self.canvas.xview_moveto(0.0)
+        self.canvas.yview_moveto(0.0)
+
+        model = stream['model'] = schema_model.SchemaModel().finish()
+        stream['foreign_keys'] = foreign_keys
+        self.schema_model = model
+        self.lazy_columns = False
+        self.db_schema = model.schema_view()
+        self.foreign_keys = [{'fk_table': fk_table, 'fk_column': fk_column, 'pk_table': pk_table,
+                              'pk_column': pk_column, 'constraint_name': constraint_name}
+                             for fk_table, fk_column, pk_table, pk_column, constraint_name in foreign_keys]
+        self.fk_index = fk_index.ForeignKeyIndex(self.foreign_keys)
+        self.fk_components = None
+        self.search_index = search_index.SearchIndex()
+        self.search_highlights = {}
+        self.loaded_db = stream['db_name']
+        self.loaded_fingerprint = None
+
+    def _on_stream_batch(self, stream, batch):
+        """Adds a batch of streamed tables to the model and draws them below the others."""
+        stream['slots'].release()
+        if stream is not self.schema_stream:
+            return
+        model = stream['model']
+        for table_name, columns in batch:
+            model.add_table(table_name)
+            for column in columns:
+                model.add_column(table_name, *column)
+        model.finish()
+
+        with instrumentation.span("measure", tables=len(batch)):
+            sizes = {table_name: self._measure_table(table_name, self.db_schema[table_name]) for table_name, _ in batch}
+        self.table_sizes.update(sizes)
+        stream['top'] = self._place_below(sizes, stream['top'])
+        self._update_scrollregion()
+        self._schedule_render()
+
+    def _place_below(self, sizes, top):
+        """
+        Places tables in grid rows starting at layout y top, for tables that arrive
+        after the layout was made. Returns the y below them.
+        """
+        positions = layout.grid_layout(sizes, [], max_width=self.canvas.winfo_width() / self.zoom)
+        bottom = top
+        for table_name, (width, height) in sizes.items():
+            x1, y1 = positions[table_name]
+            y1 += top
+            self.table_positions[table_name] = {'x1': x1, 'y1': y1, 'x2': x1 + width, 'y2': y1 + height}
+            self.table_index.insert(table_name, (x1, y1, x1 + width, y1 + height))
+            bottom = max(bottom, y1 + height + layout.TABLE_SPACING)
+        return bottom
+
+    def _finish_stream(self, stream):
+        """Completes the model of a stream that ended, possibly early, with its foreign keys."""
+        if stream is not self.schema_stream:
+            return None
+        self.schema_stream = None
+        model = stream['model']
+        if model is not None:
+            for fk_table, fk_column, pk_table, pk_column, constraint_name in stream['foreign_keys']:
+                model.add_foreign_key(fk_table, fk_column, pk_table, pk_column, constraint_name)
+            model.finish()
+        return model
+
+    def _on_stream_finished(self, stream, cached_model, index, fingerprint, table_versions):
+        """
+        Lays out a completely streamed schema. Its search index is built and its
+        cache entry written on a worker thread. Runs on the Tk thread.
+        cached_model and index are set instead when the schema came from the cache.
+        """
+        model = self._finish_stream(stream)
+        if cached_model is not None:
+            self._on_schema_loaded(stream['db_name'], cached_model, fingerprint, index=index)
+            return
+        if model is None:
+            return
+
+        selected_db = stream['db_name']
+        self.loaded_fingerprint = fingerprint
+        if not self.table_sizes:
+            self._set_status(f"No schema found for '{selected_db}'.", fg="orange")
+            return
+        self._set_status(f"Schema loaded for '{selected_db}'.", fg="green")
+        self._apply_layout()
+
+        host = db_connector.connection_cache_key(self.connection_pool)
+        cache = self.schema_cache
+
+        def worker():
+            with instrumentation.span("search.index", tables=len(model)):
+                index = search_index.SearchIndex.from_model(model)
+            self.ui_queue.put((self._on_search_index_built, (model, index)))
+            if fingerprint is not None:
+                try:
+                    cache.store(host, selected_db, fingerprint, model.schema_view(), model.foreign_keys_view(),
+                                table_versions)
+                except Exception as e:
+                    print(f"Error caching schema for database '{selected_db}': {e}")
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_search_index_built(self, model, index):
+        if model is self.schema_model:
+            self.search_index = index
+            self._on_search_changed()
+
+    def _on_schema_loaded(self, selected_db, model, fingerprint=None, diff=None, lazy=False, index=None):
+        """
+        Measures a schema fetched by the worker thread and lays it out. Runs on the Tk thread.
+        With lazy=True the model has no columns yet: tables are drawn collapsed and
+        their columns are fetched by _request_columns. index is the model's SearchIndex,
+        built here if the worker did not build it.
+        """
+        self.loaded_fingerprint = fingerprint
+        self.search_index = index if index is not None else search_index.SearchIndex.from_model(model)
+        self.search_highlights = {}
+        if diff is not None and selected_db == self.loaded_db and self.table_positions and model:
+            self._apply_schema_diff(model, diff)
+            return
+
+        self._clear_canvas()
 
         try:
-            db_schema, foreign_keys = db_connector.get_schema_for_database(self.db_connection, selected_db)
+            # The rest of the app reads the dict-shaped views; the model keeps the data.
+            self.schema_model = model
+            self.lazy_columns = lazy
+            if lazy:
+                # Filled in per table as columns arrive.
+                db_schema = {table_name: [] for table_name in model.table_names}
+            else:
+                db_schema = model.schema_view()
+            foreign_keys = model.foreign_keys_view()
             self.foreign_keys = foreign_keys
+            self.fk_index = fk_index.ForeignKeyIndex(foreign_keys)
+            self.fk_components = None
+            self.db_schema = db_schema
+            self.loaded_db = selected_db
 
+            self._refresh_search_results()
             if db_schema:
-                self.status_label.config(text=f"Schema loaded for '{selected_db}'.", fg="green")
-                
-                x_offset = 50
-                y_offset = 50
-                current_x = x_offset
-                current_y = y_offset
-                row_max_height = 0 # To track the tallest table in the current row
-
-                for table_name, columns in db_schema.items():
-                    x1, y1, x2, y2 = self._draw_table(table_name, columns, current_x, current_y)
-                    
-                    self.table_positions[table_name] = {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}
-
-                    table_width = x2 - x1
-                    table_height = y2 - y1
-
-                    if table_height > row_max_height:
-                        row_max_height = table_height
-
-                    current_x += table_width + 30 # Move right by table width + spacing
-
-                    # Check if the next table would go off screen
-                    if current_x + 250 > self.canvas.winfo_width() and len(db_schema) > 1: # 250 is an estimated min table width
-                        current_x = x_offset
-                        current_y += row_max_height + 30 # Move to next row, based on tallest table in previous row
-                        row_max_height = 0 # Reset max height for new row
-                
-                self.canvas.update_idletasks() 
-                
-                self._draw_relationships()
-
+                self._set_status(f"Schema loaded for '{selected_db}'.", fg="green")
+                with instrumentation.span("measure", tables=len(db_schema)):
+                    self.table_sizes = {table_name: self._measure_table(table_name, columns)
+                                        for table_name, columns in db_schema.items()}
+                self._apply_layout()
 
             else:
-                self.status_label.config(text=f"No schema found for '{selected_db}'.", fg="orange")
+                self._set_status(f"No schema found for '{selected_db}'.", fg="orange")
 
         except Exception as e:
-            self.status_label.config(text=f"Error loading schema: {e}", fg="red")
-
-    def _draw_table(self, table_name, columns, x, y):
-        """
-        Draws a single table rectangle with its name and columns on the canvas.
-        Returns the (x1, y1, x2, y2) coordinates of the drawn table.
-        """
-        # Define styling constants
-        TABLE_HEADER_HEIGHT = 30
-        COLUMN_LINE_HEIGHT = 20
-        TEXT_PADDING = 15 
-        RECT_PADDING = 10
-
-        # Calculate table width based on longest text
-        font_table_name = ("Arial", 14, "bold")
-        font_column = ("Arial", 10)
-
-        # Measure table name width
-        dummy_text_id = self.canvas.create_text(0, 0, text=table_name, font=font_table_name, anchor="nw", state="hidden")
-        bbox = self.canvas.bbox(dummy_text_id)
-        table_name_width = bbox[2] - bbox[0] if bbox else 0
-        self.canvas.delete(dummy_text_id)
-
-        max_content_width = table_name_width
-
-        # Calculate width needed for columns
-        for col in columns:
-            col_display_string = self._format_column_display(table_name, col) 
-            dummy_text_id = self.canvas.create_text(0, 0, text=col_display_string, font=font_column, anchor="nw", state="hidden")
-            bbox = self.canvas.bbox(dummy_text_id)
-            column_text_width = bbox[2] - bbox[0] if bbox else 0
-            self.canvas.delete(dummy_text_id)
-            if column_text_width > max_content_width:
-                max_content_width = column_text_width
-        
-        table_width = max_content_width + (2 * RECT_PADDING) + (2 * TEXT_PADDING)
-        
-        if table_width < 250:
-            table_width = 250
+            self._set_status(f"Error loading schema: {e}")
+
+    def _apply_schema_diff(self, model, diff):
+        """
+        Updates the diagram in place for a reloaded schema: removed tables are dropped,
+        changed tables are re-measured where they are, new tables are placed below
+        the diagram and relationships follow. The scroll position and the positions
+        of unchanged tables are kept.
+        """
+        self.schema_model = model
+        self.db_schema = model.schema_view()
+        self.foreign_keys = model.foreign_keys_view()
+        self.fk_index = fk_index.ForeignKeyIndex(self.foreign_keys)
+        self.fk_components = None
+
+        redraw = diff.redraw_tables()
+        dropped = set(diff.removed_tables) | redraw
+        for table_name in dropped:
+            if table_name in self.rendered_tables:
+                self._release_items(self.rendered_tables.pop(table_name)[1])
+        if dropped:
+            self.column_anchors = {key: anchor for key, anchor in self.column_anchors.items() if key[0] not in dropped}
+
+        for table_name in diff.removed_tables:
+            self.table_sizes.pop(table_name, None)
+            self.table_column_parts.pop(table_name, None)
+            if self.table_positions.pop(table_name, None) is not None:
+                self.table_index.remove(table_name)
+            if self.hover_table == table_name:
+                self.hover_table = None
+            if self.selected_table == table_name:
+                self.selected_table = None
+            if self.focus_tables is not None:
+                self.focus_tables.pop(table_name, None)
+
+        for table_name in redraw:
+            width, height = self.table_sizes[table_name] = self._measure_table(table_name, self.db_schema[table_name])
+            pos = self.table_positions.get(table_name)
+            if pos is None:
+                continue   # Outside the focused view
+            pos['x2'] = pos['x1'] + width
+            pos['y2'] = pos['y1'] + height
+            self.table_index.update(table_name, (pos['x1'], pos['y1'], pos['x2'], pos['y2']))
+
+        if diff.added_tables:
+            added_sizes = {table_name: self._measure_table(table_name, self.db_schema[table_name])
+                           for table_name in diff.added_tables}
+            self.table_sizes.update(added_sizes)
+        if self.focus_tables is not None and not self.focus_tables:
+            # Every focused table was removed; show the whole schema again.
+            self.focus_tables = None
+            self._refresh_search_results()
+            self._set_status(f"Schema reloaded for '{self.loaded_db}': {diff.summary()}.", fg="green")
+            self._apply_layout()
+            return
+        if diff.added_tables and self.focus_tables is None:
+            top = max((pos['y2'] for pos in self.table_positions.values()), default=0) + layout.TABLE_SPACING
+            self._place_below(added_sizes, top)
+
+        self._refresh_search_results()
 
-        # Calculate table height
-        table_height = TABLE_HEADER_HEIGHT + (len(columns) * COLUMN_LINE_HEIGHT) + (2 * RECT_PADDING)
+        self._set_status(f"Schema reloaded for '{self.loaded_db}': {diff.summary()}.", fg="green")
+        self._update_scrollregion()
+        self._render_viewport()
 
-        # Define rectangle coordinates
-        x1, y1 = x, y
-        x2, y2 = x + table_width, y + table_height
+    def _on_watch_toggled(self):
+        self.watch_failures = 0
+        self._schedule_watch()
+
+    def _schedule_watch(self):
+        """Schedules the next watch check, backing off while checks fail."""
+        if self.watch_var.get() and self.watch_job is None:
+            interval = min(WATCH_MAX_INTERVAL_MS, WATCH_INTERVAL_MS * 2 ** min(self.watch_failures, 8))
+            self.watch_job = self.master.after(interval, self._poll_schema)
+
+    def _poll_schema(self):
+        """
+        Watch mode: checks the loaded database's fingerprint on a worker thread and
+        reloads it when it changed. The fingerprint is one aggregate query over
+        INFORMATION_SCHEMA.TABLES, so polling puts little load on the server.
+        """
+        self.watch_job = None
+        if not self.watch_var.get():
+            return
+
+        db_name = self.loaded_db
+        pool = self.connection_pool
+        if not db_name or not pool or self.busy:
+            self._schedule_watch()
+            return
+
+        def worker():
+            fingerprint = None
+            try:
+                with pool.connection(timeout=WATCH_INTERVAL_MS / 1000) as connection:
+                    fingerprint = db_connector.get_schema_fingerprint(connection, db_name)
+            except Exception as e:
+                print(f"Error polling schema of '{db_name}': {e}")
+            self.ui_queue.put((self._on_watch_fingerprint, (db_name, fingerprint)))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_watch_fingerprint(self, db_name, fingerprint):
+        if fingerprint is None:
+            self.watch_failures += 1
+        elif db_name == self.loaded_db and not self.busy and self.watch_var.get():
+            if self.loaded_fingerprint is None:
+                # The fingerprint could not be read at load time; compare against this one from now on.
+                self.loaded_fingerprint = fingerprint
+                self.watch_failures = 0
+            elif fingerprint != self.loaded_fingerprint:
+                # The failure count is reset once the reload succeeds.
+                self._load_schema(db_name, from_watch=True)
+            else:
+                self.watch_failures = 0
+        self._schedule_watch()
+
+    def _on_watch_reload_failed(self):
+        """Backs off after a reload started by watch mode failed; the diagram and fingerprint are kept."""
+        self.watch_failures += 1
+        if self.watch_job is not None:
+            self.master.after_cancel(self.watch_job)
+            self.watch_job = None
+        self._schedule_watch()
+
+    def _on_search_changed(self):
+        """Updates the result list and re-highlights the rendered tables for a new query."""
+        self._refresh_search_results()
+
+        # Only rendered tables are highlighted; the rest are checked when they scroll into view.
+        drawn, self.search_highlights = self.search_highlights, {}
+        changed = False
+        for table_name in list(self.rendered_tables):
+            _, items = self.rendered_tables[table_name]
+            if self._search_highlight(table_name) != drawn.get(table_name, (False, set())):
+                self._release_items(items)
+                del self.rendered_tables[table_name]
+                changed = True
+        if changed:
+            self._render_viewport()
+
+    def _refresh_search_results(self):
+        """Fills the result list from the index; it is hidden while there is nothing to show."""
+        query = self.search_var.get()
+        self.search_results = self.search_index.search(query, limit=SEARCH_RESULT_LIMIT)
+        self.search_results_list.delete(0, tk.END)
+        for result in self.search_results:
+            self.search_results_list.insert(tk.END, result.label())
+        if self.search_results:
+            self.search_results_list.pack(side=tk.TOP, fill=tk.X, padx=5, before=self.canvas_area)
+        else:
+            self.search_results_list.pack_forget()
+            if query.strip() and self.db_schema:
+                self.load_status_label.config(text=f"No matches for '{query.strip()}'.", fg="black")
+
+    def _focus_search_results(self):
+        if self.search_results:
+            self.search_results_list.focus_set()
+            self.search_results_list.selection_clear(0, tk.END)
+            self.search_results_list.selection_set(0)
+            self.search_results_list.activate(0)
+
+    def _on_search_result_chosen(self, index=None):
+        """Jumps to the table of a search result: the given one, or the one selected in the list."""
+        if index is None:
+            selection = self.search_results_list.curselection()
+            if not selection:
+                return
+            index = selection[0]
+        if index < len(self.search_results):
+            self._jump_to_table(self.search_results[index].table_name)
+
+    def _jump_to_table(self, table_name):
+        """
+        Scrolls the diagram to centre a table and selects it. In a focused view, a
+        table outside the view is shown with its own neighbourhood instead.
+        """
+        pos = self.table_positions.get(table_name)
+        if pos is None:
+            if table_name in self.table_sizes:
+                self._focus_on_table(table_name)
+            return
+        _, _, region_width, region_height = (float(v) for v in self.canvas.cget("scrollregion").split())
+        center_x = (pos['x1'] + pos['x2']) / 2 * self.zoom
+        center_y = (pos['y1'] + pos['y2']) / 2 * self.zoom
+        self.canvas.xview_moveto(max(0.0, (center_x - self.canvas.winfo_width() / 2) / region_width))
+        self.canvas.yview_moveto(max(0.0, (center_y - self.canvas.winfo_height() / 2) / region_height))
+        self._render_viewport()
+        self._select_table(table_name)
+
+    def _search_highlight(self, table_name):
+        """(table_matched, matching_column_names) of a table for the current search query."""
+        highlight = self.search_highlights.get(table_name)
+        if highlight is None:
+            highlight = self.search_highlights[table_name] = self.search_index.table_matches(
+                table_name, self.search_var.get())
+        return highlight
+
+    def _focus_hops(self):
+        try:
+            hops = self.focus_hops_var.get()
+        except tk.TclError:
+            hops = 1
+        return min(MAX_FOCUS_HOPS, max(1, hops))
+
+    def _on_focus_button_click(self):
+        if self.busy:
+            return
+        if self.selected_table is None:
+            self._set_status("Select a table to focus on.", fg="orange")
+            return
+        self._focus_on_table(self.selected_table)
+
+    def _focus_on_table(self, table_name):
+        """Shows only the tables within the chosen number of foreign key hops of a table."""
+        hops = self._focus_hops()
+        distances = fk_graph.neighbourhood(self.fk_index, table_name, hops, max_tables=MAX_FOCUS_TABLES)
+        self._show_focus(distances, table_name)
+        limited = ", closest first" if len(distances) >= MAX_FOCUS_TABLES else ""
+        self._set_status(f"Showing {len(self.focus_tables)} tables within {hops} hop{'s' if hops != 1 else ''} "
+                         f"of '{table_name}'{limited}.", fg="green")
+
+    def _on_shift_click(self, event):
+        """Shift+click on a table shows the shortest join path from the selected table to it."""
+        table_name, _ = self._hit_test(event)
+        if table_name is None:
+            return
+        if self.selected_table is None or self.selected_table == table_name:
+            self._select_table(table_name)
+            return
+
+        if self.busy:
+            return
+        from_table = self.selected_table
+        path = fk_graph.join_path(self.fk_index, from_table, table_name, max_hops=MAX_FOCUS_TABLES - 1)
+        if path is None:
+            self._set_status(f"No foreign key path between '{from_table}' and '{table_name}'.", fg="orange")
+            return
+        self._show_focus(path, from_table)
+        self._set_status(f"Join path: {' -> '.join(path)}.", fg="green")
+
+    def _on_cycle_button_click(self):
+        """
+        Shows the foreign key cycle group of the selected table, or the shortest
+        cycle through it when the group is too large for one view.
+        """
+        if self.busy:
+            return
+        table_name = self.selected_table
+        if table_name is None:
+            self._set_status("Select a table to show its foreign key cycle.", fg="orange")
+            return
+        if self.fk_components is None:
+            self.fk_components = {member: component
+                                  for component in fk_graph.strongly_connected_components(self.fk_index)
+                                  for member in component}
+
+        component = self.fk_components.get(table_name)
+        if component is None:
+            self._set_status(f"'{table_name}' is not part of a foreign key cycle.", fg="orange")
+        elif len(component) <= MAX_FOCUS_TABLES:
+            self._show_focus(component, table_name)
+            self._set_status(f"'{table_name}' is on a foreign key cycle of {len(component)} "
+                             f"table{'s' if len(component) != 1 else ''}.", fg="green")
+        else:
+            cycle = fk_graph.shortest_cycle(self.fk_index, table_name, within=set(component))
+            self._show_focus(cycle[:-1], table_name)
+            self._set_status(f"Shortest cycle through '{table_name}': {' -> '.join(cycle)} "
+                             f"(its cycle group has {len(component)} tables).", fg="green")
+
+    def _show_focus(self, tables, select=None):
+        """
+        Lays out only the given tables, a few dozen at most, in place of the whole
+        schema and centres select. The layout is computed on the Tk thread, as it
+        is small. Tables no longer in the schema are left out; when none are left,
+        the whole schema is shown again.
+        """
+        self.focus_tables = dict.fromkeys(table_name for table_name in tables if table_name in self.table_sizes)
+        if not self.focus_tables:
+            self.focus_tables = None
+            self._apply_layout()
+            return
+        sizes = {table_name: self.table_sizes[table_name] for table_name in self.focus_tables}
+        edges = [(fk['fk_table'], fk['pk_table']) for fk in fk_graph.subgraph_foreign_keys(self.fk_index, sizes)]
+        name = LAYOUT_CHOICES[self.layout_var.get()]
+        self._show_layout(layout.compute_layout(name, sizes, edges, max_width=self.canvas.winfo_width() / self.zoom))
+        if select is not None:
+            self._jump_to_table(select)
+
+    def _show_all_tables(self):
+        """Leaves a focused view."""
+        if self.focus_tables is None or self.busy:
+            return
+        self.focus_tables = None
+        self._set_status(f"Schema loaded for '{self.loaded_db}'.", fg="green")
+        self._apply_layout()
+
+    def _toggle_debug_overlay(self, event=None):
+        """Shows or hides the timing overlay. Timings are recorded while it is shown."""
+        self.debug_overlay = not self.debug_overlay
+        instrumentation.enable(self.debug_overlay or self.trace_from_environment)
+        if self.debug_overlay_job is not None:
+            self.master.after_cancel(self.debug_overlay_job)
+            self.debug_overlay_job = None
+        if self.debug_overlay:
+            self._update_debug_overlay()
+        else:
+            self.canvas.delete("debug_overlay")
+
+    def _update_debug_overlay(self):
+        """Redraws the overlay in the top-left corner of the window every DEBUG_OVERLAY_INTERVAL_MS."""
+        self.debug_overlay_job = None
+        self.canvas.delete("debug_overlay")
+        if not self.debug_overlay:
+            return
+        text = instrumentation.format_summary() or "No timings recorded yet."
+        self.canvas.create_text(self.canvas.canvasx(10), self.canvas.canvasy(10), text=text, anchor="nw",
+                                font=("Courier", 9), fill="darkgreen", tags=("debug_overlay",))
+        self.canvas.tag_raise("debug_overlay")
+        self.debug_overlay_job = self.master.after(DEBUG_OVERLAY_INTERVAL_MS, self._update_debug_overlay)
+
+    def _save_trace(self, event=None):
+        """
+        Saves the recorded spans as a Chrome trace (chrome://tracing, Perfetto) and the
+        per-phase totals and counters next to it as <name>.summary.json.
+        """
+        path = filedialog.asksaveasfilename(title="Save timings", defaultextension=".json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if not path:
+            return
+        try:
+            instrumentation.export_chrome_trace(path)
+            instrumentation.export_json(os.path.splitext(path)[0] + ".summary.json")
+            self._set_status(f"Timings saved to {path}.", fg="green")
+        except OSError as e:
+            self._set_status(f"Error saving timings: {e}")
+
+    def _clear_canvas(self):
+        self.canvas.delete("all")
+        self.table_sizes = {}
+        self.table_positions = {}
+        self.table_column_parts = {}
+        self.rendered_tables = {}
+        self.rendered_relationships = {}
+        self.table_index.clear()
+        self.column_anchors = {}
+        self.hover_table = None
+        self.selected_table = None
+        self.item_pool = {"rectangle": [], "text": [], "line": []}
+        self.canvas_ops = {kind: [] for kind in ITEM_OPTIONS}
+        self.canvas_updates = []
+        self.canvas_hidden = set()
+        self.bundled_tables = set()
+        self.columns_requested = set()
+        self.columns_queue = []
+        self.columns_fetching = False
+        self.search_highlights = {}
+        self.focus_tables = None
+
+    def _apply_layout(self):
+        """
+        Positions the loaded tables with the selected layout and renders them.
+        Graph layouts are served from the schema cache when the same tables and
+        relationships were laid out before; otherwise they are computed on a
+        worker thread and cached.
+        """
+        if not self.table_sizes or self.busy:
+            return
+
+        if self.focus_tables is not None:
+            self._show_focus(self.focus_tables)
+            return
+
+        name = LAYOUT_CHOICES[self.layout_var.get()]
+        edges = [(fk['fk_table'], fk['pk_table']) for fk in self.fk_index]
+
+        if name == "grid":
+            # The grid wraps to the window width, so it is cheap to recompute and not cached.
+            self._show_layout(layout.grid_layout(self.table_sizes, edges, max_width=self.canvas.winfo_width() / self.zoom))
+            return
+
+        host = db_connector.connection_cache_key(self.connection_pool)
+        db_name = self.loaded_db
+        sizes = self.table_sizes
+        fingerprint = layout.layout_fingerprint(name, sizes, edges)
+        cached = self.schema_cache.load_layout(host, db_name, name, fingerprint)
+        if cached is not None and cached.keys() == sizes.keys():
+            self._show_layout(cached)
+            return
+
+        self._set_status(f"Computing {self.layout_var.get().lower()} layout...", fg="blue")
+
+        def task(report_progress, cancel_event):
+            positions = layout.compute_layout(name, sizes, edges)
+            self.schema_cache.store_layout(host, db_name, name, fingerprint, positions)
+            return positions
+
+        def on_success(positions):
+            # Ignore results for a schema that was replaced (or a view focused) while the layout ran.
+            if sizes is self.table_sizes and self.focus_tables is None:
+                self._set_status(f"Schema loaded for '{db_name}'.", fg="green")
+                self._show_layout(positions)
+
+        self._run_in_background(task, on_success, lambda e: self._set_status(f"Error computing layout: {e}"))
+
+    def _show_layout(self, positions):
+        """
+        Applies {table_name: (x, y)} positions and scrolls to the top-most, left-most table.
+        Tables without a position are not shown.
+        """
+        for _, items in self.rendered_tables.values():
+            self._release_items(items)
+        self.rendered_tables = {}
+
+        self.table_positions = {}
+        self.table_index.clear()
+        for table_name, (x1, y1) in positions.items():
+            width, height = self.table_sizes[table_name]
+            self.table_positions[table_name] = {'x1': x1, 'y1': y1, 'x2': x1 + width, 'y2': y1 + height}
+            self.table_index.insert(table_name, (x1, y1, x1 + width, y1 + height))
+
+        self._update_scrollregion()
+        if self.table_positions:
+            first = min(self.table_positions.values(), key=lambda pos: (pos['y1'], pos['x1']))
+            _, _, region_width, region_height = (float(v) for v in self.canvas.cget("scrollregion").split())
+            self.canvas.xview_moveto(max(0.0, (first['x1'] - 50) * self.zoom / region_width))
+            self.canvas.yview_moveto(max(0.0, (first['y1'] - 50) * self.zoom / region_height))
+        self._render_viewport()
+
+    def _measure_table(self, table_name, columns):
+        """
+        Returns the (width, height) of a table at zoom 1, keeping its formatted
+        columns and relationship anchor points for drawing.
+        """
+        width, height, column_parts, anchors = diagram.measure_table(table_name, columns, self.fk_index, self.text_measurer)
+        self.table_column_parts[table_name] = column_parts
+        for column_name, anchor in anchors.items():
+            self.column_anchors[(table_name, column_name)] = anchor
+        return width, height
+
+    def _update_scrollregion(self):
+        """Sizes the scrollable area to the laid-out schema at the current zoom."""
+        if self.table_positions:
+            max_x = max(pos['x2'] for pos in self.table_positions.values())
+            max_y = max(pos['y2'] for pos in self.table_positions.values())
+        else:
+            max_x = max_y = 0
+        self.canvas.configure(scrollregion=(0, 0, (max_x + 50) * self.zoom, (max_y + 50) * self.zoom))
+
+    def _visible_world_rect(self):
+        """Returns the part of the layout (in zoom-1 coordinates) currently shown, plus a margin."""
+        margin = VIEWPORT_MARGIN
+        left = self.canvas.canvasx(0) - margin
+        top = self.canvas.canvasy(0) - margin
+        right = self.canvas.canvasx(self.canvas.winfo_width()) + margin
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + margin
+        return left / self.zoom, top / self.zoom, right / self.zoom, bottom / self.zoom
+
+    def _detail_level(self):
+        if self.zoom >= FULL_DETAIL_ZOOM:
+            return DETAIL_FULL
+        if self.zoom >= HEADER_DETAIL_ZOOM:
+            return DETAIL_HEADER
+        return DETAIL_OUTLINE
+
+    def _schedule_render(self, event=None):
+        """Coalesces scroll, resize and zoom events into one viewport render."""
+        if not self._render_pending:
+            self._render_pending = True
+            self.master.after_idle(self._render_viewport)
+
+    @instrumentation.timed("render.viewport")
+    def _render_viewport(self):
+        """
+        Creates canvas items for the tables that intersect the visible area and
+        recycles the items of tables that scrolled out, so the number of canvas
+        items stays bounded by what fits on screen. The geometry of every table and
+        relationship is worked out first; the canvas items are then created, moved
+        and hidden together in one batch.
+        """
+        self._render_pending = False
+        if not self.db_schema:
+            return
+
+        left, top, right, bottom = self._visible_world_rect()
+        detail = self._detail_level()
+
+        visible = self.table_index.query((left, top, right, bottom))
+
+        for table_name in list(self.rendered_tables):
+            rendered_detail, items = self.rendered_tables[table_name]
+            if table_name not in visible or rendered_detail != detail:
+                self._release_items(items)
+                del self.rendered_tables[table_name]
+
+        for table_name in visible:
+            if table_name not in self.rendered_tables:
+                pos = self.table_positions[table_name]
+                items = self._draw_table(table_name, pos['x1'], pos['y1'], detail)
+                self.rendered_tables[table_name] = (detail, items)
+
+        if self.lazy_columns and detail == DETAIL_FULL:
+            self._request_columns(visible)
+
+        self._draw_relationships()
+        self._flush_canvas_ops()
+
+    def _request_columns(self, table_names):
+        """Queues a column fetch for the given collapsed tables (lazy mode)."""
+        new = [table_name for table_name in table_names if table_name not in self.columns_requested]
+        if not new:
+            return
+        self.columns_requested.update(new)
+        self.columns_queue.extend(new)
+        if not self.columns_fetching:
+            self._fetch_queued_columns()
+
+    def _fetch_queued_columns(self):
+        """
+        Fetches the columns of all queued tables on a worker thread. Requests made
+        while a fetch runs are batched into the next one.
+        """
+        batch, self.columns_queue = self.columns_queue, []
+        self.columns_fetching = bool(batch)
+        if not batch:
+            return
+
+        pool = self.connection_pool
+        db_name = self.loaded_db
+        model = self.schema_model
+
+        def worker():
+            columns = None
+            try:
+                with pool.connection() as connection:
+                    columns = db_connector.get_columns_for_tables(connection, db_name, batch)
+            except Exception as e:
+                print(f"Error fetching columns for database '{db_name}': {e}")
+            self.ui_queue.put((self._on_columns_fetched, (model, batch, columns)))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_columns_fetched(self, model, batch, columns):
+        """Expands tables whose columns arrived. Runs on the Tk thread."""
+        if model is not self.schema_model:
+            return  # A different schema was loaded meanwhile.
+
+        if columns is None:
+            # Let the tables be requested again, e.g. on the next scroll.
+            self.columns_requested.difference_update(batch)
+            self._set_status("Error fetching columns.")
+        else:
+            for table_name, table_columns in columns.items():
+                if table_name not in self.table_positions:
+                    # Not laid out (e.g. outside a focused view); fetch it again when shown.
+                    self.columns_requested.discard(table_name)
+                    continue
+                self.db_schema[table_name] = table_columns
+                self.search_index.add_columns(table_name, table_columns)
+                self.search_highlights.pop(table_name, None)
+                width, height = self.table_sizes[table_name] = self._measure_table(table_name, table_columns)
+                pos = self.table_positions[table_name]
+                pos['x2'] = pos['x1'] + width
+                pos['y2'] = pos['y1'] + height
+                self.table_index.update(table_name, (pos['x1'], pos['y1'], pos['x2'], pos['y2']))
+                if table_name in self.rendered_tables:
+                    self._release_items(self.rendered_tables.pop(table_name)[1])
+            if self.search_var.get().strip():
+                self._refresh_search_results()
+            self._update_scrollregion()
+            self._schedule_render()
+
+        self._fetch_queued_columns()
+
+    def _on_double_click(self, event):
+        """In lazy mode, loads the columns of the double-clicked table."""
+        table_name, _ = self._hit_test(event)
+        if self.lazy_columns and table_name is not None:
+            self._request_columns([table_name])
+
+    def _on_zoom(self, event, factor):
+        """Zooms around the mouse pointer, keeping the point under it in place."""
+        new_zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        if new_zoom == self.zoom or not self.db_schema:
+            return
+
+        world_x = self.canvas.canvasx(event.x) / self.zoom
+        world_y = self.canvas.canvasy(event.y) / self.zoom
+        self.zoom = new_zoom
+
+        # Items are positioned for the old zoom; release them all and redraw.
+        for _, items in self.rendered_tables.values():
+            self._release_items(items)
+        self.rendered_tables = {}
+
+        self._update_scrollregion()
+        _, _, region_width, region_height = (float(v) for v in self.canvas.cget("scrollregion").split())
+        self.canvas.xview_moveto(max(0.0, (world_x * self.zoom - event.x) / region_width))
+        self.canvas.yview_moveto(max(0.0, (world_y * self.zoom - event.y) / region_height))
+        self._schedule_render()
+
+    def _on_mouse_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-3, "units")
+        else:
+            self.canvas.yview_scroll(3, "units")
+        self._schedule_render()
+
+    def _on_pan_start(self, event):
+        self.canvas.scan_mark(event.x, event.y)
+
+    def _on_pan_move(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._schedule_render()
+
+    def _create_item(self, kind, coords, **options):
+        """
+        Queues a canvas item, reusing a hidden item of the same kind from the pool if
+        possible. options must set all of ITEM_OPTIONS[kind]. Returns its [kind, item_id];
+        the ID of a new item is filled in when the queue is applied by _flush_canvas_ops.
+        """
+        pool = self.item_pool[kind]
+        if pool:
+            item_id = pool.pop()
+            # Reused in the same batch that released it: no need to hide it first.
+            self.canvas_hidden.discard(item_id)
+            instrumentation.count("canvas.items_reused")
+        else:
+            item_id = None
+            instrumentation.count("canvas.items_created")
+        item = [kind, item_id]
+        self.canvas_ops[kind].append((item, coords, options))
+        return item
+
+    def _update_item(self, item, coords=(), **options):
+        """Queues moving (to coords, if given) and reconfiguring an item."""
+        self.canvas_updates.append((item, coords, options))
+
+    def _release_items(self, items):
+        """Queues hiding items and returns them to the pool for reuse."""
+        for item in items:
+            if item[1] is None:
+                self._flush_canvas_ops()   # Assigns the item its ID
+            kind, item_id = item
+            self.canvas_hidden.add(item_id)
+            self.item_pool[kind].append(item_id)
+
+    def _flush_canvas_ops(self):
+        """Applies the queued canvas operations with a single call into Tcl."""
+        if not (self.canvas_hidden or self.canvas_updates or any(self.canvas_ops.values())):
+            return
+        ops, self.canvas_ops = self.canvas_ops, {kind: [] for kind in ITEM_OPTIONS}
+        updates, self.canvas_updates = self.canvas_updates, []
+        hidden, self.canvas_hidden = self.canvas_hidden, set()
+
+        with instrumentation.span("render.flush", items=sum(map(len, ops.values())), updates=len(updates)):
+            shown = []
+            for kind, names in ITEM_OPTIONS.items():
+                values = []
+                for item, coords, options in ops[kind]:
+                    values.append("" if item[1] is None else item[1])
+                    values.append(coords)
+                    values.extend([options[name] for name in names])
+                shown.append(values)
+            update_values = []
+            for item, coords, options in updates:
+                update_values += [item[1], coords,
+                                  [value for name, option in options.items() for value in (f"-{name}", option)]]
+
+            item_ids = self.canvas.tk.splitlist(self.canvas.tk.call(
+                CANVAS_OPS_PROC, self.canvas._w, tuple(hidden), *shown, update_values))
+            items = (item for kind in ITEM_OPTIONS for item, _, _ in ops[kind])
+            for item, item_id in zip(items, item_ids):
+                if item[1] is None:
+                    item[1] = int(item_id)
+
+    @instrumentation.timed("render.table")
+    def _draw_table(self, table_name, x, y, detail=DETAIL_FULL):
+        """
+        Queues the canvas items of a single table rectangle with its name and columns.
+        x and y are layout coordinates at zoom 1. Below full detail only the table
+        box (and, at header detail, its name) is drawn. Column texts come from the
+        display parts kept by _measure_table, so no column dicts are built.
+        Returns the list of [kind, item_id] canvas items.
+        """
+        pos = self.table_positions[table_name]
+        z = self.zoom
+        x1, y1 = x * z, y * z
+        x2, y2 = x1 + (pos['x2'] - pos['x1']) * z, y1 + (pos['y2'] - pos['y1']) * z
+        items = []
+
+        table_matched, matched_columns = self._search_highlight(table_name)
+        # Lazily expanded tables are stacked above the others (see CANVAS_OPS_SCRIPT).
+        table_tags = (table_name, "expanded") if self.lazy_columns and self.db_schema[table_name] else (table_name,)
 
         # Draw the table rectangle
-        self.canvas.create_rectangle(x1, y1, x2, y2, fill="lightblue", outline="black", width=2, tags=(table_name, "table_box"))
+        items.append(self._create_item("rectangle", (x1, y1, x2, y2), fill="khaki" if table_matched else "lightblue",
+                                       tags=table_tags + ("table_box",), **self._table_outline_options(table_name)))
+
+        if detail == DETAIL_OUTLINE:
+            return items
 
         # Draw table name
-        table_name_x = x1 + table_width / 2
-        table_name_y = y1 + TABLE_HEADER_HEIGHT / 2
-        self.canvas.create_text(table_name_x, table_name_y, text=table_name, font=font_table_name, fill="navy", tags=(table_name, "table_name"))
+        table_name_x = (x1 + x2) / 2
+        table_name_y = y1 + TABLE_HEADER_HEIGHT * z / 2
+        items.append(self._create_item("text", (table_name_x, table_name_y), text=table_name,
+                                       font=_scaled_font(FONT_TABLE_NAME, z), fill="navy", anchor="center",
+                                       tags=table_tags + ("table_name",)))
 
-        # Draw columns
-        current_y_for_column = y1 + TABLE_HEADER_HEIGHT + RECT_PADDING
-        for col in columns:
-            col_display_string = self._format_column_display(table_name, col)
-            self.canvas.create_text(x1 + TEXT_PADDING, current_y_for_column, text=col_display_string, 
-                                    font=font_column, anchor="nw", fill="black", tags=(table_name, "column", f"{table_name}_{col['name']}"))
-            current_y_for_column += COLUMN_LINE_HEIGHT
+        if detail == DETAIL_HEADER:
+            return items
 
-        # Return the coordinates of the drawn table
-        return x1, y1, x2, y2
+        # Draw columns
+        font_column = _scaled_font(FONT_COLUMN, z)
+        current_y_for_column = y1 + (TABLE_HEADER_HEIGHT + RECT_PADDING) * z
+        for parts in self.table_column_parts[table_name]:
+            col_display_string = "".join(parts)
+            items.append(self._create_item("text", (x1 + TEXT_PADDING * z, current_y_for_column), text=col_display_string,
+                                           font=font_column, anchor="nw",
+                                           fill="firebrick" if parts[0] in matched_columns else "black",
+                                           tags=table_tags + ("column", f"{table_name}_{parts[0]}")))
+            current_y_for_column += COLUMN_LINE_HEIGHT * z
+
+        return items
 
     def _format_column_display(self, table_name, column_info):
         """Helper to format column display string"""
-        name = column_info['name']
-        data_type = column_info['type'].upper()
-        
-        if column_info['length'] is not None and column_info['length'] != 0:
-            data_type += f"({column_info['length']})"
-        
-        key_info_parts = []
-        if column_info['key'] == 'PRI':
-            key_info_parts.append("[PK]")
-        elif column_info['key'] == 'UNI':
-            key_info_parts.append("[UN]")
-
-        is_fk = False
-        if self.foreign_keys:
-            for fk in self.foreign_keys:
-                if fk['fk_table'] == table_name and fk['fk_column'] == name:
-                    is_fk = True
-                    break
-        if is_fk:
-            key_info_parts.append("[FK]")
-
-        key_info = "".join(key_info_parts)
-
-        display_string = f"{name} ({data_type})"
-        if key_info:
-            display_string += f" {key_info}"
-        
-        return display_string
-    
+        return "".join(self._column_display_parts(table_name, column_info))
+
+    def _column_display_parts(self, table_name, column_info):
+        return diagram.column_display_parts(table_name, column_info, self.fk_index)
+
+    @instrumentation.timed("render.relationships")
     def _draw_relationships(self):
-        """Draws lines connecting foreign key columns to their referenced primary key columns."""
-        if not self.db_connection or not self.foreign_keys:
-            return
-
-        for fk in self.foreign_keys:
-            fk_table = fk['fk_table']
-            fk_column = fk['fk_column']
-            pk_table = fk['pk_table']
-            pk_column = fk['pk_column']
-
-            # Ensure both tables are drawn on the canvas and their positions are known
-            if fk_table in self.table_positions and pk_table in self.table_positions:
-                # Get the bounding box of the foreign key column text
-                # Use tags to identify column text"
-                fk_column_item_id = self.canvas.find_withtag(f"{fk_table}_{fk_column}")
-                
-                # Get the bounding box of the primary key column text
-                pk_column_item_id = self.canvas.find_withtag(f"{pk_table}_{pk_column}")
-
-                if fk_column_item_id and pk_column_item_id:
-                    # Get coordinates of the column text items
-                    fk_bbox = self.canvas.bbox(fk_column_item_id[0]) 
-                    pk_bbox = self.canvas.bbox(pk_column_item_id[0])
-
-                    if fk_bbox and pk_bbox:
-                        # Calculate midpoints of the right side of FK column and left side of PK column
-                        # This creates a line from the FK column to the PK column
-                        start_x = fk_bbox[2] # Right edge of FK column text
-                        start_y = (fk_bbox[1] + fk_bbox[3]) / 2 # Mid-height of FK column text
-
-                        end_x = pk_bbox[0] # Left edge of PK column text
-                        end_y = (pk_bbox[1] + pk_bbox[3]) / 2 # Mid-height of PK column text
-
-                        # Draw the line
-                        self.canvas.create_line(start_x, start_y, end_x, end_y, 
-                                                fill="blue", width=2, arrow=tk.LAST,
-                                                tags=("relationship", f"fk_{fk_table}_{fk_column}_to_{pk_table}_{pk_column}"))
-                else:
-                    print(f"Warning: Could not find canvas items for FK {fk_table}.{fk_column} or PK {pk_table}.{pk_column}. This might happen if columns are not visible or tags are incorrect.")
-            else:
-                print(f"Warning: Table positions not found for FK table '{fk_table}' or PK table '{pk_table}'. Ensure tables are drawn.")
+        """
+        Draws lines connecting foreign key columns to their referenced primary key columns,
+        one path per pair of linked tables (see diagram.relationship_path). Every pair
+        touching a rendered table is drawn, with endpoints taken from the column anchors
+        recorded at measure time, so the canvas is never queried. Lines that are already
+        on the canvas are only moved when their endpoints change. Below full detail the
+        lines join the table boxes instead of the column texts.
+        """
+        if not self.fk_index:
+            self._release_items([drawn[0] for drawn in self.rendered_relationships.values()])
+            self.rendered_relationships = {}
+            return
+
+        wanted = {}
+        for table_name in self.rendered_tables:
+            for fk in self._shown_edges_of(table_name):
+                wanted[(fk['fk_table'], fk['pk_table'])] = None
+
+        stale = [pair for pair in self.rendered_relationships if pair not in wanted]
+        for pair in stale:
+            self._release_items([self.rendered_relationships.pop(pair)[0]])
+
+        referencing = collections.Counter(pk_table for fk_table, pk_table in wanted if fk_table != pk_table)
+        self.bundled_tables = {table_name for table_name, count in referencing.items() if count >= BUNDLE_MIN_TABLES}
+        for pair in wanted:
+            self._draw_relationship(pair)
+
+    def _shown_edges_of(self, table_name):
+        """The foreign keys of a table whose other end is laid out too, e.g. inside a focused view."""
+        positions = self.table_positions
+        return [fk for fk in self.fk_index.edges_of(table_name) if fk['fk_table'] in positions and fk['pk_table'] in positions]
+
+    def _draw_relationship(self, pair):
+        """Queues the path for the foreign keys of one (fk_table, pk_table) pair, or moves it if already drawn."""
+        fk_table, pk_table = pair
+        coords = self._relationship_coords(pair)
+        fill = "red" if self.selected_table in pair else "blue"
+
+        style = (fill, max(1, round(2 * self.zoom)))
+
+        drawn = self.rendered_relationships.get(pair)
+        if drawn is not None:
+            item, drawn_coords, drawn_style = drawn
+            if drawn_coords != coords or drawn_style != style:
+                self._update_item(item, coords if drawn_coords != coords else (),
+                                  **({'fill': style[0], 'width': style[1]} if drawn_style != style else {}))
+        else:
+            item = self._create_item(
+                "line", coords,
+                fill=style[0], width=style[1], arrow=tk.LAST,
+                tags=("relationship", f"fk_{fk_table}_to_{pk_table}"))
+        self.rendered_relationships[pair] = (item, coords, style)
+
+    def _relationship_coords(self, pair):
+        """
+        Returns the canvas path (x0, y0, x1, y1, ...) for the foreign keys of a table pair:
+        from the right edge of each FK column text to the left edge of its PK column text.
+        """
+        fk_table, pk_table = pair
+        fk_pos = self.table_positions[fk_table]
+        pk_pos = self.table_positions[pk_table]
+        full = self._detail_level() == DETAIL_FULL
+        anchor_pairs = [(self.column_anchors.get((fk_table, fk['fk_column'])) if full else None,
+                         self.column_anchors.get((pk_table, fk['pk_column'])) if full else None)
+                        for fk in self.fk_index.edges_from(fk_table) if fk['pk_table'] == pk_table]
+
+        path = diagram.relationship_path((fk_pos['x1'], fk_pos['y1'], fk_pos['x2'], fk_pos['y2']),
+                                         (pk_pos['x1'], pk_pos['y1'], pk_pos['x2'], pk_pos['y2']),
+                                         anchor_pairs, bundle=pk_table in self.bundled_tables)
+        return tuple(v * self.zoom for v in path)
+
+    def _world_point(self, event):
+        """Converts a mouse event position into layout coordinates at zoom 1."""
+        return self.canvas.canvasx(event.x) / self.zoom, self.canvas.canvasy(event.y) / self.zoom
+
+    def _hit_test(self, event):
+        """
+        Returns (table_name, column_name) under the mouse using the spatial index.
+        column_name is None over the header or when columns are not shown; both are
+        None over empty canvas. Where tables overlap, the one drawn on top is hit.
+        """
+        x, y = self._world_point(event)
+        hits = self.table_index.hit(x, y)
+        if not hits:
+            return None, None
+        table_name = hits[0] if len(hits) == 1 else self._topmost_table(hits, event)
+        pos = self.table_positions[table_name]
+        row = int((y - pos['y1'] - TABLE_HEADER_HEIGHT - RECT_PADDING) // COLUMN_LINE_HEIGHT)
+        columns = self.db_schema.get(table_name, [])
+        if self._detail_level() == DETAIL_FULL and 0 <= row < len(columns):
+            return table_name, columns[row]['name']
+        return table_name, None
+
+    def _topmost_table(self, table_names, event):
+        """
+        Of several tables under the mouse, e.g. an expanded table over its neighbours,
+        returns the one whose box is highest in the canvas stacking order.
+        """
+        boxes = {self.rendered_tables[table_name][1][0][1]: table_name
+                 for table_name in table_names if table_name in self.rendered_tables}
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        for item_id in reversed(self.canvas.find_overlapping(x, y, x, y)):
+            if item_id in boxes:
+                return boxes[item_id]
+        return table_names[0]
+
+    def _on_hover(self, event):
+        table_name, column_name = self._hit_test(event)
+        if table_name != self.hover_table:
+            self._set_table_outline(self.hover_table)
+            self.hover_table = table_name
+            self._set_table_outline(table_name)
+
+        if table_name is None:
+            self.load_status_label.config(text="")
+        elif column_name is None:
+            text = table_name
+            if self.lazy_columns and not self.db_schema[table_name]:
+                rows = self.schema_model.row_estimate(table_name)
+                if rows is not None:
+                    text += f" (~{rows:,} rows)"
+                if table_name not in self.columns_requested:
+                    text += " - double-click to load columns"
+            self.load_status_label.config(text=text, fg="black")
+        else:
+            column_info = next(col for col in self.db_schema[table_name] if col['name'] == column_name)
+            self.load_status_label.config(text=f"{table_name}.{self._format_column_display(table_name, column_info)}", fg="black")
+
+    def _set_table_outline(self, table_name):
+        """Restyles a rendered table's box to reflect whether it is hovered or selected."""
+        if table_name is None or table_name not in self.rendered_tables:
+            return
+        _, box_id = self.rendered_tables[table_name][1][0]
+        self.canvas.itemconfigure(box_id, **self._table_outline_options(table_name))
+
+    def _table_outline_options(self, table_name):
+        if table_name == self.selected_table:
+            return {'outline': "red", 'width': 3}
+        if table_name == self.hover_table:
+            return {'outline': "darkorange", 'width': 3}
+        if self._search_highlight(table_name)[0]:
+            return {'outline': "goldenrod", 'width': 3}
+        return {'outline': "black", 'width': 2}
+
+    def _on_button_press(self, event):
+        """Starts dragging the table under the mouse, or panning over empty canvas."""
+        table_name, _ = self._hit_test(event)
+        self.drag_state = {'table': table_name, 'last': self._world_point(event), 'moved': False}
+        if table_name is None:
+            self._on_pan_start(event)
+
+    def _on_button_motion(self, event):
+        if not self.drag_state:
+            return
+        self.drag_state['moved'] = True
+        table_name = self.drag_state['table']
+        if table_name is None:
+            self._on_pan_move(event)
+            return
+
+        x, y = self._world_point(event)
+        last_x, last_y = self.drag_state['last']
+        self.drag_state['last'] = (x, y)
+        self._move_table(table_name, x - last_x, y - last_y)
+
+    def _on_button_release(self, event):
+        """A press without movement selects the table under the mouse (or clears the selection)."""
+        drag_state, self.drag_state = self.drag_state, None
+        if not drag_state:
+            return
+        if drag_state['moved']:
+            if drag_state['table'] is not None:
+                self._update_scrollregion()
+                self._schedule_render()
+            return
+
+        self._select_table(drag_state['table'])
+
+    def _select_table(self, table_name):
+        """Selects a table (or clears the selection with None), restyling it and its relationships."""
+        previous = self.selected_table
+        self.selected_table = table_name
+        self._set_table_outline(previous)
+        self._set_table_outline(self.selected_table)
+        for restyled in (previous, table_name):
+            if restyled is not None:
+                for fk in self.fk_index.edges_of(restyled):
+                    pair = (fk['fk_table'], fk['pk_table'])
+                    if pair in self.rendered_relationships:
+                        self._draw_relationship(pair)
+        self._flush_canvas_ops()
+
+    def _move_table(self, table_name, dx, dy):
+        """
+        Moves one table by (dx, dy) layout units: updates its position and spatial index
+        entry, shifts its canvas items and redraws only the relationships touching it.
+        """
+        pos = self.table_positions[table_name]
+        pos['x1'] += dx
+        pos['x2'] += dx
+        pos['y1'] += dy
+        pos['y2'] += dy
+        self.table_index.update(table_name, (pos['x1'], pos['y1'], pos['x2'], pos['y2']))
+
+        if table_name in self.rendered_tables:
+            for _, item_id in self.rendered_tables[table_name][1]:
+                self.canvas.move(item_id, dx * self.zoom, dy * self.zoom)
+
+        for pair in {(fk['fk_table'], fk['pk_table']) for fk in self._shown_edges_of(table_name)}:
+            self._draw_relationship(pair)
+        self._flush_canvas_ops()
+
+
+def _scaled_font(font_spec, zoom):
+    """Returns font_spec with its point size scaled by zoom (at least 1)."""
+    return (font_spec[0], max(1, round(font_spec[1] * zoom))) + tuple(font_spec[2:])
 
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = MySQLVisualizerApp(root)
-    root.mainloop()
+    # Set MYSQL_VISUALIZER_PROFILE=<file> to profile the Tk thread with cProfile.
+    profile_path = os.environ.get("MYSQL_VISUALIZER_PROFILE")
+    if profile_path:
+        with instrumentation.profile(profile_path):
+            root.mainloop()
+    else:
+        root.mainloop()